@@ -2,7 +2,7 @@
 API Routes
 """
 from fastapi import APIRouter
-from app.api import chat, projects, insights, uploads, rules, dashboard, templates
+from app.api import chat, projects, insights, uploads, rules, dashboard, templates, metrics, forecast, clarity
 
 api_router = APIRouter()
 
@@ -13,4 +13,7 @@ api_router.include_router(insights.router, prefix="/insights", tags=["Insights"]
 api_router.include_router(uploads.router, prefix="/uploads", tags=["Data Upload"])
 api_router.include_router(rules.router, prefix="/rules", tags=["Business Rules"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
+api_router.include_router(forecast.router, prefix="/forecast", tags=["Forecast"])
+api_router.include_router(clarity.router, prefix="/clarity", tags=["Clarity"])
 api_router.include_router(templates.router, prefix="/templates", tags=["Templates"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
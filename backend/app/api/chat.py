@@ -1,16 +1,36 @@
 """
 Chat API endpoints
 """
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import and_, or_
 from sqlalchemy.orm import Session
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime, timedelta
+import json
+import time
 import uuid
 
-from app.db.database import get_db
+from app.core.metrics import metrics
+from app.db.database import get_db, get_read_db, ReadSessionLocal, SessionLocal
+from app.db.models import ChatHistory
 from app.schemas.schemas import ChatMessage, ChatResponse
 from app.services.chat_service import ChatService
 
 router = APIRouter()
 
+HISTORY_EXPORT_PAGE_SIZE = 1000
+
+HISTORY_COLUMNS = (
+    ChatHistory.id,
+    ChatHistory.session_id,
+    ChatHistory.user_message,
+    ChatHistory.bot_response,
+    ChatHistory.intent,
+    ChatHistory.created_at,
+)
+
 
 @router.post("/message", response_model=ChatResponse)
 async def send_message(message: ChatMessage, db: Session = Depends(get_db)):
@@ -19,31 +39,144 @@ async def send_message(message: ChatMessage, db: Session = Depends(get_db)):
     # Generate session ID if not provided
     session_id = message.session_id or str(uuid.uuid4())
     
-    # Process message
-    chat_service = ChatService(db)
-    response = chat_service.process_message(message.message, session_id)
+    # Process message; the service loads rules/lookups from the DB, so build it off the event loop
+    chat_service = await run_in_threadpool(ChatService, db)
+    response = await chat_service.process_message(message.message, session_id)
     
     return ChatResponse(**response)
 
 
-@router.get("/history/{session_id}")
-async def get_chat_history(session_id: str, db: Session = Depends(get_db)):
-    """Get chat history for a session"""
-    from app.db.models import ChatHistory
+@router.post("/stream")
+async def stream_message(message: ChatMessage):
+    """
+    Send a message to the chat bot and stream the answer as Server-Sent Events
+    (`meta`, `token`..., then `done` or `error`)
+    """
+    start = time.perf_counter()
+    session_id = message.session_id or str(uuid.uuid4())
+    
+    async def event_stream():
+        # The stream outlives the request handler, so it owns its session
+        db = SessionLocal()
+        first_event = True
+        try:
+            chat_service = await run_in_threadpool(ChatService, db)
+            async for event in chat_service.stream_message(message.message, session_id):
+                if first_event:
+                    metrics.observe("chat.stream.ttfb", time.perf_counter() - start)
+                    first_event = False
+                yield f"event: {event['event']}\ndata: {json.dumps(event['data'], default=str)}\n\n"
+            metrics.observe("chat.stream.duration", time.perf_counter() - start)
+        finally:
+            await run_in_threadpool(db.close)
     
-    history = db.query(ChatHistory).filter(
-        ChatHistory.session_id == session_id
-    ).order_by(ChatHistory.created_at).all()
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/history/export")
+def export_chat_history(
+    start: date = Query(..., description="First day to export"),
+    end: date = Query(..., description="Last day to export (inclusive)"),
+    page_size: int = Query(HISTORY_EXPORT_PAGE_SIZE, ge=1, le=10000)
+):
+    """
+    Export every session's chat history in a date range as NDJSON, one
+    message per line. Rows are read one keyset page at a time.
+    """
+    if end < start:
+        raise HTTPException(status_code=400, detail="end must not be before start")
+    
+    def rows():
+        # The stream outlives the request handler, so it owns its session
+        db = ReadSessionLocal()
+        try:
+            query = db.query(*HISTORY_COLUMNS).filter(
+                and_(
+                    ChatHistory.created_at >= datetime.combine(start, datetime.min.time()),
+                    ChatHistory.created_at < datetime.combine(end + timedelta(days=1), datetime.min.time())
+                )
+            )
+            cursor = None
+            while True:
+                page = _history_page(db, query, cursor, page_size)
+                for row in page:
+                    yield json.dumps(_history_message(row, include_session=True), default=str) + "\n"
+                if len(page) < page_size:
+                    break
+                cursor = page[-1].id
+        finally:
+            db.close()
+    
+    filename = f"chat_history_{start.isoformat()}_{end.isoformat()}.ndjson"
+    return StreamingResponse(
+        rows(),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+@router.get("/history/{session_id}")
+def get_chat_history(
+    session_id: str,
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Get chat history for a session, oldest first, one page at a time.
+    Pass `next_cursor` back as `cursor` to get the following page.
+    """
+    query = db.query(*HISTORY_COLUMNS).filter(ChatHistory.session_id == session_id)
+    page = _history_page(db, query, _decode_cursor(cursor), limit + 1)
+    has_more = len(page) > limit
+    page = page[:limit]
     
     return {
         "session_id": session_id,
-        "messages": [
-            {
-                "user": h.user_message,
-                "bot": h.bot_response,
-                "intent": h.intent,
-                "timestamp": h.created_at.isoformat()
-            }
-            for h in history
-        ]
+        "messages": [_history_message(row) for row in page],
+        "next_cursor": str(page[-1].id) if has_more else None
+    }
+
+
+def _history_page(db: Session, query, after_id: Optional[int], limit: int) -> List[Any]:
+    """
+    Next page of `query` in (created_at, id) order after the row `after_id`.
+    The cursor row's own created_at is compared in SQL so the keyset never
+    depends on how timestamps round-trip through the driver.
+    """
+    if after_id is not None:
+        cursor_created_at = db.query(ChatHistory.created_at).filter(
+            ChatHistory.id == after_id
+        ).scalar_subquery()
+        query = query.filter(
+            or_(
+                ChatHistory.created_at > cursor_created_at,
+                and_(ChatHistory.created_at == cursor_created_at, ChatHistory.id > after_id)
+            )
+        )
+    return query.order_by(ChatHistory.created_at, ChatHistory.id).limit(limit).all()
+
+
+def _decode_cursor(cursor: Optional[str]) -> Optional[int]:
+    if cursor is None:
+        return None
+    try:
+        return int(cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _history_message(row: Any, include_session: bool = False) -> Dict[str, Any]:
+    message = {
+        "user": row.user_message,
+        "bot": row.bot_response,
+        "intent": row.intent,
+        "timestamp": row.created_at.isoformat() if row.created_at else None
     }
+    if include_session:
+        message = {"session_id": row.session_id, **message}
+    return message
@@ -0,0 +1,64 @@
+"""
+Clarity plan API endpoints
+"""
+from datetime import date
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, Response
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+
+from app.db.database import get_read_db
+from app.services.clarity_plan import ClarityPlanGenerator, export_plan, plan_weeks
+
+router = APIRouter()
+
+
+def _generate(
+    db: Session,
+    start: Optional[date],
+    weeks: Optional[int],
+    project_ids: Optional[List[int]],
+    team_ids: Optional[List[int]]
+):
+    return ClarityPlanGenerator(db).generate(plan_weeks(db, start, weeks), project_ids, team_ids)
+
+
+@router.get("/plan")
+async def get_clarity_plan(
+    start: Optional[date] = Query(None, description="First week of the plan; the active sprint's start if omitted"),
+    weeks: Optional[int] = Query(None, ge=1, le=52, description="Number of weeks; one PI if omitted"),
+    project_ids: Optional[List[int]] = Query(None),
+    team_ids: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Planned Clarity hours per ITPR, team member and week, generated from
+    story points and the business rules
+    """
+    plan = await run_in_threadpool(_generate, db, start, weeks, project_ids, team_ids)
+    week_columns = [column for column in plan.columns if column[:1].isdigit()]
+    return {
+        "weeks": week_columns,
+        "rows": plan.to_dict("records")
+    }
+
+
+@router.get("/plan/export")
+async def export_clarity_plan(
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    start: Optional[date] = Query(None),
+    weeks: Optional[int] = Query(None, ge=1, le=52),
+    project_ids: Optional[List[int]] = Query(None),
+    team_ids: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_read_db)
+):
+    """Download the generated plan as a Clarity sheet (CSV or XLSX)"""
+    plan = await run_in_threadpool(_generate, db, start, weeks, project_ids, team_ids)
+    content, media_type = await run_in_threadpool(export_plan, plan, format)
+    filename = f"clarity_plan_{date.today().isoformat()}.{format}"
+    return Response(
+        content=content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
@@ -1,53 +1,51 @@
 """
 Dashboard API endpoints
 """
-from fastapi import APIRouter, Depends
+from datetime import datetime, timezone
+from fastapi import APIRouter, Depends, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from app.db.database import get_db
-from app.db.models import Project, Team, TeamMember, UserStory, Sprint, Insight
+from app.db.database import get_read_db
 from app.schemas.schemas import DashboardSummary
+from app.services import dashboard_cache
+from app.services.business_rules import week_of
+from app.services.rule_snapshots import get_snapshot, snapshot_computed_at
 
 router = APIRouter()
 
 
 @router.get("/summary", response_model=DashboardSummary)
-async def get_dashboard_summary(db: Session = Depends(get_db)):
-    """Get dashboard summary statistics"""
+async def get_dashboard_summary(request: Request, response: Response, db: Session = Depends(get_read_db)):
+    """
+    Get dashboard summary statistics. Served from a short-lived cache with an
+    ETag; clients sending a matching If-None-Match get 304 Not Modified.
+    """
+    summary, etag = await run_in_threadpool(dashboard_cache.get_dashboard_summary, db)
     
-    # Count totals
-    total_projects = db.query(Project).count()
-    active_projects = db.query(Project).filter(Project.status == "Active").count()
-    total_sprints = db.query(Sprint).count()
-    total_teams = db.query(Team).count()
-    total_team_members = db.query(TeamMember).filter(TeamMember.is_active == True).count()
-    total_user_stories = db.query(UserStory).count()
-    total_story_points = db.query(func.sum(UserStory.plan_estimate)).scalar() or 0.0
+    if etag in request.headers.get("if-none-match", ""):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": "no-cache"})
     
-    # Get active sprint
-    active_sprint = db.query(Sprint).filter(Sprint.is_active == True).first()
-    active_sprint_name = active_sprint.name if active_sprint else None
-    
-    # Count insights by type
-    insights_by_type = db.query(
-        Insight.insight_type, 
-        func.count(Insight.id)
-    ).filter(
-        Insight.is_resolved == False
-    ).group_by(
-        Insight.insight_type
-    ).all()
-    
-    insights_count = {insight_type: count for insight_type, count in insights_by_type}
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "no-cache"
+    return DashboardSummary(**summary)
+
+
+@router.get("/snapshot")
+def get_rules_snapshot(db: Session = Depends(get_read_db)):
+    """
+    Project overruns, under-utilized teams and forecast risks from the
+    scheduler's precomputed rule snapshot. A plain def, so FastAPI runs the
+    blocking snapshot reads in its threadpool instead of on the event loop.
+    """
+    computed_at = snapshot_computed_at(db)
+    overruns = get_snapshot(db, "project_overrun") or {}
+    utilization = get_snapshot(db, "under_utilization", week_of().isoformat()) or {}
+    forecasts = get_snapshot(db, "forecast") or {}
     
-    return DashboardSummary(
-        total_projects=total_projects,
-        active_projects=active_projects,
-        total_sprints=total_sprints,
-        active_sprint=active_sprint_name,
-        total_teams=total_teams,
-        total_team_members=total_team_members,
-        total_user_stories=total_user_stories,
-        total_story_points=total_story_points,
-        insights_count=insights_count
-    )
+    return {
+        "computed_at": computed_at,
+        "age_seconds": (datetime.now(timezone.utc) - computed_at).total_seconds() if computed_at else None,
+        "overruns": [data for data in overruns.values() if data.get("is_overrun")],
+        "under_utilized": [data for data in utilization.values() if data.get("is_under_utilized")],
+        "forecast_risks": [data for data in forecasts.values() if data.get("risks")]
+    }
@@ -0,0 +1,31 @@
+"""
+Forecast API endpoints
+"""
+from fastapi import APIRouter, Depends, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.db.database import get_read_db
+from app.services.portfolio_forecast import PortfolioForecaster
+
+router = APIRouter()
+
+
+@router.get("/portfolio")
+async def get_portfolio_forecast(
+    project_ids: Optional[List[int]] = Query(None, description="Projects to forecast; all active projects if omitted"),
+    trials: int = Query(
+        None, ge=100, le=100000,
+        description="Trials per project; trials_used is lower only if trials x projects exceeds FORECAST_MAX_CELLS"
+    ),
+    history: int = Query(None, ge=1, le=26, description="Recent iterations sampled for velocity"),
+    seed: Optional[int] = Query(None, description="Fix the random seed for reproducible results"),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Monte Carlo completion forecast for the portfolio: P50/P85/P95 sprints
+    and dates per project, and the chance of finishing by its end date
+    """
+    forecaster = PortfolioForecaster(db, trials=trials, history=history, seed=seed)
+    return await run_in_threadpool(forecaster.forecast, project_ids)
@@ -1,16 +1,18 @@
 """
 Insights API endpoints
 """
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from typing import List, Optional
-from datetime import date
+from datetime import date, datetime, timezone
 
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.db.models import Insight, Project, Team
 from app.schemas.schemas import Insight as InsightSchema, InsightCreate
 from app.services.business_rules import BusinessRulesEngine
+from app.services.dashboard_cache import invalidate_dashboard_summary
+from app.services.insight_engine import InsightEngine
 
 router = APIRouter()
 
@@ -21,7 +23,7 @@ async def get_insights(
     resolved: Optional[bool] = False,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all insights"""
     query = db.query(Insight)
@@ -37,79 +39,56 @@ async def get_insights(
 
 
 @router.get("/generate")
-async def generate_insights(db: Session = Depends(get_db)):
-    """Generate fresh insights"""
-    rules_engine = BusinessRulesEngine(db)
-    generated_insights = []
-    
-    # Generate project overrun insights
-    projects = db.query(Project).filter(Project.status == "Active").all()
-    for project in projects:
-        overrun_data = rules_engine.detect_project_overruns(project.id)
-        if overrun_data.get("is_overrun"):
-            insight = Insight(
-                insight_type="project_overrun",
-                title=f"Project Overrun: {overrun_data['project_name']}",
-                description=f"Project has overrun by {overrun_data['overrun_hours']:.1f} hours ({overrun_data['overrun_percentage']:.1f}%)",
-                severity="warning" if overrun_data['overrun_percentage'] < 20 else "critical",
-                project_id=project.id,
-                data=overrun_data
-            )
-            db.add(insight)
-            generated_insights.append("project_overrun")
-    
-    # Generate under-utilization insights
-    teams = db.query(Team).all()
-    current_week = date.today()
-    
-    for team in teams:
-        util_data = rules_engine.detect_under_utilization(team.id, current_week)
-        if util_data.get("is_under_utilized"):
-            insight = Insight(
-                insight_type="under_utilization",
-                title=f"Team Under-Utilized: {util_data['team_name']}",
-                description=f"Team is only {util_data['utilization_percentage']:.1f}% utilized",
-                severity="info",
-                team_id=team.id,
-                data=util_data
-            )
-            db.add(insight)
-            generated_insights.append("under_utilization")
-    
-    # Generate forecast alerts
-    for project in projects:
-        forecast = rules_engine.forecast_project_completion(project.id)
-        if forecast.get("risks"):
-            insight = Insight(
-                insight_type="forecast_alert",
-                title=f"Forecast Risks: {forecast['project_name']}",
-                description=f"Project has {len(forecast['risks'])} identified risks",
-                severity="warning",
-                project_id=project.id,
-                data=forecast
-            )
-            db.add(insight)
-            generated_insights.append("forecast_alert")
-    
-    db.commit()
+async def generate_insights(full: bool = False, db: Session = Depends(get_db)):
+    """
+    Refresh insights in place. Only projects and teams changed since the last
+    run are recomputed unless `full` is set.
+    """
+    result = InsightEngine(db).refresh(full=full)
+    generated_insights = [insight.insight_type for insight in result["insights"]]
     
     return {
         "message": f"Generated {len(generated_insights)} insights",
         "insights_by_type": {
             insight_type: generated_insights.count(insight_type)
             for insight_type in set(generated_insights)
-        }
+        },
+        "created": result["created"],
+        "updated": result["updated"],
+        "resolved": result["resolved"],
+        "kept_resolved": result["kept_resolved"],
+        "full_refresh": result["full_refresh"]
+    }
+
+
+@router.get("/sprint-overruns")
+def get_sprint_overruns(
+    project_ids: Optional[List[int]] = Query(None),
+    sprints: Optional[List[str]] = Query(None, description="Sprint names; all sprints if omitted"),
+    db: Session = Depends(get_read_db)
+):
+    """Planned vs actual hours per project and sprint, with the sprint's release"""
+    overruns = BusinessRulesEngine(db).detect_sprint_overruns(project_ids, sprints)
+    return {
+        "overruns": [data for by_sprint in overruns.values() for data in by_sprint.values()]
     }
 
 
 @router.patch("/{insight_id}/resolve")
-async def resolve_insight(insight_id: int, db: Session = Depends(get_db)):
+async def resolve_insight(
+    insight_id: int,
+    resolved_by: str = Query("user", description="Who resolved it; the insight stays closed on later refreshes"),
+    db: Session = Depends(get_db)
+):
     """Mark an insight as resolved"""
     insight = db.query(Insight).filter(Insight.id == insight_id).first()
     if not insight:
         raise HTTPException(status_code=404, detail="Insight not found")
     
     insight.is_resolved = True
+    insight.resolved_at = datetime.now(timezone.utc)
+    insight.resolved_by = resolved_by
+    invalidate_dashboard_summary(db)
     db.commit()
     
     return {"message": "Insight resolved", "insight_id": insight_id}
@@ -0,0 +1,22 @@
+"""
+Metrics API endpoints
+"""
+from fastapi import APIRouter
+
+from app.core.metrics import metrics
+from app.services.scheduler import scheduler
+
+router = APIRouter()
+
+
+@router.get("")
+def get_metrics():
+    """In-process counters, timings and gauges (some gauges query the database)"""
+    result = metrics.snapshot()
+    result["scheduler"] = {
+        "last_run": scheduler.last_run,
+        "last_error": scheduler.last_error,
+        "leader": scheduler.is_leader,
+        "interval_seconds": scheduler.interval_seconds
+    }
+    return result
@@ -1,26 +1,54 @@
 """
 Projects API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, distinct, func
+from sqlalchemy.orm import Session, aliased
+from typing import Any, Dict, List
 
-from app.db.database import get_db
-from app.db.models import Project, Epic, Feature, UserStory
+from app.db.database import get_db, get_read_db
+from app.db.models import Project, Epic, Feature, StoryPointRollup
 from app.schemas.schemas import Project as ProjectSchema, ProjectCreate
+from app.services.business_rules import invalidate_lookup_index
+from app.services.change_tracking import record_changes
+from app.services.dashboard_cache import invalidate_dashboard_summary
+from app.services.sp_rollups import ALL
 
 router = APIRouter()
 
+MAX_SUMMARY_IDS = 500
+
 
 @router.get("/", response_model=List[ProjectSchema])
-async def get_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+async def get_projects(skip: int = 0, limit: int = 100, db: Session = Depends(get_read_db)):
     """Get all projects"""
     projects = db.query(Project).offset(skip).limit(limit).all()
     return projects
 
 
+@router.get("/summary")
+async def get_project_summaries(
+    ids: str = Query(..., description="Comma-separated project ids, e.g. 1,2,3"),
+    db: Session = Depends(get_read_db)
+):
+    """Get summaries for many projects in one request (portfolio grid)"""
+    try:
+        project_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="ids must be comma-separated integers")
+    if len(project_ids) > MAX_SUMMARY_IDS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_SUMMARY_IDS} ids per request")
+    
+    summaries = await run_in_threadpool(_project_summaries, db, project_ids)
+    return {
+        "summaries": [summaries[project_id] for project_id in project_ids if project_id in summaries],
+        "not_found": [project_id for project_id in project_ids if project_id not in summaries]
+    }
+
+
 @router.get("/{project_id}", response_model=ProjectSchema)
-async def get_project(project_id: int, db: Session = Depends(get_db)):
+async def get_project(project_id: int, db: Session = Depends(get_read_db)):
     """Get a specific project"""
     project = db.query(Project).filter(Project.id == project_id).first()
     if not project:
@@ -29,38 +57,12 @@ async def get_project(project_id: int, db: Session = Depends(get_db)):
 
 
 @router.get("/{project_id}/summary")
-async def get_project_summary(project_id: int, db: Session = Depends(get_db)):
+async def get_project_summary(project_id: int, db: Session = Depends(get_read_db)):
     """Get project summary with statistics"""
-    project = db.query(Project).filter(Project.id == project_id).first()
-    if not project:
+    summary = _project_summaries(db, [project_id]).get(project_id)
+    if not summary:
         raise HTTPException(status_code=404, detail="Project not found")
-    
-    # Count epics, features, user stories
-    epics = db.query(Epic).filter(Epic.project_id == project_id).all()
-    epic_ids = [e.id for e in epics]
-    
-    features = db.query(Feature).filter(Feature.epic_id.in_(epic_ids)).all() if epic_ids else []
-    feature_ids = [f.id for f in features]
-    
-    user_stories = db.query(UserStory).filter(UserStory.feature_id.in_(feature_ids)).all() if feature_ids else []
-    
-    total_sp = sum(us.plan_estimate for us in user_stories)
-    completed_sp = sum(us.plan_estimate for us in user_stories if us.state in ["Completed", "Accepted"])
-    
-    return {
-        "project": {
-            "id": project.id,
-            "itpr_code": project.itpr_code,
-            "name": project.name,
-            "status": project.status
-        },
-        "epics_count": len(epics),
-        "features_count": len(features),
-        "user_stories_count": len(user_stories),
-        "total_story_points": total_sp,
-        "completed_story_points": completed_sp,
-        "completion_percentage": (completed_sp / total_sp * 100) if total_sp > 0 else 0
-    }
+    return summary
 
 
 @router.post("/", response_model=ProjectSchema)
@@ -68,6 +70,68 @@ async def create_project(project: ProjectCreate, db: Session = Depends(get_db)):
     """Create a new project"""
     db_project = Project(**project.dict())
     db.add(db_project)
+    db.flush()
+    record_changes(db, project_ids=[db_project.id])
+    # The rules engine looks projects up by ITPR code
+    invalidate_lookup_index(db)
+    invalidate_dashboard_summary(db)
     db.commit()
     db.refresh(db_project)
     return db_project
+
+
+def _project_summaries(db: Session, project_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+    """
+    Epic/feature counts and story totals for `project_ids` from one query:
+    the epics and features joined for counting, the story figures from the
+    project's story point rollup. Returns {project_id: summary}.
+    """
+    if not project_ids:
+        return {}
+    
+    rollup = aliased(StoryPointRollup)
+    rows = db.query(
+        Project.id,
+        Project.itpr_code,
+        Project.name,
+        Project.status,
+        func.count(distinct(Epic.id)),
+        func.count(distinct(Feature.id)),
+        func.coalesce(func.max(rollup.story_count), 0),
+        func.coalesce(func.max(rollup.total_sp), 0.0),
+        func.coalesce(func.max(rollup.completed_sp), 0.0)
+    ).outerjoin(
+        Epic, Epic.project_id == Project.id
+    ).outerjoin(
+        Feature, Feature.epic_id == Epic.id
+    ).outerjoin(
+        rollup,
+        and_(
+            rollup.level == "project",
+            rollup.entity_id == Project.id,
+            rollup.team == ALL,
+            rollup.iteration == ALL
+        )
+    ).filter(
+        Project.id.in_(project_ids)
+    ).group_by(
+        Project.id, Project.itpr_code, Project.name, Project.status
+    ).all()
+    
+    summaries = {}
+    for project_id, itpr_code, name, status, epics, features, stories, total_sp, completed_sp in rows:
+        summaries[project_id] = {
+            "project": {
+                "id": project_id,
+                "itpr_code": itpr_code,
+                "name": name,
+                "status": status
+            },
+            "epics_count": epics,
+            "features_count": features,
+            "user_stories_count": stories,
+            "total_story_points": total_sp,
+            "completed_story_points": completed_sp,
+            "completion_percentage": (completed_sp / total_sp * 100) if total_sp > 0 else 0
+        }
+    return summaries
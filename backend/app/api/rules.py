@@ -5,9 +5,10 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from typing import List
 
-from app.db.database import get_db
+from app.db.database import get_db, get_read_db
 from app.db.models import BusinessRule
 from app.schemas.schemas import BusinessRule as RuleSchema, BusinessRuleCreate
+from app.services.dashboard_cache import invalidate_dashboard_summary
 
 router = APIRouter()
 
@@ -16,7 +17,7 @@ router = APIRouter()
 async def get_rules(
     rule_type: str = None,
     active_only: bool = True,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get all business rules"""
     query = db.query(BusinessRule)
@@ -36,6 +37,7 @@ async def create_rule(rule: BusinessRuleCreate, db: Session = Depends(get_db)):
     """Create a new business rule"""
     db_rule = BusinessRule(**rule.dict())
     db.add(db_rule)
+    invalidate_dashboard_summary(db)
     db.commit()
     db.refresh(db_rule)
     return db_rule
@@ -51,6 +53,7 @@ async def update_rule(rule_id: int, rule: BusinessRuleCreate, db: Session = Depe
     for key, value in rule.dict().items():
         setattr(db_rule, key, value)
     
+    invalidate_dashboard_summary(db)
     db.commit()
     db.refresh(db_rule)
     return db_rule
@@ -64,5 +67,6 @@ async def delete_rule(rule_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Rule not found")
     
     db.delete(db_rule)
+    invalidate_dashboard_summary(db)
     db.commit()
     return {"message": "Rule deleted"}
@@ -2,47 +2,70 @@
 File upload API endpoints
 """
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-import os
-import shutil
 
 from app.db.database import get_db
 from app.core.config import settings
-from app.schemas.schemas import FileUploadResponse
-from app.services.data_processor import DataProcessor
+from app.db.models import ImportJob
+from app.schemas.schemas import FileUploadResponse, ImportJobStatus
+from app.services import import_jobs
 
 router = APIRouter()
 
 
-@router.post("/user-stories", response_model=FileUploadResponse)
+@router.post("/user-stories", response_model=FileUploadResponse, status_code=202)
 async def upload_user_stories(file: UploadFile = File(...), db: Session = Depends(get_db)):
     """Upload user stories CSV from Rally"""
     return await _process_upload(file, "user_stories", db)
 
 
-@router.post("/features", response_model=FileUploadResponse)
+@router.post("/features", response_model=FileUploadResponse, status_code=202)
 async def upload_features(file: UploadFile = File(...), db: Session = Depends(get_db)):
     """Upload features CSV from Rally"""
     return await _process_upload(file, "features", db)
 
 
-@router.post("/epics", response_model=FileUploadResponse)
+@router.post("/epics", response_model=FileUploadResponse, status_code=202)
 async def upload_epics(file: UploadFile = File(...), db: Session = Depends(get_db)):
     """Upload epics CSV from Rally"""
     return await _process_upload(file, "epics", db)
 
 
-@router.post("/clarity-timesheet", response_model=FileUploadResponse)
+@router.post("/clarity-timesheet", response_model=FileUploadResponse, status_code=202)
 async def upload_clarity_timesheet(file: UploadFile = File(...), db: Session = Depends(get_db)):
     """Upload Clarity timesheet CSV"""
     return await _process_upload(file, "clarity_timesheet", db)
 
 
-async def _process_upload(file: UploadFile, file_type: str, db: Session) -> FileUploadResponse:
-    """Process uploaded file"""
+@router.post("/bundle", response_model=FileUploadResponse, status_code=202)
+async def upload_bundle(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    """Upload a zip of Rally/Clarity exports, imported together in one transaction"""
+    return await _process_upload(file, "bundle", db, extensions=('.zip',))
+
+
+@router.get("/jobs/{job_id}", response_model=ImportJobStatus)
+async def get_import_job(job_id: int, db: Session = Depends(get_db)):
+    """Get progress of a background import job"""
+    # Polled right after the upload, so read from the primary to avoid replica lag
+    job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return import_jobs.get_job_status(job)
+
+
+async def _process_upload(
+    file: UploadFile,
+    file_type: str,
+    db: Session,
+    extensions: tuple = ('.csv', '.xlsx', '.xls')
+) -> FileUploadResponse:
+    """Queue uploaded file for background import"""
     
     # Validate file extension
-    if not file.filename.endswith(('.csv', '.xlsx', '.xls')):
+    if not file.filename.endswith(extensions):
+        if file_type == "bundle":
+            raise HTTPException(status_code=400, detail="Bundles must be uploaded as a zip file")
         raise HTTPException(status_code=400, detail="Only CSV and Excel files are supported")
     
     # Check file size
@@ -56,44 +79,20 @@ async def _process_upload(file: UploadFile, file_type: str, db: Session) -> File
             detail=f"File too large. Maximum size: {settings.MAX_UPLOAD_SIZE / 1024 / 1024}MB"
         )
     
-    # Save file temporarily
-    file_path = os.path.join(settings.UPLOAD_DIR, file.filename)
-    
     try:
-        with open(file_path, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Process file
-        processor = DataProcessor(db)
-        
-        if file_type == "user_stories":
-            result = processor.process_user_stories(file_path)
-        elif file_type == "features":
-            result = processor.process_features(file_path)
-        elif file_type == "epics":
-            result = processor.process_epics(file_path)
-        elif file_type == "clarity_timesheet":
-            result = processor.process_clarity_timesheet(file_path)
-        else:
-            raise HTTPException(status_code=400, detail="Invalid file type")
-        
-        if not result.get("success"):
-            raise HTTPException(status_code=400, detail=result.get("error", "Processing failed"))
+        # Storing the upload is blocking file I/O, keep it off the event loop
+        job = await run_in_threadpool(import_jobs.submit_import, db, file_type, file.file, file.filename)
         
         return FileUploadResponse(
             filename=file.filename,
             file_type=file_type,
-            rows_processed=result.get("rows_processed", 0),
-            status="success",
-            message=f"Successfully processed {result.get('rows_processed', 0)} rows"
+            rows_processed=0,
+            status="queued",
+            message=f"Import queued as job {job.id}",
+            job_id=job.id
         )
     
-    except HTTPException:
-        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
-    
-    finally:
-        # Clean up temporary file
-        if os.path.exists(file_path):
-            os.remove(file_path)
@@ -0,0 +1,221 @@
+"""
+Database management commands, run once per deployment rather than by every
+worker at startup:
+
+    python -m app.cli migrate    # apply Alembic migrations
+    python -m app.cli seed       # load sample data into an empty database
+    python -m app.cli init       # both, then backfill rollups and the sprint calendar if empty
+    python -m app.cli rollups    # rebuild story point rollups from scratch
+    python -m app.cli calendar   # regenerate the sprint calendar
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.db.database import SessionLocal, engine
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).parent.parent
+BASELINE_REVISION = "0001"
+
+# Before migrations existed every app version created its schema with
+# create_all at startup. (revision, table, column/index/constraint or None
+# for the table itself): the newest revision whose object exists is the
+# version that created an unversioned database.
+SCHEMA_MARKERS = [
+    ("0001", "projects", None),
+    ("0002", "team_allocations", "uq_team_allocation_member_project_week"),
+    ("0003", "import_checkpoints", None),
+    ("0004", "import_jobs", None),
+    ("0005", "insight_runs", None),
+    ("0006", "rule_snapshots", None),
+    ("0007", "chat_history", "parameters"),
+    ("0008", "chat_history", "ix_chat_history_session_created"),
+    ("0009", "user_stories", "ix_user_stories_feature_team"),
+]
+DB_LOCK_ID = 72_710_001  # pg_advisory_lock key held while migrating, seeding or rebuilding
+
+
+def alembic_config() -> Config:
+    """Alembic config that works from any working directory"""
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "migrations"))
+    config.attributes["configure_logger"] = False
+    return config
+
+
+def migrate(revision: str = "head") -> None:
+    """
+    Upgrade the schema to `revision`. A database built by the old
+    create_all-at-startup code is first stamped with the revision matching
+    the schema it has (see SCHEMA_MARKERS).
+    """
+    config = alembic_config()
+    with _db_lock():
+        inspector = inspect(engine)
+        tables = set(inspector.get_table_names())
+        if "projects" in tables and "alembic_version" not in tables:
+            existing = _unversioned_revision(inspector)
+            logger.info(f"Existing schema without migration history, stamping {existing}")
+            command.stamp(config, existing)
+        command.upgrade(config, revision)
+
+
+def _unversioned_revision(inspector) -> str:
+    """Newest revision whose schema objects an unversioned database already has"""
+    tables = set(inspector.get_table_names())
+    existing = BASELINE_REVISION
+    for revision, table, name in SCHEMA_MARKERS:
+        if table not in tables:
+            break
+        if name is not None and name not in (
+            [column["name"] for column in inspector.get_columns(table)]
+            + [index["name"] for index in inspector.get_indexes(table)]
+            + [constraint["name"] for constraint in inspector.get_unique_constraints(table)]
+        ):
+            break
+        existing = revision
+    return existing
+
+
+def seed() -> dict:
+    """Seed sample data if the database is empty, one process at a time"""
+    from app.services.seed_data import seed_database
+
+    with _db_lock():
+        db = SessionLocal()
+        try:
+            result = seed_database(db)
+        finally:
+            db.close()
+
+    if result.get("seeded"):
+        logger.info("Database seeded with sample data")
+    else:
+        logger.info(f"Seeding skipped: {result.get('reason', result.get('error', 'Unknown'))}")
+    return result
+
+
+def rollups(only_if_empty: bool = False) -> int:
+    """
+    Rebuild the story point rollups. With `only_if_empty`, skip unless
+    stories exist but no rollups do, e.g. right after the rollup migration.
+    """
+    from app.db.models import StoryPointRollup, UserStory
+    from app.services.sp_rollups import rebuild_rollups
+
+    with _db_lock():
+        db = SessionLocal()
+        try:
+            if only_if_empty and (
+                db.query(StoryPointRollup.id).first() is not None or db.query(UserStory.id).first() is None
+            ):
+                return 0
+            rows = rebuild_rollups(db)
+            db.commit()
+        finally:
+            db.close()
+
+    logger.info(f"Rebuilt {rows} story point rollups")
+    return rows
+
+
+def calendar(only_if_empty: bool = False) -> int:
+    """
+    Regenerate the sprint calendar. With `only_if_empty`, skip unless
+    sprints exist but the calendar is empty, e.g. right after its migration.
+    """
+    from app.db.models import Sprint, SprintCalendar
+    from app.services.sprint_calendar import rebuild_calendar
+
+    with _db_lock():
+        db = SessionLocal()
+        try:
+            if only_if_empty and (
+                db.query(SprintCalendar.id).first() is not None or db.query(Sprint.id).first() is None
+            ):
+                return 0
+            rows = rebuild_calendar(db)
+            db.commit()
+        finally:
+            db.close()
+
+    logger.info(f"Regenerated {rows} sprint calendar days")
+    return rows
+
+
+@contextmanager
+def _db_lock():
+    """
+    Hold a cross-process lock while migrating, seeding or rebuilding: a
+    PostgreSQL advisory lock, or an exclusive lock on a file next to a SQLite
+    database. A second `init` (another container starting) waits, then finds
+    the schema current and the data already loaded and skips.
+    """
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": DB_LOCK_ID})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": DB_LOCK_ID})
+        return
+
+    try:
+        import fcntl
+    except ImportError:  # Windows: no fcntl, run unguarded
+        yield
+        return
+
+    database = make_url(settings.DATABASE_URL).database
+    if database and database != ":memory:":
+        lock_path = f"{database}.init.lock"
+    else:
+        lock_path = os.path.join(tempfile.gettempdir(), "pmo-init.lock")
+    with open(lock_path, "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.cli", description="PMO database management")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = subcommands.add_parser("migrate", help="Apply database migrations")
+    migrate_parser.add_argument("--revision", default="head", help="Target revision (default: head)")
+    subcommands.add_parser("seed", help="Load sample data into an empty database")
+    subcommands.add_parser("init", help="Migrate, then seed")
+    subcommands.add_parser("rollups", help="Rebuild story point rollups")
+    subcommands.add_parser("calendar", help="Regenerate the sprint calendar")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    if args.command in ("migrate", "init"):
+        migrate(getattr(args, "revision", "head"))
+    if args.command in ("seed", "init"):
+        result = seed()
+        if result.get("error"):
+            return 1
+    if args.command in ("rollups", "init"):
+        rollups(only_if_empty=args.command == "init")
+    if args.command in ("calendar", "init"):
+        calendar(only_if_empty=args.command == "init")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -16,10 +16,32 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URL: str = "sqlite:///./pmo.db"  # Default to SQLite for easy setup
+    DB_ECHO: bool = False  # Log every SQL statement (independent of DEBUG)
+    DB_POOL_SIZE: int = 5  # Connections kept open per process
+    DB_MAX_OVERFLOW: int = 10  # Extra connections allowed above the pool size
+    DB_POOL_TIMEOUT: int = 30  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Seconds before a connection is replaced
+    DB_POOL_PRE_PING: bool = True  # Check connections before use
+    DB_STATEMENT_TIMEOUT_MS: int = 30000  # PostgreSQL statement_timeout, 0 disables
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # How long SQLite waits for a write lock
+    DATABASE_READ_URL: str = ""  # Optional read replica for read-only endpoints
     
     # OpenAI
     OPENAI_API_KEY: str = ""
     OPENAI_MODEL: str = "gpt-4-turbo-preview"
+    OPENAI_BASE_URL: str = ""  # Override the API endpoint, e.g. a local stub server
+    OPENAI_TIMEOUT_SECONDS: float = 30.0
+    OPENAI_MAX_CONNECTIONS: int = 100  # Pooled HTTP connections shared by all chats
+    
+    # Intent classification
+    INTENT_CACHE_SIZE: int = 1024  # Normalized messages kept in the intent cache
+    INTENT_CACHE_TTL_SECONDS: int = 3600
+    INTENT_CONFIDENCE_THRESHOLD: float = 0.7  # Below this the LLM classifies the message
+    
+    # Chat session context
+    CHAT_SESSION_CACHE_SIZE: int = 1000  # Sessions kept in memory per process
+    CHAT_CONTEXT_TURNS: int = 10  # Recent turns kept per session
+    CHAT_CONTEXT_TOKEN_BUDGET: int = 2000  # Max prompt tokens for the general answer
     
     # Security
     SECRET_KEY: str = "dev-secret-key-change-in-production"
@@ -42,12 +64,35 @@ class Settings(BaseSettings):
     # File Upload
     MAX_UPLOAD_SIZE: int = 52428800  # 50MB
     UPLOAD_DIR: str = "uploads"
+    IMPORT_BATCH_SIZE: int = 1000  # Rows per bulk insert/update statement
+    IMPORT_CHUNK_SIZE: int = 10000  # Rows read and committed per import chunk
+    IMPORT_WORKERS: int = 2  # Background import jobs running at once per process
+    IMPORT_LOCK_CHECK_SECONDS: int = 30  # How often the PostgreSQL job lock connection is checked
+    IMPORT_PARSE_WORKERS: int = 4  # Threads parsing files of a bundle import in parallel
+    IMPORT_PARALLEL_MIN_BYTES: int = 5242880  # 5MB; smaller bundles are parsed inline
+    IMPORT_PARSE_PROCESSES: bool = False  # Parse bundles in spawned processes (~120MB RSS each) instead of threads
+    IMPORT_PARSE_MEMORY_MB: int = 256  # Memory budget for parse processes; caps how many are started
+    MAX_BUNDLE_SIZE: int = 524288000  # 500MB; cap on the uncompressed size of a zip bundle
     
     # Business Rules (defaults)
     DEFAULT_STORY_POINT_HOURS: int = 13
     DEFAULT_SPRINT_WEEKS: int = 2
     DEFAULT_WORKING_DAYS_PER_WEEK: int = 5
     DEFAULT_HOURS_PER_DAY: int = 8
+    RULES_LOOKUP_TTL_SECONDS: int = 300  # Max age of the rules engine lookup snapshot
+    
+    # Forecasting
+    FORECAST_TRIALS: int = 10000  # Monte Carlo trials per portfolio forecast
+    FORECAST_HISTORY_SPRINTS: int = 6  # Recent completed iterations sampled for velocity
+    FORECAST_MAX_SPRINTS: int = 52  # Horizon; later completions are reported as unknown
+    FORECAST_MAX_CELLS: int = 5_000_000  # Cap on trials x projects per forecast; trials are reduced to fit
+    
+    # Scheduler
+    SCHEDULER_ENABLED: bool = True  # Workers elect one runner via a database/file lock
+    SNAPSHOT_REFRESH_SECONDS: int = 900  # Interval between rule snapshot / insight refreshes
+    
+    # Caching
+    DASHBOARD_CACHE_TTL_SECONDS: int = 60  # Max age of the cached dashboard summary
     
     class Config:
         env_file = ".env"
@@ -0,0 +1,91 @@
+"""
+In-process application metrics
+Counters, timings and callback gauges kept in memory per process and
+exposed as JSON by /api/metrics.
+"""
+import threading
+from collections import deque
+from typing import Dict, Any, Callable, Optional
+
+# Timing samples kept per metric for percentiles
+TIMING_WINDOW = 1000
+
+
+class MetricsRegistry:
+    """Thread-safe registry of counters, timings and gauges"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, float] = {}
+        self._timings: Dict[str, Dict[str, Any]] = {}
+        self._gauges: Dict[str, Callable[[], Any]] = {}
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Add `value` to a counter"""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Record a duration in seconds"""
+        with self._lock:
+            timing = self._timings.setdefault(
+                name, {"count": 0, "total": 0.0, "max": 0.0, "samples": deque(maxlen=TIMING_WINDOW)}
+            )
+            timing["count"] += 1
+            timing["total"] += seconds
+            timing["max"] = max(timing["max"], seconds)
+            timing["samples"].append(seconds)
+
+    def counter(self, name: str) -> float:
+        """Current value of a counter"""
+        with self._lock:
+            return self._counters.get(name, 0)
+
+    def snapshot_timing(self, name: str) -> Optional[Dict[str, float]]:
+        """Summary of one timing, None if nothing was recorded"""
+        with self._lock:
+            timing = self._timings.get(name)
+            return self._summarize(timing) if timing else None
+
+    def register_gauge(self, name: str, callback: Callable[[], Any]) -> None:
+        """Register a gauge whose value is computed when metrics are read"""
+        with self._lock:
+            self._gauges[name] = callback
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current value of every metric"""
+        with self._lock:
+            counters = dict(self._counters)
+            timings = {
+                name: self._summarize(timing)
+                for name, timing in self._timings.items()
+            }
+            gauges = dict(self._gauges)
+
+        gauge_values = {}
+        for name, callback in gauges.items():
+            try:
+                gauge_values[name] = callback()
+            except Exception:
+                gauge_values[name] = None
+                counters[f"{name}.errors"] = counters.get(f"{name}.errors", 0) + 1
+
+        return {"counters": counters, "timings": timings, "gauges": gauge_values}
+
+    @staticmethod
+    def _summarize(timing: Dict[str, Any]) -> Dict[str, float]:
+        samples = sorted(timing["samples"])
+
+        def percentile(p: float) -> float:
+            return samples[min(len(samples) - 1, int(p * len(samples)))] if samples else 0.0
+
+        return {
+            "count": timing["count"],
+            "avg_ms": round(timing["total"] / timing["count"] * 1000, 3) if timing["count"] else 0.0,
+            "p50_ms": round(percentile(0.50) * 1000, 3),
+            "p95_ms": round(percentile(0.95) * 1000, 3),
+            "max_ms": round(timing["max"] * 1000, 3),
+        }
+
+
+metrics = MetricsRegistry()
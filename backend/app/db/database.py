@@ -1,29 +1,152 @@
 """
 Database configuration and session management
 """
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from fastapi import Request
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
 from app.core.config import settings
+from app.core.metrics import metrics
+
+
+def create_database_engine(url: str) -> Engine:
+    """
+    Engine with the configured pool. SQLite files run in WAL mode so readers
+    don't block on the writer; PostgreSQL gets a server-side statement timeout.
+    """
+    is_sqlite = url.startswith("sqlite")
+    is_memory = is_sqlite and (":memory:" in url or url.rstrip("/") == "sqlite:")
+
+    connect_args = {}
+    if is_sqlite:
+        connect_args["check_same_thread"] = False
+    elif url.startswith("postgresql") and settings.DB_STATEMENT_TIMEOUT_MS:
+        connect_args["options"] = f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"
+
+    pool_args = {}
+    if not is_memory:
+        pool_args = {
+            "poolclass": QueuePool,
+            "pool_size": settings.DB_POOL_SIZE,
+            "max_overflow": settings.DB_MAX_OVERFLOW,
+            "pool_timeout": settings.DB_POOL_TIMEOUT,
+            "pool_recycle": settings.DB_POOL_RECYCLE,
+            "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        }
+
+    db_engine = create_engine(url, connect_args=connect_args, echo=settings.DB_ECHO, **pool_args)
+
+    if is_sqlite and not is_memory:
+        event.listen(db_engine, "connect", _set_sqlite_pragmas)
+
+    return db_engine
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    """Pragmas for concurrent readers alongside a single writer"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL, far fewer fsyncs
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-64000")  # 64MB page cache per connection
+    cursor.close()
+
+
+def register_pool_metrics(db_engine: Engine, name: str) -> None:
+    """Export pool usage of `db_engine` as gauges prefixed with `name`"""
+    pool = db_engine.pool
+    if not isinstance(pool, QueuePool):
+        return
+    metrics.register_gauge(f"{name}.size", pool.size)
+    metrics.register_gauge(f"{name}.checked_out", pool.checkedout)
+    metrics.register_gauge(f"{name}.checked_in", pool.checkedin)
+    metrics.register_gauge(f"{name}.overflow", lambda: max(0, pool.overflow()))
+
 
 # Create database engine
-engine = create_engine(
-    settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.DEBUG
-)
+engine = create_database_engine(settings.DATABASE_URL)
+register_pool_metrics(engine, "db.pool")
 
-# Create session factory
+# Replica for read-only endpoints; without one, reads share the primary
+if settings.DATABASE_READ_URL:
+    read_engine = create_database_engine(settings.DATABASE_READ_URL)
+    register_pool_metrics(read_engine, "db.read_pool")
+else:
+    read_engine = engine
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from the replica and writes to the primary. Once it
+    flushes or executes DML it stays on the primary, so it reads its own
+    writes. Lag-sensitive callers can call `use_primary()` up front.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.primary_only = False
+
+    def use_primary(self) -> "RoutingSession":
+        self.primary_only = True
+        return self
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.primary_only = True
+        return engine if self.primary_only else read_engine
+
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False)
 
 # Create base class for models
 Base = declarative_base()
 
+# Request header that makes a read endpoint query the primary
+READ_PRIMARY_HEADER = "x-read-primary"
+
 
 def get_db():
-    """Dependency to get database session"""
-    db = SessionLocal()
+    """
+    Dependency to get a database session on the primary. Use it for every
+    endpoint that writes, and for reads that must see a write immediately.
+    """
+    yield from _checked_out(SessionLocal())
+
+
+def get_read_db(request: Request):
+    """
+    Dependency to get a session for read-only endpoints, routed to the read
+    replica when DATABASE_READ_URL is set. Clients that just wrote can send
+    `X-Read-Primary: true` to read from the primary instead.
+    """
+    db = ReadSessionLocal()
+    if request.headers.get(READ_PRIMARY_HEADER, "").lower() in ("1", "true", "yes"):
+        db.use_primary()
+    yield from _checked_out(db)
+
+
+def _checked_out(db: Session):
+    """
+    Yield `db` with its connection checked out up front so pool wait time
+    and exhaustion are recorded
+    """
+    start = time.perf_counter()
     try:
+        try:
+            db.connection()
+        except PoolTimeoutError:
+            metrics.increment("db.pool.timeouts")
+            raise
+        metrics.observe("db.pool.checkout", time.perf_counter() - start)
         yield db
     finally:
         db.close()
+        metrics.observe("db.session.duration", time.perf_counter() - start)
@@ -1,7 +1,7 @@
 """
 Database models for PMO application
 """
-from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, JSON, Date
+from sqlalchemy import Column, Integer, String, Float, DateTime, ForeignKey, Text, Boolean, JSON, Date, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.db.database import Base
@@ -70,6 +70,9 @@ class Feature(Base):
 class UserStory(Base):
     """User Story model"""
     __tablename__ = "user_stories"
+    __table_args__ = (
+        Index("ix_user_stories_feature_team", "feature_id", "team"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     formatted_id = Column(String, unique=True, index=True, nullable=False)
@@ -148,6 +151,14 @@ class TeamMember(Base):
 class TeamAllocation(Base):
     """Team allocation to projects (from Clarity)"""
     __tablename__ = "team_allocations"
+    __table_args__ = (
+        UniqueConstraint(
+            "team_member_id", "project_id", "week_start_date",
+            name="uq_team_allocation_member_project_week"
+        ),
+        Index("ix_team_allocations_project_week", "project_id", "week_start_date"),
+        Index("ix_team_allocations_team_week", "team_id", "week_start_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     team_id = Column(Integer, ForeignKey("teams.id"))
@@ -167,6 +178,14 @@ class TeamAllocation(Base):
 class TimeEntry(Base):
     """Actual time entries from Clarity"""
     __tablename__ = "time_entries"
+    __table_args__ = (
+        UniqueConstraint(
+            "team_member_id", "project_id", "week_start_date",
+            name="uq_time_entry_member_project_week"
+        ),
+        Index("ix_time_entries_project_week", "project_id", "week_start_date"),
+        Index("ix_time_entries_member_week", "team_member_id", "week_start_date"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     team_member_id = Column(Integer, ForeignKey("team_members.id"))
@@ -196,6 +215,27 @@ class Sprint(Base):
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
 
+class SprintCalendar(Base):
+    """
+    Date -> sprint -> release lookup (Module2.vba Sprint_ClarityWeek), one
+    row per day a sprint covers so week_start_date columns join it on
+    equality whatever weekday their weeks start on. Regenerated from the
+    sprints table whenever sprints change (see app/services/sprint_calendar.py).
+    """
+    __tablename__ = "sprint_calendar"
+    __table_args__ = (
+        UniqueConstraint("day", "sprint_id", name="uq_sprint_calendar_day_sprint"),
+        Index("ix_sprint_calendar_sprint_day", "sprint_name", "day"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    day = Column(Date, nullable=False, index=True)
+    week_start = Column(Date, nullable=False)  # Monday of the Clarity week
+    sprint_id = Column(Integer, nullable=False)
+    sprint_name = Column(String, nullable=False)
+    release = Column(String, nullable=False)
+
+
 class BusinessRule(Base):
     """Configurable business rules"""
     __tablename__ = "business_rules"
@@ -223,7 +263,11 @@ class Insight(Base):
     project_id = Column(Integer, ForeignKey("projects.id"), nullable=True)
     team_id = Column(Integer, ForeignKey("teams.id"), nullable=True)
     data = Column(JSON)  # Additional insight data
+    period = Column(String)  # Period the insight covers, e.g. week start for utilization
+    insight_key = Column(String, unique=True, index=True)  # insight_type:scope:period, regenerated in place
     is_resolved = Column(Boolean, default=False)
+    resolved_at = Column(DateTime(timezone=True))
+    resolved_by = Column(String)  # Who resolved it; only insights the insight engine resolved are reopened
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -235,11 +279,122 @@ class Insight(Base):
 class ChatHistory(Base):
     """Chat conversation history"""
     __tablename__ = "chat_history"
+    __table_args__ = (
+        Index("ix_chat_history_session_created", "session_id", "created_at"),
+        Index("ix_chat_history_created_at", "created_at"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     session_id = Column(String, index=True, nullable=False)
     user_message = Column(Text, nullable=False)
     bot_response = Column(Text, nullable=False)
     intent = Column(String)
+    parameters = Column(JSON)  # Intent parameters after slot filling, e.g. project and sprint
     context = Column(JSON)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class ImportCheckpoint(Base):
+    """Progress of a chunked file import, used to resume failed imports"""
+    __tablename__ = "import_checkpoints"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    file_type = Column(String, nullable=False)
+    file_hash = Column(String, index=True, nullable=False)  # SHA-256 of the file contents
+    filename = Column(String)
+    status = Column(String, default="in_progress")  # in_progress, failed, completed
+    rows_committed = Column(Integer, default=0)  # Rows read from the file so far
+    chunks_committed = Column(Integer, default=0)
+    rows_processed = Column(Integer, default=0)
+    rows_skipped = Column(Integer, default=0)
+    error = Column(Text)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class ImportJob(Base):
+    """Background file import job"""
+    __tablename__ = "import_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    file_type = Column(String, nullable=False)
+    filename = Column(String)
+    file_path = Column(String)  # Spooled copy of the upload, removed when the job ends
+    status = Column(String, default="queued", index=True)  # queued, running, completed, failed
+    rows_processed = Column(Integer, default=0)
+    rows_skipped = Column(Integer, default=0)
+    error = Column(Text)
+    started_at = Column(DateTime(timezone=True))
+    finished_at = Column(DateTime(timezone=True))
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+
+class DataChange(Base):
+    """Project/team touched by an import, consumed by incremental recomputation"""
+    __tablename__ = "data_changes"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    entity = Column(String, nullable=False)  # project, team
+    entity_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class InsightRun(Base):
+    """Record of an insight refresh and the change watermark it processed"""
+    __tablename__ = "insight_runs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    watermark = Column(Integer, default=0)  # Highest DataChange id included
+    week_start = Column(Date)
+    rules_signature = Column(String)
+    full_refresh = Column(Boolean, default=False)
+    projects_recomputed = Column(Integer, default=0)
+    teams_recomputed = Column(Integer, default=0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class RuleSnapshot(Base):
+    """Materialized rules engine result for one project or team, refreshed by the scheduler"""
+    __tablename__ = "rule_snapshots"
+    __table_args__ = (
+        UniqueConstraint("snapshot_type", "entity_id", name="uq_rule_snapshot_type_entity"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    snapshot_type = Column(String, nullable=False)  # project_overrun, under_utilization, forecast
+    entity_id = Column(Integer, nullable=False)  # Project id, or team id for under_utilization
+    period = Column(String)  # Week start for under_utilization
+    data = Column(JSON)
+    computed_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class StoryPointRollup(Base):
+    """
+    Story point totals for a feature, epic or project, per team and iteration.
+    "*" in team or iteration marks the total over all of them. Maintained by
+    imports (see app/services/sp_rollups.py).
+    """
+    __tablename__ = "story_point_rollups"
+    __table_args__ = (
+        UniqueConstraint("level", "entity_id", "team", "iteration", name="uq_sp_rollup_entity_team_iteration"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    level = Column(String, nullable=False)  # feature, epic, project
+    entity_id = Column(Integer, nullable=False)
+    team = Column(String, nullable=False)  # "" for stories without a team
+    iteration = Column(String, nullable=False)  # "" for stories without an iteration
+    story_count = Column(Integer, default=0)
+    total_sp = Column(Float, default=0.0)
+    completed_sp = Column(Float, default=0.0)
+    defect_sp = Column(Float, default=0.0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class CacheVersion(Base):
+    """Version of a per-process cache, bumped by the writes that make it stale"""
+    __tablename__ = "cache_versions"
+    
+    name = Column(String, primary_key=True)  # lookup_index, dashboard_summary
+    version = Column(Integer, nullable=False, default=0)
@@ -2,14 +2,13 @@
 PMO Operations Solution - Main FastAPI Application
 """
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import logging
 
 from app.core.config import settings
 from app.api import api_router
-from app.db.database import engine
-from app.db import models
 
 # Configure logging
 logging.basicConfig(
@@ -18,9 +17,6 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Create database tables
-models.Base.metadata.create_all(bind=engine)
-
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
@@ -34,21 +30,43 @@ app = FastAPI(
 
 @app.on_event("startup")
 async def startup_event():
-    """Run startup tasks"""
+    """
+    Run startup tasks. Schema migrations and seeding are not done here;
+    run `python -m app.cli init` once per deployment instead.
+    """
     logger.info("🚀 Starting PMO Operations Solution...")
     
-    # Seed database with sample data if empty
-    from app.db.database import SessionLocal
-    from app.services.seed_data import check_and_seed_on_startup
+    # Precompute rule results and insights in the background
+    if settings.SCHEDULER_ENABLED:
+        from app.services.scheduler import scheduler
+        
+        scheduler.start()
+    
+    # Resume or fail import jobs whose worker died with a previous process
+    from app.services import import_jobs
     
-    db = SessionLocal()
     try:
-        check_and_seed_on_startup(db)
-    finally:
-        db.close()
+        requeued = await run_in_threadpool(import_jobs.recover_orphaned_jobs)
+        if requeued:
+            logger.info(f"Requeued {requeued} interrupted import job(s)")
+    except Exception as e:
+        logger.error(f"Could not recover interrupted import jobs: {e}")
     
     logger.info("✅ Application startup complete")
 
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Run shutdown tasks"""
+    from app.services import import_jobs
+    from app.services.scheduler import scheduler
+    
+    from app.services.llm_client import close_openai_client
+    
+    scheduler.stop()
+    import_jobs.shutdown()
+    await close_openai_client()
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -159,6 +159,8 @@ class InsightCreate(InsightBase):
 class Insight(InsightBase):
     id: int
     is_resolved: bool
+    resolved_at: Optional[datetime] = None
+    resolved_by: Optional[str] = None
     created_at: datetime
     
     class Config:
@@ -183,6 +185,21 @@ class FileUploadResponse(BaseModel):
     rows_processed: int
     status: str
     message: str
+    job_id: Optional[int] = None
+
+
+class ImportJobStatus(BaseModel):
+    id: int
+    file_type: str
+    filename: Optional[str] = None
+    status: str
+    rows_processed: int
+    rows_skipped: int
+    throughput_rows_per_second: float
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
 
 
 class DashboardSummary(BaseModel):
@@ -1 +1,4 @@
 # Services package
+
+# Registers the listeners that regenerate the sprint calendar when sprints change
+from app.services import sprint_calendar  # noqa: F401
@@ -1,17 +1,104 @@
 """
 Business Rules Engine - Extracted from VBA logic
 """
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import date, timedelta
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, func
+from sqlalchemy import and_, func, literal, select, union_all
 import pandas as pd
+import threading
+import time
 
 from app.db.models import (
-    Project, UserStory, Feature, Epic, TeamMember, 
-    Team, TeamAllocation, TimeEntry, Sprint, BusinessRule
+    Project, TeamMember,
+    Team, TeamAllocation, TimeEntry, Sprint, SprintCalendar, BusinessRule
 )
 from app.core.config import settings
+from app.services.sp_rollups import get_rollup, get_rollups, get_iteration_rollups
+from app.services.cache_versions import LOOKUP_INDEX, get_version, bump_version
+
+
+def week_of(day: Optional[date] = None) -> date:
+    """
+    Monday of the week containing `day` (default today): the period key of
+    weekly results, stable for the whole week. Clarity weeks can start on
+    any weekday inside it.
+    """
+    day = day or date.today()
+    return day - timedelta(days=day.weekday())
+
+
+class LookupIndex:
+    """
+    In-memory snapshot of the team, member and project lookups used by the
+    rules engine, loaded with a handful of queries instead of one per call.
+    `version` is the shared LOOKUP_INDEX version read before loading.
+    """
+    
+    def __init__(self, db: Session, version: int = 0):
+        self.loaded_at = time.monotonic()
+        self.version = version
+        
+        self.team_ids = dict(db.query(Team.name, Team.id).all())
+        self.team_names = {team_id: name for name, team_id in self.team_ids.items()}
+        self.project_ids = dict(db.query(Project.itpr_code, Project.id).all())
+        
+        # Active member count and summed allocation percentage per team
+        self.active_member_counts = {}
+        self.allocation_totals = {}
+        team_stats = db.query(
+            TeamMember.team_id,
+            func.count(TeamMember.id),
+            func.sum(TeamMember.allocation_percentage)
+        ).filter(
+            TeamMember.is_active == True
+        ).group_by(
+            TeamMember.team_id
+        ).all()
+        for team_id, member_count, allocation_total in team_stats:
+            self.active_member_counts[team_id] = member_count
+            self.allocation_totals[team_id] = allocation_total or 0.0
+        
+        # member id -> (team_id, allocation_percentage)
+        self.members = {
+            member_id: (team_id, allocation_percentage)
+            for member_id, team_id, allocation_percentage in db.query(
+                TeamMember.id, TeamMember.team_id, TeamMember.allocation_percentage
+            ).all()
+        }
+    
+    def is_expired(self) -> bool:
+        return time.monotonic() - self.loaded_at > settings.RULES_LOOKUP_TTL_SECONDS
+
+
+_lookup_index: Optional[LookupIndex] = None
+_lookup_lock = threading.Lock()
+
+
+def get_lookup_index(db: Session) -> LookupIndex:
+    """
+    Return the process's lookup snapshot, loading it if missing, expired, or
+    older than the shared version (another worker imported since)
+    """
+    global _lookup_index
+    version = get_version(db, LOOKUP_INDEX)
+    with _lookup_lock:
+        if _lookup_index is None or _lookup_index.version != version or _lookup_index.is_expired():
+            _lookup_index = LookupIndex(db, version)
+        return _lookup_index
+
+
+def invalidate_lookup_index(db: Optional[Session] = None) -> None:
+    """
+    Drop the lookup snapshot. With `db`, also bump the shared version in its
+    transaction so every worker reloads once the caller commits; imports call
+    this before committing. Without it only this process's copy is dropped.
+    """
+    global _lookup_index
+    if db is not None:
+        bump_version(db, LOOKUP_INDEX)
+    with _lookup_lock:
+        _lookup_index = None
 
 
 class BusinessRulesEngine:
@@ -19,9 +106,12 @@ class BusinessRulesEngine:
     Business rules engine implementing logic from VBA modules
     """
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, preload: bool = False):
         self.db = db
         self.rules = self._load_rules()
+        # With preload, team/member/project lookups come from one in-memory
+        # snapshot per evaluation instead of querying on every call
+        self.index = get_lookup_index(db) if preload else None
     
     def _load_rules(self) -> Dict[str, Any]:
         """Load active business rules from database"""
@@ -64,21 +154,11 @@ class BusinessRulesEngine:
         Calculate total hours for a feature including defects
         Logic from Module1.vba lines 458-476
         """
-        # Get user stories for this feature and team
-        user_stories = self.db.query(UserStory).filter(
-            and_(
-                UserStory.feature_id == feature_id,
-                UserStory.team == team_name
-            )
-        ).all()
-        
-        total_sp = sum(us.plan_estimate for us in user_stories)
-        
-        # Get defects associated with this feature
-        # Logic from defectestimate function (lines 739-805)
-        defect_sp = self._calculate_defect_estimate(feature_id, team_name)
-        
-        total_sp += defect_sp
+        # Story and defect SP for this feature and team from the rollup table;
+        # defects follow the defectestimate function (lines 739-805)
+        rollup = get_rollup(self.db, "feature", feature_id, team=team_name)
+        defect_sp = rollup["defect_sp"]
+        total_sp = rollup["total_sp"] + defect_sp
         total_hours = self.convert_story_points_to_hours(total_sp, team_name)
         
         return {
@@ -88,31 +168,6 @@ class BusinessRulesEngine:
             "defect_sp": defect_sp
         }
     
-    def _calculate_defect_estimate(self, feature_id: int, team_name: str) -> float:
-        """
-        Calculate defect estimate for a feature
-        Logic from defectestimate function (Module1.vba lines 739-805)
-        """
-        from app.db.models import Defect
-        
-        # Get feature formatted ID
-        feature = self.db.query(Feature).filter(Feature.id == feature_id).first()
-        if not feature:
-            return 0.0
-        
-        # Get defects linked to this feature or its user stories
-        defects = self.db.query(Defect).filter(
-            and_(
-                Defect.team == team_name,
-                (
-                    Defect.feature_formatted_id == feature.formatted_id
-                )
-            )
-        ).all()
-        
-        total_defect_sp = sum(d.plan_estimate for d in defects)
-        return total_defect_sp
-    
     def calculate_hours_per_week(self, total_hours: float, team_name: str, weeks: Optional[int] = None) -> float:
         """
         Calculate hours per week based on total hours
@@ -122,16 +177,11 @@ class BusinessRulesEngine:
             weeks = self.rules["sprint_weeks"]["value"] * 5  # Default to PI weeks
         
         # Get team count
-        team = self.db.query(Team).filter(Team.name == team_name).first()
-        if not team:
+        team_id = self._get_team_id(team_name)
+        if team_id is None:
             return 0.0
         
-        team_count = self.db.query(TeamMember).filter(
-            and_(
-                TeamMember.team_id == team.id,
-                TeamMember.is_active == True
-            )
-        ).count()
+        team_count, _ = self._get_active_member_stats(team_id)
         
         if team_count == 0:
             return 0.0
@@ -147,26 +197,66 @@ class BusinessRulesEngine:
         Get team rally allocation percentage (from Reference sheet logic)
         Logic from Module1.vba lines 374-377
         """
-        team = self.db.query(Team).filter(Team.name == team_name).first()
-        if not team:
+        team_id = self._get_team_id(team_name)
+        if team_id is None:
             return 1.0
         
-        members = self.db.query(TeamMember).filter(
-            and_(
-                TeamMember.team_id == team.id,
-                TeamMember.is_active == True
-            )
-        ).all()
+        member_count, total_allocation = self._get_active_member_stats(team_id)
         
-        if not members:
+        if not member_count:
             return 1.0
         
         # Average allocation percentage across team
-        total_allocation = sum(m.allocation_percentage for m in members)
-        avg_allocation = total_allocation / len(members) / 100.0
+        avg_allocation = total_allocation / member_count / 100.0
         
         return avg_allocation
     
+    def _get_team_id(self, team_name: str) -> Optional[int]:
+        """Resolve a team name to its id"""
+        if self.index:
+            return self.index.team_ids.get(team_name)
+        team = self.db.query(Team).filter(Team.name == team_name).first()
+        return team.id if team else None
+    
+    def _get_team_name(self, team_id: int) -> Optional[str]:
+        """Resolve a team id to its name"""
+        if self.index:
+            return self.index.team_names.get(team_id)
+        team = self.db.query(Team).filter(Team.id == team_id).first()
+        return team.name if team else None
+    
+    def _get_project_id(self, itpr_code: str) -> Optional[int]:
+        """Resolve an ITPR code to its project id"""
+        if self.index:
+            return self.index.project_ids.get(itpr_code)
+        project = self.db.query(Project).filter(Project.itpr_code == itpr_code).first()
+        return project.id if project else None
+    
+    def _get_member(self, team_member_id: int) -> Optional[Tuple[int, float]]:
+        """Return (team_id, allocation_percentage) for a team member"""
+        if self.index:
+            return self.index.members.get(team_member_id)
+        member = self.db.query(TeamMember).filter(TeamMember.id == team_member_id).first()
+        return (member.team_id, member.allocation_percentage) if member else None
+    
+    def _get_active_member_stats(self, team_id: int) -> Tuple[int, float]:
+        """Return (active member count, summed allocation percentage) for a team"""
+        if self.index:
+            return (
+                self.index.active_member_counts.get(team_id, 0),
+                self.index.allocation_totals.get(team_id, 0.0)
+            )
+        member_count, total_allocation = self.db.query(
+            func.count(TeamMember.id),
+            func.sum(TeamMember.allocation_percentage)
+        ).filter(
+            and_(
+                TeamMember.team_id == team_id,
+                TeamMember.is_active == True
+            )
+        ).one()
+        return member_count, total_allocation or 0.0
+    
     def calculate_clarity_allocation(
         self, 
         itpr_code: str, 
@@ -177,19 +267,20 @@ class BusinessRulesEngine:
         Calculate Clarity allocation for a team member on a project
         Logic from ClaritySheet function (Module1.vba lines 559-611)
         """
-        project = self.db.query(Project).filter(Project.itpr_code == itpr_code).first()
-        if not project:
+        project_id = self._get_project_id(itpr_code)
+        if project_id is None:
             return {}
         
-        team_member = self.db.query(TeamMember).filter(TeamMember.id == team_member_id).first()
+        team_member = self._get_member(team_member_id)
         if not team_member:
             return {}
+        team_id, allocation_percentage = team_member
         
         # Get estimate from summary (all features for this project and team)
-        estimate = self._get_itpr_estimate_for_team(project.id, team_member.team_id)
+        estimate = self._get_itpr_estimate_for_team(project_id, team_id)
         
         # Apply team member allocation percentage
-        member_allocation = team_member.allocation_percentage / 100.0
+        member_allocation = allocation_percentage / 100.0
         estimate = estimate * member_allocation
         
         # If estimate is 0, check for core support hours
@@ -209,29 +300,17 @@ class BusinessRulesEngine:
     
     def _get_itpr_estimate_for_team(self, project_id: int, team_id: int) -> float:
         """Get total hour estimate for ITPR and team"""
-        team = self.db.query(Team).filter(Team.id == team_id).first()
-        if not team:
+        team_name = self._get_team_name(team_id)
+        if team_name is None:
             return 0.0
         
-        # Get all user stories for this project and team
-        # Through: Project -> Epic -> Feature -> UserStory
-        user_stories = self.db.query(UserStory).join(
-            Feature
-        ).join(
-            Epic
-        ).filter(
-            and_(
-                Epic.project_id == project_id,
-                UserStory.team == team.name
-            )
-        ).all()
-        
-        total_sp = sum(us.plan_estimate for us in user_stories)
-        total_hours = self.convert_story_points_to_hours(total_sp, team.name)
+        # Story points of the project's stories for this team, from the rollup table
+        total_sp = get_rollup(self.db, "project", project_id, team=team_name)["total_sp"]
+        total_hours = self.convert_story_points_to_hours(total_sp, team_name)
         
         # Calculate per week estimate
         weeks = self.rules["sprint_weeks"]["value"] * 5  # Assuming 5 sprints per PI
-        per_week = self.calculate_hours_per_week(total_hours, team.name, weeks)
+        per_week = self.calculate_hours_per_week(total_hours, team_name, weeks)
         
         return per_week
     
@@ -246,51 +325,151 @@ class BusinessRulesEngine:
         Detect project overruns (actual > planned)
         One of the key insights requested
         """
-        project = self.db.query(Project).filter(Project.id == project_id).first()
-        if not project:
+        return self.detect_all_project_overruns([project_id], sprint_name).get(project_id, {})
+    
+    def detect_all_project_overruns(
+        self,
+        project_ids: Optional[List[int]] = None,
+        sprint_name: Optional[str] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Detect overruns for many projects with one grouped query each for
+        planned and actual hours. A sprint scopes both to the weeks the
+        sprint calendar maps to it; a sprint the calendar doesn't know falls
+        back to whole-project totals with "sprint" set to None. Returns
+        {project_id: overrun data}.
+        """
+        projects = self._get_projects(project_ids)
+        if not projects:
             return {}
         
         # Get planned hours (from allocations)
-        planned_query = self.db.query(func.sum(TeamAllocation.allocated_hours)).filter(
-            TeamAllocation.project_id == project_id
-        )
+        planned_query = self.db.query(
+            TeamAllocation.project_id, func.sum(TeamAllocation.allocated_hours)
+        ).group_by(TeamAllocation.project_id)
         
-        if sprint_name:
-            sprint = self.db.query(Sprint).filter(Sprint.name == sprint_name).first()
-            if sprint:
-                planned_query = planned_query.filter(
-                    and_(
-                        TeamAllocation.week_start_date >= sprint.start_date,
-                        TeamAllocation.week_start_date <= sprint.end_date
-                    )
-                )
+        # Get actual hours (from time entries)
+        actual_query = self.db.query(
+            TimeEntry.project_id, func.sum(TimeEntry.actual_hours)
+        ).group_by(TimeEntry.project_id)
         
-        planned_hours = planned_query.scalar() or 0.0
+        if project_ids is not None:
+            planned_query = planned_query.filter(TeamAllocation.project_id.in_(project_ids))
+            actual_query = actual_query.filter(TimeEntry.project_id.in_(project_ids))
         
-        # Get actual hours (from time entries)
-        actual_query = self.db.query(func.sum(TimeEntry.actual_hours)).filter(
-            TimeEntry.project_id == project_id
-        )
+        if sprint_name and not self._calendar_has_sprint(sprint_name):
+            # Unknown sprint: whole-project totals, as before the sprint calendar
+            sprint_name = None
         
         if sprint_name:
-            sprint = self.db.query(Sprint).filter(Sprint.name == sprint_name).first()
-            if sprint:
-                actual_query = actual_query.filter(
-                    and_(
-                        TimeEntry.week_start_date >= sprint.start_date,
-                        TimeEntry.week_start_date <= sprint.end_date
-                    )
-                )
+            planned_query = planned_query.join(
+                SprintCalendar, TeamAllocation.week_start_date == SprintCalendar.day
+            ).filter(SprintCalendar.sprint_name == sprint_name)
+            actual_query = actual_query.join(
+                SprintCalendar, TimeEntry.week_start_date == SprintCalendar.day
+            ).filter(SprintCalendar.sprint_name == sprint_name)
+        
+        planned_by_project = dict(planned_query.all())
+        actual_by_project = dict(actual_query.all())
+        
+        overruns = {}
+        for project in projects:
+            overruns[project.id] = self._overrun_data(
+                project.id, project.name, project.itpr_code,
+                planned_by_project.get(project.id), actual_by_project.get(project.id), sprint_name
+            )
+        
+        return overruns
+    
+    def _calendar_has_sprint(self, sprint_name: str) -> bool:
+        """Whether the sprint calendar maps any days to the named sprint"""
+        return self.db.query(SprintCalendar.id).filter(
+            SprintCalendar.sprint_name == sprint_name
+        ).first() is not None
+    
+    def detect_sprint_overruns(
+        self,
+        project_ids: Optional[List[int]] = None,
+        sprint_names: Optional[List[str]] = None
+    ) -> Dict[int, Dict[str, Dict[str, Any]]]:
+        """
+        Overruns per project and sprint from a single query: allocations and
+        time entries joined to the sprint calendar, unioned and grouped by
+        project and sprint. Returns {project_id: {sprint_name: overrun data}}
+        for the sprints a project has hours in.
+        """
+        planned = select(
+            TeamAllocation.project_id.label("project_id"),
+            SprintCalendar.sprint_id.label("sprint_id"),
+            TeamAllocation.allocated_hours.label("planned_hours"),
+            literal(0.0).label("actual_hours")
+        ).join(SprintCalendar, TeamAllocation.week_start_date == SprintCalendar.day)
+        
+        actual = select(
+            TimeEntry.project_id,
+            SprintCalendar.sprint_id,
+            literal(0.0),
+            TimeEntry.actual_hours
+        ).join(SprintCalendar, TimeEntry.week_start_date == SprintCalendar.day)
+        
+        if project_ids is not None:
+            planned = planned.where(TeamAllocation.project_id.in_(project_ids))
+            actual = actual.where(TimeEntry.project_id.in_(project_ids))
+        if sprint_names is not None:
+            planned = planned.where(SprintCalendar.sprint_name.in_(sprint_names))
+            actual = actual.where(SprintCalendar.sprint_name.in_(sprint_names))
+        
+        # Sum on the integer keys first, then attach project and sprint names
+        hours = union_all(planned, actual).subquery()
+        totals = select(
+            hours.c.project_id,
+            hours.c.sprint_id,
+            func.sum(hours.c.planned_hours).label("planned_hours"),
+            func.sum(hours.c.actual_hours).label("actual_hours")
+        ).group_by(hours.c.project_id, hours.c.sprint_id).subquery()
+        
+        rows = self.db.query(
+            Project.id,
+            Project.name,
+            Project.itpr_code,
+            Sprint.name,
+            Sprint.release,
+            totals.c.planned_hours,
+            totals.c.actual_hours
+        ).join(
+            totals, totals.c.project_id == Project.id
+        ).join(
+            Sprint, Sprint.id == totals.c.sprint_id
+        ).all()
+        
+        overruns = {}
+        for project_id, name, itpr_code, sprint_name, release, planned_hours, actual_hours in rows:
+            data = self._overrun_data(project_id, name, itpr_code, planned_hours, actual_hours, sprint_name)
+            data["release"] = release
+            overruns.setdefault(project_id, {})[sprint_name] = data
         
-        actual_hours = actual_query.scalar() or 0.0
+        return overruns
+    
+    def _overrun_data(
+        self,
+        project_id: int,
+        project_name: str,
+        itpr_code: str,
+        planned_hours: Optional[float],
+        actual_hours: Optional[float],
+        sprint_name: Optional[str]
+    ) -> Dict[str, Any]:
+        """Overrun figures for one project from its planned and actual hours"""
+        planned_hours = planned_hours or 0.0
+        actual_hours = actual_hours or 0.0
         
         overrun_hours = actual_hours - planned_hours
         overrun_percentage = (overrun_hours / planned_hours * 100) if planned_hours > 0 else 0
         
         return {
             "project_id": project_id,
-            "project_name": project.name,
-            "itpr_code": project.itpr_code,
+            "project_name": project_name,
+            "itpr_code": itpr_code,
             "planned_hours": planned_hours,
             "actual_hours": actual_hours,
             "overrun_hours": overrun_hours,
@@ -304,119 +483,156 @@ class BusinessRulesEngine:
         Detect team under-utilization
         One of the key insights requested
         """
-        team = self.db.query(Team).filter(Team.id == team_id).first()
-        if not team:
+        return self.detect_all_under_utilization(week_start, [team_id]).get(team_id, {})
+    
+    def detect_all_under_utilization(
+        self,
+        week_start: date,
+        team_ids: Optional[List[int]] = None
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Detect under-utilization for many teams with one grouped query for the
+        allocated hours of the Clarity week starting within the 7 days from
+        `week_start`. Teams without active members are left out.
+        Returns {team_id: utilization data}.
+        """
+        if team_ids is None:
+            team_ids = [team_id for team_id, in self.db.query(Team.id).order_by(Team.id).all()]
+        if not team_ids:
             return {}
         
-        # Get team members
-        members = self.db.query(TeamMember).filter(
-            and_(
-                TeamMember.team_id == team_id,
-                TeamMember.is_active == True
-            )
-        ).all()
-        
-        if not members:
-            return {}
+        # Get allocated hours for this week
+        allocated_by_team = dict(
+            self.db.query(
+                TeamAllocation.team_id, func.sum(TeamAllocation.allocated_hours)
+            ).filter(
+                and_(
+                    TeamAllocation.team_id.in_(team_ids),
+                    TeamAllocation.week_start_date >= week_start,
+                    TeamAllocation.week_start_date < week_start + timedelta(days=7)
+                )
+            ).group_by(TeamAllocation.team_id).all()
+        )
         
         # Calculate available hours
         hours_per_day = self.rules["hours_per_day"]["value"]
         working_days = self.rules["working_days_per_week"]["value"]
         available_hours_per_member = hours_per_day * working_days
         
-        total_available_hours = 0
-        for member in members:
-            member_available = available_hours_per_member * (member.allocation_percentage / 100.0)
-            total_available_hours += member_available
-        
-        # Get allocated hours for this week
-        allocated_hours = self.db.query(func.sum(TeamAllocation.allocated_hours)).filter(
-            and_(
-                TeamAllocation.team_id == team_id,
-                TeamAllocation.week_start_date == week_start
-            )
-        ).scalar() or 0.0
-        
-        utilization_percentage = (allocated_hours / total_available_hours * 100) if total_available_hours > 0 else 0
-        under_utilized = utilization_percentage < 70  # Threshold for under-utilization
-        
-        return {
-            "team_id": team_id,
-            "team_name": team.name,
-            "week_start": week_start.isoformat(),
-            "available_hours": total_available_hours,
-            "allocated_hours": allocated_hours,
-            "utilization_percentage": utilization_percentage,
-            "is_under_utilized": under_utilized,
-            "team_members_count": len(members)
-        }
+        utilization = {}
+        for team_id in team_ids:
+            team_name = self._get_team_name(team_id)
+            if team_name is None:
+                continue
+            
+            member_count, total_allocation = self._get_active_member_stats(team_id)
+            if not member_count:
+                continue
+            
+            total_available_hours = available_hours_per_member * (total_allocation / 100.0)
+            allocated_hours = allocated_by_team.get(team_id) or 0.0
+            
+            utilization_percentage = (allocated_hours / total_available_hours * 100) if total_available_hours > 0 else 0
+            under_utilized = utilization_percentage < 70  # Threshold for under-utilization
+            
+            utilization[team_id] = {
+                "team_id": team_id,
+                "team_name": team_name,
+                "week_start": week_start.isoformat(),
+                "available_hours": total_available_hours,
+                "allocated_hours": allocated_hours,
+                "utilization_percentage": utilization_percentage,
+                "is_under_utilized": under_utilized,
+                "team_members_count": member_count
+            }
+        
+        return utilization
     
     def forecast_project_completion(self, project_id: int) -> Dict[str, Any]:
         """
         Forecast project completion based on velocity
         One of the key insights requested
         """
-        project = self.db.query(Project).filter(Project.id == project_id).first()
-        if not project:
+        return self.forecast_all_projects([project_id]).get(project_id, {})
+    
+    def forecast_all_projects(self, project_ids: Optional[List[int]] = None) -> Dict[int, Dict[str, Any]]:
+        """
+        Forecast completion for many projects from the story point rollups:
+        remaining SP per project and completed SP per project and iteration.
+        Returns {project_id: forecast data}.
+        """
+        projects = self._get_projects(project_ids)
+        if not projects:
             return {}
         
-        # Get all user stories for this project
-        user_stories = self.db.query(UserStory).join(
-            Feature
-        ).join(
-            Epic
-        ).filter(
-            Epic.project_id == project_id
-        ).all()
-        
-        # Calculate remaining story points
-        remaining_sp = sum(
-            us.plan_estimate for us in user_stories 
-            if us.state not in ["Completed", "Accepted"]
-        )
-        
-        # Calculate velocity (completed SP in last 3 sprints)
-        completed_sp_by_sprint = {}
-        for us in user_stories:
-            if us.state in ["Completed", "Accepted"] and us.iteration:
-                if us.iteration not in completed_sp_by_sprint:
-                    completed_sp_by_sprint[us.iteration] = 0
-                completed_sp_by_sprint[us.iteration] += us.plan_estimate
-        
-        # Get last 3 sprints velocity
-        recent_sprints = sorted(completed_sp_by_sprint.items(), key=lambda x: x[0], reverse=True)[:3]
-        avg_velocity = sum(sp for _, sp in recent_sprints) / len(recent_sprints) if recent_sprints else 0
-        
-        # Estimate remaining sprints
-        remaining_sprints = (remaining_sp / avg_velocity) if avg_velocity > 0 else float('inf')
+        # Remaining SP and completed SP per sprint from the rollup table
+        totals = get_rollups(self.db, "project", project_ids)
+        remaining_by_project = {
+            project_id: rollup.total_sp - rollup.completed_sp for project_id, rollup in totals.items()
+        }
+        completed_sp_by_project = {}
+        for rollup in get_iteration_rollups(self.db, "project", project_ids):
+            if rollup.completed_sp:
+                completed_sp_by_project.setdefault(rollup.entity_id, {})[rollup.iteration] = rollup.completed_sp
         
-        # Calculate estimated completion date
         current_sprint = self.db.query(Sprint).filter(Sprint.is_active == True).first()
-        estimated_completion_date = None
-        
-        if current_sprint and remaining_sprints != float('inf'):
-            days_per_sprint = (current_sprint.end_date - current_sprint.start_date).days
-            estimated_completion_date = current_sprint.end_date + timedelta(days=int(remaining_sprints * days_per_sprint))
-        
-        # Determine confidence level and risks
-        confidence_level = "High" if len(recent_sprints) >= 3 else "Medium" if len(recent_sprints) >= 2 else "Low"
-        risks = []
-        
-        if remaining_sprints > 5:
-            risks.append("High number of remaining sprints")
-        if avg_velocity < 20:
-            risks.append("Low team velocity")
-        if project.end_date and estimated_completion_date and estimated_completion_date > project.end_date:
-            risks.append("Estimated completion beyond project end date")
-        
-        return {
-            "project_id": project_id,
-            "project_name": project.name,
-            "itpr_code": project.itpr_code,
-            "remaining_story_points": remaining_sp,
-            "average_velocity": avg_velocity,
-            "estimated_remaining_sprints": remaining_sprints,
-            "estimated_completion_date": estimated_completion_date.isoformat() if estimated_completion_date else None,
-            "confidence_level": confidence_level,
-            "risks": risks
-        }
+        # Iteration names don't sort chronologically ("2026.S9" > "2026.S12"), start dates do
+        sprint_starts = dict(self.db.query(Sprint.name, Sprint.start_date).all())
+        
+        forecasts = {}
+        for project in projects:
+            remaining_sp = remaining_by_project.get(project.id) or 0
+            completed_sp_by_sprint = completed_sp_by_project.get(project.id, {})
+            
+            # Get last 3 sprints velocity
+            recent_sprints = sorted(
+                completed_sp_by_sprint.items(),
+                key=lambda x: (sprint_starts.get(x[0]) or date.min, x[0]),
+                reverse=True
+            )[:3]
+            avg_velocity = sum(sp for _, sp in recent_sprints) / len(recent_sprints) if recent_sprints else 0
+            
+            # Estimate remaining sprints
+            remaining_sprints = (remaining_sp / avg_velocity) if avg_velocity > 0 else float('inf')
+            
+            # Calculate estimated completion date
+            estimated_completion_date = None
+            
+            if current_sprint and remaining_sprints != float('inf'):
+                days_per_sprint = (current_sprint.end_date - current_sprint.start_date).days
+                estimated_completion_date = current_sprint.end_date + timedelta(days=int(remaining_sprints * days_per_sprint))
+            
+            # Determine confidence level and risks
+            confidence_level = "High" if len(recent_sprints) >= 3 else "Medium" if len(recent_sprints) >= 2 else "Low"
+            risks = []
+            
+            if remaining_sprints > 5:
+                risks.append("High number of remaining sprints")
+            if avg_velocity < 20:
+                risks.append("Low team velocity")
+            if project.end_date and estimated_completion_date and estimated_completion_date > project.end_date:
+                risks.append("Estimated completion beyond project end date")
+            
+            forecasts[project.id] = {
+                "project_id": project.id,
+                "project_name": project.name,
+                "itpr_code": project.itpr_code,
+                "remaining_story_points": remaining_sp,
+                "average_velocity": avg_velocity,
+                # No velocity yet: unknown rather than inf, which is not valid JSON
+                "estimated_remaining_sprints": remaining_sprints if remaining_sprints != float('inf') else None,
+                "estimated_completion_date": estimated_completion_date.isoformat() if estimated_completion_date else None,
+                "confidence_level": confidence_level,
+                "risks": risks
+            }
+        
+        return forecasts
+    
+    def _get_projects(self, project_ids: Optional[List[int]] = None) -> List[Project]:
+        """Load the given projects, or all active projects, ordered by id"""
+        query = self.db.query(Project)
+        if project_ids is None:
+            query = query.filter(Project.status == "Active")
+        else:
+            query = query.filter(Project.id.in_(project_ids))
+        return query.order_by(Project.id).all()
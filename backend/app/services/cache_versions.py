@@ -0,0 +1,33 @@
+"""
+Shared cache versions
+The rules engine lookup index and the dashboard summary are cached per
+process. Each copy is tagged with the version read from cache_versions
+before it was loaded; write paths bump the version in their own transaction,
+so once they commit every worker sees a newer version on its next use and
+reloads.
+"""
+from sqlalchemy.orm import Session
+
+from app.db.models import CacheVersion
+
+LOOKUP_INDEX = "lookup_index"
+DASHBOARD_SUMMARY = "dashboard_summary"
+
+
+def get_version(db: Session, name: str) -> int:
+    """Current version of a cache; 0 until it is first bumped"""
+    return db.query(CacheVersion.version).filter(CacheVersion.name == name).scalar() or 0
+
+
+def bump_version(db: Session, name: str) -> None:
+    """Bump a cache's version; takes effect for every worker when the caller commits"""
+    if db.bind.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    else:
+        from sqlalchemy.dialects.sqlite import insert
+
+    statement = insert(CacheVersion).values(name=name, version=1)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=[CacheVersion.name],
+        set_={"version": CacheVersion.version + 1}
+    ))
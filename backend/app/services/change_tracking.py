@@ -0,0 +1,40 @@
+"""
+Change tracking for incremental recomputation
+Imports record which projects and teams they touched as DataChange rows.
+A consumer reads the pending rows, recomputes the scopes they name and then
+deletes exactly the rows it read. Change ids are allocated before commit,
+so on PostgreSQL a lower id can become visible after a higher one; such a
+row is simply still pending on the next run rather than skipped or pruned.
+"""
+from typing import Iterable, List, Set, Tuple
+from sqlalchemy.orm import Session
+
+from app.db.models import DataChange
+
+PRUNE_BATCH_SIZE = 500  # ids per DELETE ... IN statement (SQLite caps bound parameters)
+
+
+def record_changes(db: Session, project_ids: Iterable[int] = (), team_ids: Iterable[int] = ()) -> None:
+    """Record changed projects/teams; committed together with the caller's transaction"""
+    rows = [{"entity": "project", "entity_id": int(i)} for i in set(project_ids) if i is not None]
+    rows += [{"entity": "team", "entity_id": int(i)} for i in set(team_ids) if i is not None]
+    if rows:
+        db.bulk_insert_mappings(DataChange, rows)
+
+
+def pending_changes(db: Session) -> Tuple[List[int], Set[int], Set[int]]:
+    """Return (change_ids, project_ids, team_ids) of every change not yet processed"""
+    rows = db.query(DataChange.id, DataChange.entity, DataChange.entity_id).all()
+
+    change_ids = [change_id for change_id, _, _ in rows]
+    project_ids = {entity_id for _, entity, entity_id in rows if entity == "project"}
+    team_ids = {entity_id for _, entity, entity_id in rows if entity == "team"}
+    return change_ids, project_ids, team_ids
+
+
+def prune_changes(db: Session, change_ids: List[int]) -> None:
+    """Delete the changes that were read and processed"""
+    for start in range(0, len(change_ids), PRUNE_BATCH_SIZE):
+        db.query(DataChange).filter(
+            DataChange.id.in_(change_ids[start:start + PRUNE_BATCH_SIZE])
+        ).delete(synchronize_session=False)
@@ -2,29 +2,59 @@
 AI Chat Service using OpenAI
 """
 import json
-from typing import Dict, Any, Optional, List
+import time
+from typing import Dict, Any, Optional, List, Iterator, AsyncIterator, Tuple
 from sqlalchemy.orm import Session
-from datetime import datetime, date
+from datetime import datetime, timedelta
 import logging
 
-from openai import OpenAI
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, case, exists, func
 
 from app.core.config import settings
-from app.db.models import ChatHistory, Project, Team, UserStory, Sprint, Insight
-from app.services.business_rules import BusinessRulesEngine
+from app.core.metrics import metrics
+from app.db.models import ChatHistory, Project, Team, TeamMember, TimeEntry, UserStory, Sprint, Insight
+from app.services.business_rules import BusinessRulesEngine, week_of
+from app.services.intent_classifier import (
+    intent_cache, local_classifier, normalize_message, record_layer_hit
+)
+from app.services.llm_client import get_openai_client
+from app.services.rule_snapshots import get_snapshot, get_snapshot_entry
+from app.services.session_context import SessionContext, session_contexts
 
 logger = logging.getLogger(__name__)
 
+HELP_TEXT = (
+    "I can help you with:\n"
+    "- Project overruns\n"
+    "- Team under-utilization\n"
+    "- Hour entry tracking\n"
+    "- Project forecasting\n"
+    "- Sprint status\n\n"
+    "What would you like to know?"
+)
+
+GENERAL_FALLBACK_TEXT = "I'm here to help with PMO insights. What would you like to know?"
+
+ERROR_TEXT = "I apologize, but I encountered an error processing your request. Please try again."
+
+# Intents whose answers are built section by section, so they can be streamed
+SECTION_HANDLERS = {
+    "project_overrun": "_project_overrun_sections",
+    "forecast": "_forecast_sections",
+    "sprint_status": "_sprint_status_sections",
+}
+
 
 class ChatService:
     """AI-powered chat service for PMO insights"""
     
     def __init__(self, db: Session):
         self.db = db
-        self.rules_engine = BusinessRulesEngine(db)
+        self.rules_engine = BusinessRulesEngine(db, preload=True)
         
-        # Initialize OpenAI client
-        self.client = OpenAI(api_key=settings.OPENAI_API_KEY) if settings.OPENAI_API_KEY else None
+        # Shared, connection-pooled OpenAI client
+        self.client = get_openai_client()
         
         # Intent classification system prompt
         self.intent_system_prompt = """You are an AI assistant for a PMO operations system. 
@@ -41,35 +71,30 @@ Classify the user's intent into one of these categories:
 
 Respond with ONLY the intent category and any extracted parameters in JSON format.
 Example: {"intent": "project_overrun", "parameters": {"project": "ITPR082135", "sprint": "2026.S1"}}"""
+        
+        # General conversation system prompt
+        self.general_system_prompt = """You are an AI assistant for a PMO operations system. 
+You help project managers understand their data and make informed decisions.
+Be helpful, concise, and professional."""
     
-    def process_message(self, message: str, session_id: str) -> Dict[str, Any]:
-        """Process incoming chat message"""
+    async def process_message(self, message: str, session_id: str) -> Dict[str, Any]:
+        """
+        Process incoming chat message. LLM calls are awaited; database work
+        runs in the threadpool so the event loop is never blocked, and the
+        session's connection is released before each LLM call.
+        """
         try:
-            # Classify intent
-            intent_data = self._classify_intent(message)
-            intent = intent_data.get("intent", "general")
-            parameters = intent_data.get("parameters", {})
+            intent, parameters, context = await self._understand(message, session_id)
             
             # Route to appropriate handler
-            if intent == "project_overrun":
-                response = self._handle_project_overrun(parameters)
-            elif intent == "under_utilization":
-                response = self._handle_under_utilization(parameters)
-            elif intent == "team_hours":
-                response = self._handle_team_hours(parameters)
-            elif intent == "forecast":
-                response = self._handle_forecast(parameters)
-            elif intent == "sprint_status":
-                response = self._handle_sprint_status(parameters)
-            elif intent == "project_info":
-                response = self._handle_project_info(parameters)
-            elif intent == "team_info":
-                response = self._handle_team_info(parameters)
+            handlers = self._rule_handlers()
+            if intent in handlers:
+                response = await run_in_threadpool(handlers[intent], parameters)
             else:
-                response = self._handle_general(message, session_id)
+                response = await self._handle_general(message, context)
             
             # Save to history
-            self._save_chat_history(session_id, message, response["text"], intent, response.get("data"))
+            await self._remember(session_id, message, response["text"], intent, parameters, response.get("data"))
             
             return {
                 "response": response["text"],
@@ -81,20 +106,142 @@ Example: {"intent": "project_overrun", "parameters": {"project": "ITPR082135", "
         except Exception as e:
             logger.error(f"Error processing message: {e}")
             return {
-                "response": "I apologize, but I encountered an error processing your request. Please try again.",
+                "response": ERROR_TEXT,
                 "intent": "error",
                 "data": {"error": str(e)},
                 "session_id": session_id
             }
     
-    def _classify_intent(self, message: str) -> Dict[str, Any]:
-        """Classify user intent"""
-        if not self.client:
-            # Fallback to keyword-based classification
-            return self._keyword_based_intent(message)
+    async def stream_message(self, message: str, session_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a message as a stream of events: `meta` with the intent,
+        `token` events with text as soon as it is available, then `done`
+        with the response data. History is saved once the answer is complete.
+        """
+        try:
+            intent, parameters, context = await self._understand(message, session_id)
+            yield {"event": "meta", "data": {"intent": intent, "session_id": session_id}}
+            
+            text = ""
+            data = {}
+            handlers = self._rule_handlers()
+            if intent in SECTION_HANDLERS:
+                # Rule answers: send each markdown section as soon as it is computed
+                sections = getattr(self, SECTION_HANDLERS[intent])(parameters)
+                while True:
+                    section, finished, result = await run_in_threadpool(self._next_section, sections)
+                    if finished:
+                        data = result or {}
+                        break
+                    text += section
+                    yield {"event": "token", "data": {"text": section}}
+            elif intent in handlers:
+                response = await run_in_threadpool(handlers[intent], parameters)
+                text, data = response["text"], response.get("data") or {}
+                yield {"event": "token", "data": {"text": text}}
+            else:
+                async for token in self._stream_general(message, context):
+                    text += token
+                    yield {"event": "token", "data": {"text": token}}
+            
+            # Save to history
+            await self._remember(session_id, message, text, intent, parameters, data)
+            
+            yield {"event": "done", "data": {"intent": intent, "data": data, "session_id": session_id}}
         
+        except Exception as e:
+            logger.error(f"Error streaming message: {e}")
+            yield {"event": "error", "data": {"response": ERROR_TEXT, "error": str(e), "session_id": session_id}}
+    
+    async def _understand(self, message: str, session_id: str) -> Tuple[str, Dict[str, Any], SessionContext]:
+        """Classify the message and fill missing parameters from the session's earlier turns"""
+        context = await run_in_threadpool(session_contexts.get, self.db, session_id)
+        intent_data = await self._classify_intent(message)
+        intent = intent_data.get("intent", "general")
+        parameters = context.fill_slots(intent, intent_data.get("parameters") or {}, message)
+        return intent, parameters, context
+    
+    async def _remember(
+        self,
+        session_id: str,
+        message: str,
+        text: str,
+        intent: str,
+        parameters: Dict[str, Any],
+        data: Optional[Dict[str, Any]]
+    ) -> None:
+        """Save the turn to history and to the cached session context"""
+        history_id = await run_in_threadpool(
+            self._save_chat_history, session_id, message, text, intent, data, parameters
+        )
+        session_contexts.record_turn(session_id, history_id, message, text, parameters)
+    
+    def _rule_handlers(self) -> Dict[str, Any]:
+        """Handlers answering from the database, keyed by intent"""
+        return {
+            "project_overrun": self._handle_project_overrun,
+            "under_utilization": self._handle_under_utilization,
+            "team_hours": self._handle_team_hours,
+            "forecast": self._handle_forecast,
+            "sprint_status": self._handle_sprint_status,
+            "project_info": self._handle_project_info,
+            "team_info": self._handle_team_info,
+        }
+    
+    def _release_connection(self) -> None:
+        """
+        End the session's transaction and hand its connection back to the
+        pool before awaiting the LLM, so a chat waiting on the model doesn't
+        hold one of the pool's connections. The session checks out a
+        connection again on its next query.
+        """
+        self.db.close()
+    
+    @staticmethod
+    def _next_section(sections: Iterator[str]) -> Tuple[Optional[str], bool, Optional[Dict[str, Any]]]:
+        """Advance a section generator: (section, finished, data returned when finished)"""
         try:
-            response = self.client.chat.completions.create(
+            return next(sections), False, None
+        except StopIteration as stop:
+            return None, True, stop.value
+    
+    @classmethod
+    def _collect_sections(cls, sections: Iterator[str]) -> Dict[str, Any]:
+        """Run a section generator to completion as a regular handler response"""
+        text = ""
+        while True:
+            section, finished, data = cls._next_section(sections)
+            if finished:
+                return {"text": text, "data": data or {}}
+            text += section
+    
+    async def _classify_intent(self, message: str) -> Dict[str, Any]:
+        """
+        Classify user intent: cached result, then the local keyword matcher,
+        and the LLM only when the matcher is not confident
+        """
+        start = time.perf_counter()
+        cache_key = normalize_message(message)
+        
+        cached = intent_cache.get(cache_key)
+        if cached is not None:
+            record_layer_hit("cache", time.perf_counter() - start)
+            return cached
+        metrics.increment("intent.cache.misses")
+        
+        local = local_classifier.classify(message)
+        result = {"intent": local["intent"], "parameters": local["parameters"]}
+        
+        if not self.client or local["confidence"] >= settings.INTENT_CONFIDENCE_THRESHOLD:
+            record_layer_hit("local", time.perf_counter() - start)
+            intent_cache.set(cache_key, result)
+            return result
+        metrics.increment("intent.local.misses")
+        
+        try:
+            await run_in_threadpool(self._release_connection)
+            llm_start = time.perf_counter()
+            response = await self.client.chat.completions.create(
                 model=settings.OPENAI_MODEL,
                 messages=[
                     {"role": "system", "content": self.intent_system_prompt},
@@ -103,35 +250,25 @@ Example: {"intent": "project_overrun", "parameters": {"project": "ITPR082135", "
                 temperature=0.3,
                 max_tokens=200
             )
-            result = response.choices[0].message.content
-            return json.loads(result)
+            metrics.observe("intent.llm", time.perf_counter() - llm_start)
+            llm_result = json.loads(response.choices[0].message.content)
+            
+            # Keep codes the matcher extracted if the model missed them
+            parameters = {**local["parameters"], **(llm_result.get("parameters") or {})}
+            result = {"intent": llm_result.get("intent", "general"), "parameters": parameters}
+            intent_cache.set(cache_key, result)
+            return result
         except Exception as e:
             logger.error(f"Error classifying intent: {e}")
-            return self._keyword_based_intent(message)
-    
-    def _keyword_based_intent(self, message: str) -> Dict[str, Any]:
-        """Fallback keyword-based intent classification"""
-        message_lower = message.lower()
-        
-        if any(word in message_lower for word in ["overrun", "over budget", "exceeded"]):
-            return {"intent": "project_overrun", "parameters": {}}
-        elif any(word in message_lower for word in ["under-util", "underutil", "capacity", "idle"]):
-            return {"intent": "under_utilization", "parameters": {}}
-        elif any(word in message_lower for word in ["hours", "timesheet", "time entry", "logging"]):
-            return {"intent": "team_hours", "parameters": {}}
-        elif any(word in message_lower for word in ["forecast", "completion", "when will", "estimate"]):
-            return {"intent": "forecast", "parameters": {}}
-        elif any(word in message_lower for word in ["sprint", "iteration"]):
-            return {"intent": "sprint_status", "parameters": {}}
-        elif any(word in message_lower for word in ["project", "itpr"]):
-            return {"intent": "project_info", "parameters": {}}
-        elif any(word in message_lower for word in ["team", "member"]):
-            return {"intent": "team_info", "parameters": {}}
-        else:
-            return {"intent": "general", "parameters": {}}
+            metrics.increment("intent.llm.errors")
+            return result
     
     def _handle_project_overrun(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Handle project overrun queries"""
+        return self._collect_sections(self._project_overrun_sections(parameters))
+    
+    def _project_overrun_sections(self, parameters: Dict[str, Any]) -> Iterator[str]:
+        """Markdown sections of the overrun answer; returns the response data"""
         project_code = parameters.get("project")
         sprint_name = parameters.get("sprint")
         
@@ -142,61 +279,68 @@ Example: {"intent": "project_overrun", "parameters": {"project": "ITPR082135", "
             ).first()
             
             if not project:
-                return {
-                    "text": f"I couldn't find project {project_code}. Please check the ITPR code.",
-                    "data": {}
-                }
+                yield f"I couldn't find project {project_code}. Please check the ITPR code."
+                return {}
             
-            overrun_data = self.rules_engine.detect_project_overruns(project.id, sprint_name)
+            # Whole-project totals come from the scheduler's snapshot
+            overrun_data = None
+            if not sprint_name:
+                overrun_data = get_snapshot_entry(self.db, "project_overrun", project.id)
+            if overrun_data is None:
+                overrun_data = self.rules_engine.detect_project_overruns(project.id, sprint_name)
             
             if overrun_data["is_overrun"]:
-                text = f"**Project Overrun Detected**\n\n"
-                text += f"Project: {overrun_data['project_name']} ({overrun_data['itpr_code']})\n"
+                yield f"**Project Overrun Detected**\n\n"
+                text = f"Project: {overrun_data['project_name']} ({overrun_data['itpr_code']})\n"
                 text += f"Planned Hours: {overrun_data['planned_hours']:.1f}\n"
                 text += f"Actual Hours: {overrun_data['actual_hours']:.1f}\n"
                 text += f"Overrun: {overrun_data['overrun_hours']:.1f} hours ({overrun_data['overrun_percentage']:.1f}%)\n"
                 
-                if sprint_name:
-                    text += f"Sprint: {sprint_name}\n"
+                if overrun_data.get("sprint"):
+                    text += f"Sprint: {overrun_data['sprint']}\n"
+                yield text
             else:
                 text = f"Project {overrun_data['project_name']} is within planned hours. "
                 text += f"Planned: {overrun_data['planned_hours']:.1f}, Actual: {overrun_data['actual_hours']:.1f}"
+                yield text
             
-            return {"text": text, "data": overrun_data}
+            return overrun_data
         else:
             # All projects with overruns
-            projects = self.db.query(Project).filter(Project.status == "Active").all()
-            overruns = []
-            
-            for project in projects:
-                overrun_data = self.rules_engine.detect_project_overruns(project.id, sprint_name)
-                if overrun_data["is_overrun"]:
-                    overruns.append(overrun_data)
+            all_overruns = None if sprint_name else get_snapshot(self.db, "project_overrun")
+            if all_overruns is None:
+                all_overruns = self.rules_engine.detect_all_project_overruns(sprint_name=sprint_name)
+            overruns = [
+                overrun_data for overrun_data in all_overruns.values()
+                if overrun_data.get("is_overrun")
+            ]
             
             if overruns:
-                text = f"**Found {len(overruns)} projects with overruns:**\n\n"
+                yield f"**Found {len(overruns)} projects with overruns:**\n\n"
                 for overrun in overruns[:5]:  # Show top 5
-                    text += f"- {overrun['project_name']} ({overrun['itpr_code']}): "
-                    text += f"+{overrun['overrun_hours']:.1f} hours ({overrun['overrun_percentage']:.1f}%)\n"
+                    yield (
+                        f"- {overrun['project_name']} ({overrun['itpr_code']}): "
+                        f"+{overrun['overrun_hours']:.1f} hours ({overrun['overrun_percentage']:.1f}%)\n"
+                    )
                 
                 if len(overruns) > 5:
-                    text += f"\n...and {len(overruns) - 5} more"
+                    yield f"\n...and {len(overruns) - 5} more"
             else:
-                text = "Great news! No projects are currently showing overruns."
+                yield "Great news! No projects are currently showing overruns."
             
-            return {"text": text, "data": {"overruns": overruns}}
+            return {"overruns": overruns}
     
     def _handle_under_utilization(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Handle team under-utilization queries"""
-        teams = self.db.query(Team).all()
-        current_week = date.today()
-        
-        under_utilized = []
+        current_week = week_of()
         
-        for team in teams:
-            util_data = self.rules_engine.detect_under_utilization(team.id, current_week)
-            if util_data.get("is_under_utilized"):
-                under_utilized.append(util_data)
+        utilization = get_snapshot(self.db, "under_utilization", current_week.isoformat())
+        if utilization is None:
+            utilization = self.rules_engine.detect_all_under_utilization(current_week)
+        under_utilized = [
+            util_data for util_data in utilization.values()
+            if util_data.get("is_under_utilized")
+        ]
         
         if under_utilized:
             text = f"**Under-Utilized Teams (< 70% capacity):**\n\n"
@@ -210,29 +354,22 @@ Example: {"intent": "project_overrun", "parameters": {"project": "ITPR082135", "
     
     def _handle_team_hours(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Handle team hour tracking queries"""
-        from app.db.models import TeamMember, TimeEntry
-        
-        current_week = date.today()
+        current_week = week_of()
         
-        # Get all active team members
-        members = self.db.query(TeamMember).filter(TeamMember.is_active == True).all()
-        
-        # Check who has entered hours this week
-        members_with_hours = []
-        members_without_hours = []
+        # Active members with a semi-join flag for time entered this week, in one query
+        has_hours = exists().where(
+            and_(
+                TimeEntry.team_member_id == TeamMember.id,
+                TimeEntry.week_start_date >= current_week,
+                TimeEntry.week_start_date < current_week + timedelta(days=7)
+            )
+        )
+        members = self.db.query(TeamMember.name, has_hours.label("has_hours")).filter(
+            TeamMember.is_active == True
+        ).order_by(TeamMember.id).all()
         
-        for member in members:
-            has_hours = self.db.query(TimeEntry).filter(
-                and_(
-                    TimeEntry.team_member_id == member.id,
-                    TimeEntry.week_start_date == current_week
-                )
-            ).first() is not None
-            
-            if has_hours:
-                members_with_hours.append(member.name)
-            else:
-                members_without_hours.append(member.name)
+        members_with_hours = [name for name, entered in members if entered]
+        members_without_hours = [name for name, entered in members if not entered]
         
         text = f"**Hour Entry Status (Week of {current_week}):**\n\n"
         text += f"✅ Entered: {len(members_with_hours)} team members\n"
@@ -253,45 +390,57 @@ Example: {"intent": "project_overrun", "parameters": {"project": "ITPR082135", "
     
     def _handle_forecast(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Handle project forecast queries"""
+        return self._collect_sections(self._forecast_sections(parameters))
+    
+    def _forecast_sections(self, parameters: Dict[str, Any]) -> Iterator[str]:
+        """Markdown sections of the forecast answer; returns the response data"""
         project_code = parameters.get("project")
         
-        if project_code:
-            project = self.db.query(Project).filter(
-                Project.itpr_code == project_code
-            ).first()
-            
-            if not project:
-                return {
-                    "text": f"I couldn't find project {project_code}.",
-                    "data": {}
-                }
-            
+        if not project_code:
+            yield "Please specify a project ITPR code for forecasting."
+            return {}
+        
+        project = self.db.query(Project).filter(
+            Project.itpr_code == project_code
+        ).first()
+        
+        if not project:
+            yield f"I couldn't find project {project_code}."
+            return {}
+        
+        yield f"**Forecast for {project.name} ({project.itpr_code}):**\n\n"
+        
+        forecast = get_snapshot_entry(self.db, "forecast", project.id)
+        if forecast is None:
             forecast = self.rules_engine.forecast_project_completion(project.id)
-            
-            text = f"**Forecast for {forecast['project_name']} ({forecast['itpr_code']}):**\n\n"
-            text += f"Remaining Story Points: {forecast['remaining_story_points']:.1f}\n"
-            text += f"Average Velocity: {forecast['average_velocity']:.1f} SP/sprint\n"
+        
+        text = f"Remaining Story Points: {forecast['remaining_story_points']:.1f}\n"
+        text += f"Average Velocity: {forecast['average_velocity']:.1f} SP/sprint\n"
+        if forecast['estimated_remaining_sprints'] is not None:
             text += f"Estimated Sprints Remaining: {forecast['estimated_remaining_sprints']:.1f}\n"
-            
-            if forecast['estimated_completion_date']:
-                text += f"Estimated Completion: {forecast['estimated_completion_date']}\n"
-            
-            text += f"Confidence Level: {forecast['confidence_level']}\n"
-            
-            if forecast['risks']:
-                text += f"\n**Risks:**\n"
-                for risk in forecast['risks']:
-                    text += f"- {risk}\n"
-            
-            return {"text": text, "data": forecast}
         else:
-            return {
-                "text": "Please specify a project ITPR code for forecasting.",
-                "data": {}
-            }
+            text += "Estimated Sprints Remaining: unknown (no completed sprints yet)\n"
+        
+        if forecast['estimated_completion_date']:
+            text += f"Estimated Completion: {forecast['estimated_completion_date']}\n"
+        
+        text += f"Confidence Level: {forecast['confidence_level']}\n"
+        yield text
+        
+        if forecast['risks']:
+            text = f"\n**Risks:**\n"
+            for risk in forecast['risks']:
+                text += f"- {risk}\n"
+            yield text
+        
+        return forecast
     
     def _handle_sprint_status(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Handle sprint status queries"""
+        return self._collect_sections(self._sprint_status_sections(parameters))
+    
+    def _sprint_status_sections(self, parameters: Dict[str, Any]) -> Iterator[str]:
+        """Markdown sections of the sprint status answer; returns the response data"""
         sprint_name = parameters.get("sprint")
         
         if sprint_name:
@@ -300,34 +449,35 @@ Example: {"intent": "project_overrun", "parameters": {"project": "ITPR082135", "
             sprint = self.db.query(Sprint).filter(Sprint.is_active == True).first()
         
         if not sprint:
-            return {"text": "No active sprint found.", "data": {}}
+            yield "No active sprint found."
+            return {}
         
-        # Get user stories for this sprint
-        user_stories = self.db.query(UserStory).filter(
-            UserStory.iteration == sprint.name
-        ).all()
+        yield f"**Sprint Status: {sprint.name}**\n\nPeriod: {sprint.start_date} to {sprint.end_date}\n"
         
-        total_sp = sum(us.plan_estimate for us in user_stories)
-        completed_sp = sum(
-            us.plan_estimate for us in user_stories 
-            if us.state in ["Completed", "Accepted"]
-        )
+        # Story point totals for this sprint in one aggregate query
+        total_sp, completed_sp, story_count = self.db.query(
+            func.coalesce(func.sum(UserStory.plan_estimate), 0.0),
+            func.coalesce(func.sum(case(
+                (UserStory.state.in_(["Completed", "Accepted"]), UserStory.plan_estimate),
+                else_=0.0
+            )), 0.0),
+            func.count(UserStory.id)
+        ).filter(
+            UserStory.iteration == sprint.name
+        ).one()
+        completed_pct = completed_sp / total_sp * 100 if total_sp else 0.0
         
-        text = f"**Sprint Status: {sprint.name}**\n\n"
-        text += f"Period: {sprint.start_date} to {sprint.end_date}\n"
-        text += f"Total Story Points: {total_sp:.1f}\n"
-        text += f"Completed: {completed_sp:.1f} ({(completed_sp/total_sp*100):.1f}%)\n"
+        text = f"Total Story Points: {total_sp:.1f}\n"
+        text += f"Completed: {completed_sp:.1f} ({completed_pct:.1f}%)\n"
         text += f"Remaining: {total_sp - completed_sp:.1f}\n"
-        text += f"User Stories: {len(user_stories)}\n"
+        text += f"User Stories: {story_count}\n"
+        yield text
         
         return {
-            "text": text,
-            "data": {
-                "sprint": sprint.name,
-                "total_sp": total_sp,
-                "completed_sp": completed_sp,
-                "remaining_sp": total_sp - completed_sp
-            }
+            "sprint": sprint.name,
+            "total_sp": total_sp,
+            "completed_sp": completed_sp,
+            "remaining_sp": total_sp - completed_sp
         }
     
     def _handle_project_info(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
@@ -344,46 +494,36 @@ Example: {"intent": "project_overrun", "parameters": {"project": "ITPR082135", "
     
     def _handle_team_info(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
         """Handle team information queries"""
-        teams = self.db.query(Team).all()
+        # Active member count per team in one grouped outer join
+        teams = self.db.query(Team.name, func.count(TeamMember.id)).outerjoin(
+            TeamMember,
+            and_(
+                TeamMember.team_id == Team.id,
+                TeamMember.is_active == True
+            )
+        ).group_by(Team.id, Team.name).order_by(Team.id).all()
         
         text = f"**Teams ({len(teams)}):**\n\n"
-        for team in teams:
-            member_count = self.db.query(TeamMember).filter(
-                and_(
-                    TeamMember.team_id == team.id,
-                    TeamMember.is_active == True
-                )
-            ).count()
-            text += f"- {team.name}: {member_count} members\n"
+        for team_name, member_count in teams:
+            text += f"- {team_name}: {member_count} members\n"
         
         return {"text": text, "data": {}}
     
-    def _handle_general(self, message: str, session_id: str) -> Dict[str, Any]:
-        """Handle general queries with OpenAI"""
+    async def _handle_general(self, message: str, context: SessionContext) -> Dict[str, Any]:
+        """Handle general queries with OpenAI, including recent turns of the session"""
         if not self.client:
-            return {
-                "text": "I can help you with:\n"
-                        "- Project overruns\n"
-                        "- Team under-utilization\n"
-                        "- Hour entry tracking\n"
-                        "- Project forecasting\n"
-                        "- Sprint status\n\n"
-                        "What would you like to know?",
-                "data": {}
-            }
+            return {"text": HELP_TEXT, "data": {}}
         
         try:
             # Use OpenAI for general conversation
-            system_prompt = """You are an AI assistant for a PMO operations system. 
-You help project managers understand their data and make informed decisions.
-Be helpful, concise, and professional."""
-            
-            response = self.client.chat.completions.create(
+            # Token counting may load the tiktoken encoding, so keep it off the event loop
+            messages = await run_in_threadpool(
+                context.prompt_messages, self.general_system_prompt, message, settings.CHAT_CONTEXT_TOKEN_BUDGET
+            )
+            await run_in_threadpool(self._release_connection)
+            response = await self.client.chat.completions.create(
                 model=settings.OPENAI_MODEL,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": message}
-                ],
+                messages=messages,
                 temperature=0.7,
                 max_tokens=500
             )
@@ -391,10 +531,36 @@ Be helpful, concise, and professional."""
             return {"text": response.choices[0].message.content, "data": {}}
         except Exception as e:
             logger.error(f"Error in general handler: {e}")
-            return {
-                "text": "I'm here to help with PMO insights. What would you like to know?",
-                "data": {}
-            }
+            return {"text": GENERAL_FALLBACK_TEXT, "data": {}}
+    
+    async def _stream_general(self, message: str, context: SessionContext) -> AsyncIterator[str]:
+        """Stream the general answer token by token"""
+        if not self.client:
+            yield HELP_TEXT
+            return
+        
+        streamed = False
+        try:
+            messages = await run_in_threadpool(
+                context.prompt_messages, self.general_system_prompt, message, settings.CHAT_CONTEXT_TOKEN_BUDGET
+            )
+            await run_in_threadpool(self._release_connection)
+            stream = await self.client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=500,
+                stream=True
+            )
+            async for chunk in stream:
+                token = chunk.choices[0].delta.content if chunk.choices else None
+                if token:
+                    streamed = True
+                    yield token
+        except Exception as e:
+            logger.error(f"Error streaming general answer: {e}")
+            if not streamed:
+                yield GENERAL_FALLBACK_TEXT
     
     def _save_chat_history(
         self, 
@@ -402,19 +568,23 @@ Be helpful, concise, and professional."""
         user_message: str, 
         bot_response: str,
         intent: str,
-        context: Optional[Dict] = None
-    ):
-        """Save chat history to database"""
+        context: Optional[Dict] = None,
+        parameters: Optional[Dict] = None
+    ) -> Optional[int]:
+        """Save chat history to database, returning the new row's id"""
         try:
             history = ChatHistory(
                 session_id=session_id,
                 user_message=user_message,
                 bot_response=bot_response,
                 intent=intent,
+                parameters=parameters or {},
                 context=context or {}
             )
             self.db.add(history)
             self.db.commit()
+            return history.id
         except Exception as e:
             logger.error(f"Error saving chat history: {e}")
             self.db.rollback()
+            return None
@@ -0,0 +1,187 @@
+"""
+Clarity plan generation
+Builds the whole ITPR x member x week allocation sheet in one pass: the
+vectorized counterpart of ClaritySheet and the allocation loop that fills
+it (Module1.vba lines 555-611). Team SP per ITPR comes from the story point
+rollups and is combined with team and member frames by pandas merges
+instead of the workbook's SUMIFS/VLOOKUP row scans.
+"""
+import io
+from datetime import date, timedelta
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.db.models import Project, Sprint, StoryPointRollup, Team, TeamMember
+from app.services.business_rules import BusinessRulesEngine
+from app.services.sp_rollups import ALL
+
+# Leading columns of the exported sheet (ClaritySheet headers), then one column per week
+SHEET_COLUMNS = {
+    "team": "Team",
+    "project_name": "Initiative with THEME",
+    "itpr_code": "Initiative (Use Dropdown of Current ITPRs)",
+    "owner": "PMO Owner",
+    "member_name": "Resource Name (in Clarity)",
+    "email": "Network ID or email Location",
+    "location": "Location"
+}
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+
+
+def plan_weeks(db: Session, start: Optional[date] = None, count: Optional[int] = None) -> List[date]:
+    """
+    Week start dates (Mondays) of a plan: `count` weeks from `start`, by
+    default the PI (sprint_weeks x 5 sprints) from the active sprint or today
+    """
+    if start is None:
+        current_sprint = db.query(Sprint).filter(Sprint.is_active == True).first()
+        start = current_sprint.start_date if current_sprint else date.today()
+    if count is None:
+        count = BusinessRulesEngine(db).rules["sprint_weeks"]["value"] * 5
+    first_week = start - timedelta(days=start.weekday())
+    return [first_week + timedelta(weeks=i) for i in range(int(count))]
+
+
+class ClarityPlanGenerator:
+    """
+    Weekly Clarity hours for every active member on every ITPR their team
+    has stories in, matching BusinessRulesEngine.calculate_clarity_allocation
+    for each (ITPR, member) pair
+    """
+
+    def __init__(self, db: Session, engine: Optional[BusinessRulesEngine] = None):
+        self.db = db
+        self.engine = engine or BusinessRulesEngine(db)
+
+    def generate(
+        self,
+        weeks: List[date],
+        project_ids: Optional[List[int]] = None,
+        team_ids: Optional[List[int]] = None
+    ) -> pd.DataFrame:
+        """
+        One row per (ITPR, member) with the sheet columns, project_id and
+        team_member_id, and the weekly hours under each week's ISO date
+        """
+        week_columns = [week.isoformat() for week in weeks]
+        pairs = self._allocation_pairs(project_ids, team_ids)
+        if pairs.empty:
+            return pd.DataFrame(columns=["project_id", "team_member_id"] + list(SHEET_COLUMNS) + week_columns)
+
+        hours = self._weekly_hours(pairs)
+        # Every week of the plan carries the same estimate, as in the VBA sheet
+        weekly = pd.DataFrame(
+            np.repeat(hours[:, None], len(week_columns), axis=1), columns=week_columns, index=pairs.index
+        )
+        plan = pd.concat([pairs[["project_id", "team_member_id"] + list(SHEET_COLUMNS)], weekly], axis=1)
+        return plan.sort_values(["team", "itpr_code", "member_name"], ignore_index=True)
+
+    def _allocation_pairs(self, project_ids: Optional[List[int]], team_ids: Optional[List[int]]) -> pd.DataFrame:
+        """
+        (ITPR, member) rows with the team's SP for the ITPR and the team's
+        active member count and summed allocation percentage
+        """
+        rollups = self.db.query(
+            StoryPointRollup.entity_id.label("project_id"),
+            StoryPointRollup.team,
+            StoryPointRollup.total_sp
+        ).filter(
+            StoryPointRollup.level == "project",
+            StoryPointRollup.iteration == ALL,
+            StoryPointRollup.team.notin_([ALL, ""])
+        )
+        if project_ids is not None:
+            rollups = rollups.filter(StoryPointRollup.entity_id.in_(project_ids))
+        team_sp = pd.DataFrame(rollups.all(), columns=["project_id", "team", "total_sp"])
+
+        projects = pd.DataFrame(
+            self.db.query(Project.id, Project.itpr_code, Project.name, Project.owner).all(),
+            columns=["project_id", "itpr_code", "project_name", "owner"]
+        )
+        teams = pd.DataFrame(self.db.query(Team.id, Team.name).all(), columns=["team_id", "team"])
+        members = pd.DataFrame(
+            self.db.query(
+                TeamMember.id,
+                TeamMember.team_id,
+                TeamMember.name,
+                TeamMember.email,
+                TeamMember.location,
+                TeamMember.allocation_percentage
+            ).filter(TeamMember.is_active == True).all(),
+            columns=["team_member_id", "team_id", "member_name", "email", "location", "allocation_percentage"]
+        )
+        if team_ids is not None:
+            teams = teams[teams["team_id"].isin(team_ids)]
+
+        members["allocation_percentage"] = members["allocation_percentage"].fillna(0.0)
+        team_stats = members.groupby("team_id").agg(
+            team_count=("team_member_id", "size"),
+            total_allocation=("allocation_percentage", "sum")
+        ).reset_index()
+
+        return team_sp.merge(teams, on="team").merge(
+            team_stats, on="team_id"
+        ).merge(
+            members, on="team_id"
+        ).merge(
+            projects, on="project_id"
+        )
+
+    def _weekly_hours(self, pairs: pd.DataFrame) -> np.ndarray:
+        """
+        Per-week hours of each pair: team SP -> hours (sp_hours_<team> or the
+        default), spread over the PI weeks and the team's members, scaled by
+        the member's allocation; core support hours when that comes to 0
+        """
+        sp_hours = pairs["team"].map({
+            team: self.engine.get_story_point_hours(team) for team in pairs["team"].unique()
+        })
+        core_support = pairs["itpr_code"].map({
+            itpr_code: self.engine._get_core_support_hours(itpr_code) for itpr_code in pairs["itpr_code"].unique()
+        })
+        pi_weeks = self.engine.rules["sprint_weeks"]["value"] * 5
+
+        total_hours = pairs["total_sp"].to_numpy(dtype=float) * sp_hours.to_numpy(dtype=float)
+        team_count = pairs["team_count"].to_numpy(dtype=float)
+        rally_allocation = pairs["total_allocation"].to_numpy(dtype=float) / team_count / 100.0
+        if pi_weeks > 0:
+            team_week = np.round(total_hours * rally_allocation / pi_weeks / team_count, 2)
+        else:
+            team_week = np.zeros(len(pairs))
+
+        estimate = team_week * (pairs["allocation_percentage"].to_numpy(dtype=float) / 100.0)
+        rounded = np.round(estimate, 0)
+        return np.where(estimate == 0, core_support.to_numpy(dtype=float), np.where(rounded == 0, 1.0, rounded))
+
+
+def export_plan(plan: pd.DataFrame, fmt: str) -> Tuple[bytes, str]:
+    """Render a generated plan as the Clarity sheet. Returns (content, media type)."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    sheet = plan.drop(columns=["project_id", "team_member_id"]).rename(columns=SHEET_COLUMNS)
+    if fmt == "csv":
+        content = sheet.to_csv(index=False).encode("utf-8")
+    else:
+        content = _to_xlsx(sheet)
+    return content, EXPORT_FORMATS[fmt]
+
+
+def _to_xlsx(sheet: pd.DataFrame) -> bytes:
+    """Write a frame with openpyxl's streaming (write-only) workbook, much faster than DataFrame.to_excel"""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Clarity")
+    worksheet.append(list(sheet.columns))
+    for row in sheet.astype(object).where(sheet.notna(), None).itertuples(index=False, name=None):
+        worksheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
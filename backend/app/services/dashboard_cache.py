@@ -0,0 +1,98 @@
+"""
+Dashboard summary cache
+The summary is computed with one combined count query plus the insight
+breakdown and cached per process for DASHBOARD_CACHE_TTL_SECONDS. The write
+paths (uploads, rules, insights, projects) bump the shared DASHBOARD_SUMMARY
+version as they commit, and every worker checks it before serving its copy.
+"""
+import json
+import time
+import hashlib
+import threading
+from typing import Dict, Any, Optional, Tuple
+
+from sqlalchemy import select, func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.models import Project, Team, TeamMember, UserStory, Sprint, Insight
+from app.services.cache_versions import DASHBOARD_SUMMARY, get_version, bump_version
+
+_summary: Optional[Tuple[Dict[str, Any], str, float, int]] = None  # (summary, etag, loaded_at, version)
+_generation = 0  # Bumped on every invalidation
+_summary_lock = threading.Lock()
+
+
+def get_dashboard_summary(db: Session) -> Tuple[Dict[str, Any], str]:
+    """
+    Return the cached (summary, etag), computing it if missing, expired, or
+    older than the shared version (another worker wrote since)
+    """
+    global _summary
+    version = get_version(db, DASHBOARD_SUMMARY)
+    with _summary_lock:
+        cached = _summary
+        generation = _generation
+    if cached and cached[3] == version and time.monotonic() - cached[2] < settings.DASHBOARD_CACHE_TTL_SECONDS:
+        metrics.increment("dashboard_summary.cache_hits")
+        return cached[0], cached[1]
+
+    metrics.increment("dashboard_summary.cache_misses")
+    summary = compute_dashboard_summary(db)
+    etag = '"' + hashlib.sha1(json.dumps(summary, sort_keys=True, default=str).encode()).hexdigest() + '"'
+
+    with _summary_lock:
+        # Don't cache a result an invalidation raced with
+        if generation == _generation:
+            _summary = (summary, etag, time.monotonic(), version)
+    return summary, etag
+
+
+def invalidate_dashboard_summary(db: Optional[Session] = None) -> None:
+    """
+    Drop the cached summary. With `db`, also bump the shared version in its
+    transaction so every worker recomputes once the caller commits; write
+    paths call this before committing.
+    """
+    global _summary, _generation
+    if db is not None:
+        bump_version(db, DASHBOARD_SUMMARY)
+    with _summary_lock:
+        _summary = None
+        _generation += 1
+
+
+def compute_dashboard_summary(db: Session) -> Dict[str, Any]:
+    """All dashboard totals in one query, plus unresolved insights by type"""
+    totals = db.query(
+        select(func.count(Project.id)).scalar_subquery().label("total_projects"),
+        select(func.count(Project.id)).where(Project.status == "Active").scalar_subquery().label("active_projects"),
+        select(func.count(Sprint.id)).scalar_subquery().label("total_sprints"),
+        select(Sprint.name).where(Sprint.is_active == True).limit(1).scalar_subquery().label("active_sprint"),
+        select(func.count(Team.id)).scalar_subquery().label("total_teams"),
+        select(func.count(TeamMember.id)).where(TeamMember.is_active == True).scalar_subquery().label("total_team_members"),
+        select(func.count(UserStory.id)).scalar_subquery().label("total_user_stories"),
+        select(func.sum(UserStory.plan_estimate)).scalar_subquery().label("total_story_points"),
+    ).one()
+
+    insights_by_type = db.query(
+        Insight.insight_type,
+        func.count(Insight.id)
+    ).filter(
+        Insight.is_resolved == False
+    ).group_by(
+        Insight.insight_type
+    ).all()
+
+    return {
+        "total_projects": totals.total_projects,
+        "active_projects": totals.active_projects,
+        "total_sprints": totals.total_sprints,
+        "active_sprint": totals.active_sprint,
+        "total_teams": totals.total_teams,
+        "total_team_members": totals.total_team_members,
+        "total_user_stories": totals.total_user_stories,
+        "total_story_points": totals.total_story_points or 0.0,
+        "insights_count": {insight_type: count for insight_type, count in insights_by_type}
+    }
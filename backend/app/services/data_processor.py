@@ -2,392 +2,584 @@
 Data processor for importing Rally and Clarity data
 """
 import pandas as pd
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Tuple, Optional, Callable, Set
 from datetime import datetime
+from sqlalchemy import and_
 from sqlalchemy.orm import Session
 import logging
 
+from app.core.config import settings
 from app.db.models import (
     Project, Epic, Feature, UserStory, Defect,
-    Team, TeamMember, TeamAllocation, Sprint
+    Team, TeamMember, TeamAllocation, Sprint, ImportCheckpoint
 )
+from app.services.file_reader import SourceType, read_in_chunks, file_digest
+from app.services.business_rules import invalidate_lookup_index
+from app.services.change_tracking import record_changes
+from app.services.sp_rollups import refresh_rollups
 
 logger = logging.getLogger(__name__)
 
 
+def _chunks(items: List[Any], size: int):
+    """Yield successive slices of at most `size` items"""
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def _clean(value: Any) -> Any:
+    """Convert pandas NaN/NaT to None so it is stored as NULL"""
+    return None if pd.isna(value) else value
+
+
 class DataProcessor:
     """Process and import data from CSV/Excel files"""
     
-    def __init__(self, db: Session):
+    REQUIRED_COLUMNS = {
+        "user_stories": ["Formatted ID", "Name", "Project", "Plan Estimate"],
+        "features": ["Formatted ID", "Name"],
+        "epics": ["Formatted ID", "Name"],
+        "clarity_timesheet": ["Team", "Resource Name (in Clarity)"],
+    }
+    
+    def __init__(self, db: Session, on_progress: Optional[Callable[[int, int], None]] = None):
         self.db = db
+        # Called with cumulative (rows_processed, rows_skipped) after each committed chunk
+        self.on_progress = on_progress
     
-    def process_user_stories(self, file_path: str) -> Dict[str, Any]:
+    def process_user_stories(self, file_path: SourceType, filename: Optional[str] = None) -> Dict[str, Any]:
         """
         Process user stories from Rally export
         Expected columns: Formatted ID, Name, Owner, Parent, Portfolio Item, Feature, 
                          Project, Release, Iteration, Plan Estimate
         """
-        try:
-            df = pd.read_csv(file_path)
-            
-            # Validate required columns
-            required_cols = ["Formatted ID", "Name", "Project", "Plan Estimate"]
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            if missing_cols:
-                return {
-                    "success": False,
-                    "error": f"Missing columns: {', '.join(missing_cols)}"
-                }
-            
-            rows_processed = 0
-            rows_skipped = 0
-            
-            for _, row in df.iterrows():
-                try:
-                    # Get or create feature if exists
-                    feature_id = None
-                    if pd.notna(row.get("Feature")):
-                        feature_formatted_id = self._extract_formatted_id(str(row["Feature"]))
-                        feature = self.db.query(Feature).filter(
-                            Feature.formatted_id == feature_formatted_id
-                        ).first()
-                        if feature:
-                            feature_id = feature.id
-                    
-                    # Check if user story already exists
-                    existing = self.db.query(UserStory).filter(
-                        UserStory.formatted_id == row["Formatted ID"]
-                    ).first()
-                    
-                    if existing:
-                        # Update existing
-                        existing.name = row["Name"]
-                        existing.owner = row.get("Owner")
-                        existing.team = row.get("Project")
-                        existing.release = row.get("Release")
-                        existing.iteration = row.get("Iteration")
-                        existing.plan_estimate = float(row["Plan Estimate"]) if pd.notna(row["Plan Estimate"]) else 0.0
-                        existing.feature_id = feature_id
-                    else:
-                        # Create new
-                        user_story = UserStory(
-                            formatted_id=row["Formatted ID"],
-                            name=row["Name"],
-                            owner=row.get("Owner"),
-                            team=row.get("Project"),
-                            release=row.get("Release"),
-                            iteration=row.get("Iteration"),
-                            plan_estimate=float(row["Plan Estimate"]) if pd.notna(row["Plan Estimate"]) else 0.0,
-                            feature_id=feature_id
-                        )
-                        self.db.add(user_story)
-                    
-                    rows_processed += 1
-                except Exception as e:
-                    logger.error(f"Error processing row: {e}")
-                    rows_skipped += 1
-                    continue
-            
-            self.db.commit()
-            
-            return {
-                "success": True,
-                "rows_processed": rows_processed,
-                "rows_skipped": rows_skipped,
-                "file_type": "user_stories"
-            }
-        
-        except Exception as e:
-            logger.error(f"Error processing user stories: {e}")
-            self.db.rollback()
-            return {
-                "success": False,
-                "error": str(e)
-            }
+        return self._run_import(
+            "user_stories",
+            file_path,
+            self.REQUIRED_COLUMNS["user_stories"],
+            self._upsert_user_stories,
+            filename
+        )
     
-    def process_features(self, file_path: str) -> Dict[str, Any]:
+    def process_features(self, file_path: SourceType, filename: Optional[str] = None) -> Dict[str, Any]:
         """
         Process features from Rally export
         Expected columns: Formatted ID, Name, Owner, Parent, Project, Release
         """
+        return self._run_import(
+            "features",
+            file_path,
+            self.REQUIRED_COLUMNS["features"],
+            self._import_features,
+            filename
+        )
+    
+    def process_epics(self, file_path: SourceType, filename: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Process epics from Rally export
+        Expected columns: Formatted ID, Name, State, Project, Owner, Parent
+        """
+        return self._run_import(
+            "epics",
+            file_path,
+            self.REQUIRED_COLUMNS["epics"],
+            self._import_epics,
+            filename
+        )
+    
+    def process_clarity_timesheet(self, file_path: SourceType, filename: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Process Clarity timesheet data
+        Expected columns: Team, Initiative, Resource Name, Network ID, Location, 
+                         and weekly columns with dates
+        """
+        return self._run_import(
+            "clarity_timesheet",
+            file_path,
+            self.REQUIRED_COLUMNS["clarity_timesheet"],
+            self._upsert_clarity_allocations,
+            filename
+        )
+    
+    def import_frame(self, file_type: str, df: pd.DataFrame) -> Tuple[int, int]:
+        """
+        Import an already parsed and validated DataFrame without committing,
+        so several files can share one transaction.
+        Returns (rows_processed, rows_skipped).
+        """
+        importers = {
+            "user_stories": self._upsert_user_stories,
+            "features": self._import_features,
+            "epics": self._import_epics,
+            "clarity_timesheet": self._upsert_clarity_allocations,
+        }
+        return importers[file_type](df)
+    
+    def _run_import(
+        self,
+        file_type: str,
+        file_path: SourceType,
+        required_cols: List[str],
+        import_chunk: Callable[[pd.DataFrame], Tuple[int, int]],
+        filename: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Stream a file in chunks of IMPORT_CHUNK_SIZE rows and import each chunk
+        in its own transaction. Columns are validated on the first chunk.
+        Progress is recorded in an ImportCheckpoint committed with each chunk, so
+        re-importing the same file after a failure resumes after the last
+        committed chunk.
+        """
+        checkpoint = None
         try:
-            df = pd.read_csv(file_path)
-            
-            required_cols = ["Formatted ID", "Name"]
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            if missing_cols:
-                return {
-                    "success": False,
-                    "error": f"Missing columns: {', '.join(missing_cols)}"
-                }
-            
-            rows_processed = 0
-            rows_skipped = 0
-            
-            for _, row in df.iterrows():
-                try:
-                    # Get or create epic if exists
-                    epic_id = None
-                    if pd.notna(row.get("Parent")):
-                        epic_formatted_id = self._extract_formatted_id(str(row["Parent"]))
-                        epic = self.db.query(Epic).filter(
-                            Epic.formatted_id == epic_formatted_id
-                        ).first()
-                        if epic:
-                            epic_id = epic.id
-                    
-                    # Check if feature already exists
-                    existing = self.db.query(Feature).filter(
-                        Feature.formatted_id == row["Formatted ID"]
-                    ).first()
-                    
-                    if existing:
-                        existing.name = row["Name"]
-                        existing.owner = row.get("Owner")
-                        existing.release = row.get("Release")
-                        existing.epic_id = epic_id
-                    else:
-                        feature = Feature(
-                            formatted_id=row["Formatted ID"],
-                            name=row["Name"],
-                            owner=row.get("Owner"),
-                            release=row.get("Release"),
-                            epic_id=epic_id
-                        )
-                        self.db.add(feature)
-                    
-                    rows_processed += 1
-                except Exception as e:
-                    logger.error(f"Error processing row: {e}")
-                    rows_skipped += 1
+            # Hash before streaming: hashing rewinds file objects
+            file_hash = file_digest(file_path)
+            position = 0
+            for chunk in read_in_chunks(file_path, settings.IMPORT_CHUNK_SIZE, filename):
+                if checkpoint is None:
+                    # Validate required columns
+                    missing_cols = [col for col in required_cols if col not in chunk.columns]
+                    if missing_cols:
+                        return {
+                            "success": False,
+                            "error": f"Missing columns: {', '.join(missing_cols)}"
+                        }
+                    checkpoint = self._get_checkpoint(file_type, file_hash, file_path, filename)
+                
+                start = position
+                position += len(chunk)
+                if position <= checkpoint.rows_committed:
                     continue
+                if start < checkpoint.rows_committed:
+                    chunk = chunk.iloc[checkpoint.rows_committed - start:]
+                
+                processed, skipped = import_chunk(chunk)
+                
+                checkpoint.rows_committed = position
+                checkpoint.chunks_committed += 1
+                checkpoint.rows_processed += processed
+                checkpoint.rows_skipped += skipped
+                self.db.commit()
+                
+                if self.on_progress:
+                    self.on_progress(checkpoint.rows_processed, checkpoint.rows_skipped)
             
+            checkpoint.status = "completed"
+            invalidate_lookup_index(self.db)
             self.db.commit()
             
             return {
                 "success": True,
-                "rows_processed": rows_processed,
-                "rows_skipped": rows_skipped,
-                "file_type": "features"
+                "rows_processed": checkpoint.rows_processed,
+                "rows_skipped": checkpoint.rows_skipped,
+                "file_type": file_type
             }
         
         except Exception as e:
-            logger.error(f"Error processing features: {e}")
+            logger.error(f"Error processing {file_type}: {e}")
             self.db.rollback()
+            if checkpoint is not None:
+                # Chunks committed before the failure are visible to the rules engine
+                invalidate_lookup_index(self.db)
+                self._fail_checkpoint(checkpoint, str(e))
             return {
                 "success": False,
                 "error": str(e)
             }
     
-    def process_epics(self, file_path: str) -> Dict[str, Any]:
-        """
-        Process epics from Rally export
-        Expected columns: Formatted ID, Name, State, Project, Owner, Parent
-        """
+    def _get_checkpoint(
+        self,
+        file_type: str,
+        file_hash: str,
+        file_path: SourceType,
+        filename: Optional[str]
+    ) -> ImportCheckpoint:
+        """Return the unfinished checkpoint for this file to resume, or start a new one"""
+        checkpoint = self.db.query(ImportCheckpoint).filter(
+            and_(
+                ImportCheckpoint.file_type == file_type,
+                ImportCheckpoint.file_hash == file_hash,
+                ImportCheckpoint.status != "completed"
+            )
+        ).order_by(ImportCheckpoint.id.desc()).first()
+        
+        if checkpoint:
+            logger.info(f"Resuming {file_type} import after row {checkpoint.rows_committed}")
+            checkpoint.status = "in_progress"
+            checkpoint.error = None
+        else:
+            checkpoint = ImportCheckpoint(
+                file_type=file_type,
+                file_hash=file_hash,
+                filename=filename or (file_path if isinstance(file_path, str) else None),
+                status="in_progress",
+                rows_committed=0,
+                chunks_committed=0,
+                rows_processed=0,
+                rows_skipped=0
+            )
+            self.db.add(checkpoint)
+        return checkpoint
+    
+    def _fail_checkpoint(self, checkpoint: ImportCheckpoint, error: str) -> None:
+        """Record the failure on the checkpoint; committed chunks are kept for resume"""
         try:
-            df = pd.read_csv(file_path)
-            
-            required_cols = ["Formatted ID", "Name"]
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            if missing_cols:
-                return {
-                    "success": False,
-                    "error": f"Missing columns: {', '.join(missing_cols)}"
-                }
-            
-            rows_processed = 0
-            rows_skipped = 0
-            
-            for _, row in df.iterrows():
-                try:
-                    # Get or create project from Parent field (ITPR)
-                    project_id = None
-                    if pd.notna(row.get("Parent")):
-                        itpr_code = self._extract_itpr_code(str(row["Parent"]))
-                        if itpr_code:
-                            project = self.db.query(Project).filter(
-                                Project.itpr_code == itpr_code
-                            ).first()
-                            
-                            if not project:
-                                # Create project
-                                project = Project(
-                                    itpr_code=itpr_code,
-                                    name=str(row["Parent"]),
-                                    theme=self._extract_theme(str(row["Parent"]))
-                                )
-                                self.db.add(project)
-                                self.db.flush()
-                            
-                            project_id = project.id
-                    
-                    # Check if epic already exists
-                    existing = self.db.query(Epic).filter(
-                        Epic.formatted_id == row["Formatted ID"]
-                    ).first()
-                    
-                    if existing:
-                        existing.name = row["Name"]
-                        existing.state = row.get("State")
-                        existing.owner = row.get("Owner")
-                        existing.project_id = project_id
-                    else:
-                        epic = Epic(
-                            formatted_id=row["Formatted ID"],
-                            name=row["Name"],
-                            state=row.get("State"),
-                            owner=row.get("Owner"),
-                            project_id=project_id
-                        )
-                        self.db.add(epic)
-                    
-                    rows_processed += 1
-                except Exception as e:
-                    logger.error(f"Error processing row: {e}")
-                    rows_skipped += 1
-                    continue
-            
+            if checkpoint.id is None:
+                return
+            checkpoint.status = "failed"
+            checkpoint.error = error
             self.db.commit()
-            
-            return {
-                "success": True,
-                "rows_processed": rows_processed,
-                "rows_skipped": rows_skipped,
-                "file_type": "epics"
-            }
-        
         except Exception as e:
-            logger.error(f"Error processing epics: {e}")
+            logger.error(f"Error saving import checkpoint: {e}")
             self.db.rollback()
-            return {
-                "success": False,
-                "error": str(e)
+    
+    def _import_features(self, df: pd.DataFrame) -> Tuple[int, int]:
+        """Import a chunk of Rally features. Returns (rows_processed, rows_skipped)."""
+        rows_processed = 0
+        rows_skipped = 0
+        touched_epic_ids = set()
+        
+        for _, row in df.iterrows():
+            try:
+                # Get or create epic if exists
+                epic_id = None
+                if pd.notna(row.get("Parent")):
+                    epic_formatted_id = self._extract_formatted_id(str(row["Parent"]))
+                    epic = self.db.query(Epic).filter(
+                        Epic.formatted_id == epic_formatted_id
+                    ).first()
+                    if epic:
+                        epic_id = epic.id
+                
+                # Check if feature already exists
+                existing = self.db.query(Feature).filter(
+                    Feature.formatted_id == row["Formatted ID"]
+                ).first()
+                
+                if existing:
+                    touched_epic_ids.add(existing.epic_id)
+                    existing.name = row["Name"]
+                    existing.owner = row.get("Owner")
+                    existing.release = row.get("Release")
+                    existing.epic_id = epic_id
+                else:
+                    feature = Feature(
+                        formatted_id=row["Formatted ID"],
+                        name=row["Name"],
+                        owner=row.get("Owner"),
+                        release=row.get("Release"),
+                        epic_id=epic_id
+                    )
+                    self.db.add(feature)
+                
+                touched_epic_ids.add(epic_id)
+                rows_processed += 1
+            except Exception as e:
+                logger.error(f"Error processing row: {e}")
+                rows_skipped += 1
+                continue
+        
+        record_changes(self.db, project_ids=self._projects_for_epics(touched_epic_ids))
+        refresh_rollups(self.db, epic_ids=touched_epic_ids)
+        
+        return rows_processed, rows_skipped
+    
+    def _import_epics(self, df: pd.DataFrame) -> Tuple[int, int]:
+        """Import a chunk of Rally epics. Returns (rows_processed, rows_skipped)."""
+        rows_processed = 0
+        rows_skipped = 0
+        touched_project_ids = set()
+        
+        for _, row in df.iterrows():
+            try:
+                # Get or create project from Parent field (ITPR)
+                project_id = None
+                if pd.notna(row.get("Parent")):
+                    itpr_code = self._extract_itpr_code(str(row["Parent"]))
+                    if itpr_code:
+                        project = self.db.query(Project).filter(
+                            Project.itpr_code == itpr_code
+                        ).first()
+                        
+                        if not project:
+                            # Create project
+                            project = Project(
+                                itpr_code=itpr_code,
+                                name=str(row["Parent"]),
+                                theme=self._extract_theme(str(row["Parent"]))
+                            )
+                            self.db.add(project)
+                            self.db.flush()
+                        elif not project.theme:
+                            # Project was created from a Clarity timesheet; the Rally
+                            # parent carries the full name and theme
+                            project.name = str(row["Parent"])
+                            project.theme = self._extract_theme(str(row["Parent"]))
+                        
+                        project_id = project.id
+                
+                # Check if epic already exists
+                existing = self.db.query(Epic).filter(
+                    Epic.formatted_id == row["Formatted ID"]
+                ).first()
+                
+                if existing:
+                    touched_project_ids.add(existing.project_id)
+                    existing.name = row["Name"]
+                    existing.state = row.get("State")
+                    existing.owner = row.get("Owner")
+                    existing.project_id = project_id
+                else:
+                    epic = Epic(
+                        formatted_id=row["Formatted ID"],
+                        name=row["Name"],
+                        state=row.get("State"),
+                        owner=row.get("Owner"),
+                        project_id=project_id
+                    )
+                    self.db.add(epic)
+                
+                touched_project_ids.add(project_id)
+                rows_processed += 1
+            except Exception as e:
+                logger.error(f"Error processing row: {e}")
+                rows_skipped += 1
+                continue
+        
+        record_changes(self.db, project_ids=touched_project_ids)
+        refresh_rollups(self.db, project_ids=touched_project_ids)
+        
+        return rows_processed, rows_skipped
+    
+    def _upsert_user_stories(self, df: pd.DataFrame) -> Tuple[int, int]:
+        """
+        Set-based upsert of user stories.
+        Parent features and existing stories are resolved with batched IN queries,
+        then rows are written with bulk insert/update mappings.
+        Returns (rows_processed, rows_skipped).
+        """
+        estimates = pd.to_numeric(df["Plan Estimate"], errors="coerce")
+        invalid = df["Plan Estimate"].notna() & estimates.isna()
+        for value in df.loc[invalid, "Plan Estimate"]:
+            logger.error(f"Error processing row: could not convert Plan Estimate {value!r} to float")
+        rows_skipped = int(invalid.sum())
+        
+        valid = df[~invalid]
+        estimates = estimates[~invalid].fillna(0.0)
+        
+        # Resolve all parent features in one pass
+        feature_refs = valid["Feature"] if "Feature" in valid.columns else pd.Series(index=valid.index, dtype=object)
+        feature_keys = feature_refs.dropna().astype(str).map(self._extract_formatted_id)
+        feature_ids = self._lookup_ids(Feature.formatted_id, feature_keys.unique().tolist())
+        
+        records = {}
+        for idx, row in zip(valid.index, valid.to_dict("records")):
+            feature_key = feature_keys.get(idx)
+            # Later rows win when an export repeats a story
+            records[row["Formatted ID"]] = {
+                "formatted_id": row["Formatted ID"],
+                "name": row["Name"],
+                "owner": _clean(row.get("Owner")),
+                "team": _clean(row.get("Project")),
+                "release": _clean(row.get("Release")),
+                "iteration": _clean(row.get("Iteration")),
+                "plan_estimate": float(estimates[idx]),
+                "feature_id": feature_ids.get(feature_key) if feature_key is not None else None
             }
+        
+        # Projects of both the previous and the new parent features change
+        touched_feature_ids = {r["feature_id"] for r in records.values()}
+        for batch in _chunks(list(records), settings.IMPORT_BATCH_SIZE):
+            touched_feature_ids.update(
+                feature_id for feature_id, in self.db.query(UserStory.feature_id).filter(
+                    UserStory.formatted_id.in_(batch)
+                ).all()
+            )
+        
+        self._bulk_upsert(UserStory, list(records.values()))
+        record_changes(self.db, project_ids=self._projects_for_features(touched_feature_ids))
+        refresh_rollups(self.db, feature_ids=touched_feature_ids)
+        
+        return len(valid), rows_skipped
     
-    def process_clarity_timesheet(self, file_path: str) -> Dict[str, Any]:
+    def _upsert_clarity_allocations(self, df: pd.DataFrame) -> Tuple[int, int]:
         """
-        Process Clarity timesheet data
-        Expected columns: Team, Initiative, Resource Name, Network ID, Location, 
-                         and weekly columns with dates
+        Columnar import of a Clarity timesheet.
+        Week columns are melted into long form, teams/members/projects are
+        deduplicated in pandas and resolved in bulk, and allocations are upserted
+        in batches keyed on (team_member_id, project_id, week_start_date).
+        Returns (rows_processed, rows_skipped).
         """
-        try:
-            df = pd.read_csv(file_path)
-            
-            # Validate required columns
-            required_cols = ["Team", "Resource Name (in Clarity)"]
-            missing_cols = [col for col in required_cols if col not in df.columns]
-            if missing_cols:
-                return {
-                    "success": False,
-                    "error": f"Missing columns: {', '.join(missing_cols)}"
+        member_col = "Resource Name (in Clarity)"
+        email_col = "Network ID or email Location"
+        initiative_col = "Initiative (Use Dropdown of Current ITPRs)"
+        
+        # Parse every column header once; week columns are the ones that parse as dates
+        parsed = pd.to_datetime(pd.Index(df.columns.astype(str)), errors="coerce", format="mixed")
+        week_columns = {col: ts.date() for col, ts in zip(df.columns, parsed) if not pd.isna(ts)}
+        
+        df = df.copy()
+        if initiative_col in df.columns:
+            df["_itpr_code"] = df[initiative_col].astype("string").str.extract(r"(ITPR\d+)", expand=False)
+        else:
+            df["_itpr_code"] = pd.Series(pd.NA, index=df.index, dtype="string")
+        
+        hours = df[list(week_columns)].apply(pd.to_numeric, errors="coerce")
+        bad_hours = (df[list(week_columns)].notna() & hours.isna()).any(axis=1) & df["_itpr_code"].notna()
+        invalid = df["Team"].isna() | df[member_col].isna() | bad_hours
+        if invalid.any():
+            logger.error(f"Error processing rows: skipping {int(invalid.sum())} rows with missing team/resource or non-numeric hours")
+        
+        valid = df[~invalid].copy()
+        hours = hours[~invalid]
+        
+        default_emails = valid[member_col].astype(str).str.replace(" ", "_").str.lower() + "@company.com"
+        if email_col in valid.columns:
+            valid["_email"] = valid[email_col].fillna(default_emails)
+        else:
+            valid["_email"] = default_emails
+        
+        # Teams
+        team_ids = self._get_or_create_ids(
+            Team.name,
+            {name: {"name": name} for name in valid["Team"].unique()}
+        )
+        
+        # Team members (first occurrence of an email defines the member)
+        members = valid.drop_duplicates("_email")
+        member_ids = self._get_or_create_ids(
+            TeamMember.email,
+            {
+                row["_email"]: {
+                    "name": row[member_col],
+                    "email": row["_email"],
+                    "network_id": _clean(row.get(email_col)),
+                    "location": _clean(row.get("Location")),
+                    "team_id": team_ids[row["Team"]]
                 }
-            
-            rows_processed = 0
-            rows_skipped = 0
-            
-            # Get date columns (columns that can be parsed as dates)
-            date_columns = []
-            for col in df.columns:
-                try:
-                    pd.to_datetime(col)
-                    date_columns.append(col)
-                except:
-                    pass
-            
-            for _, row in df.iterrows():
-                try:
-                    # Get or create team
-                    team_name = row["Team"]
-                    team = self.db.query(Team).filter(Team.name == team_name).first()
-                    if not team:
-                        team = Team(name=team_name)
-                        self.db.add(team)
-                        self.db.flush()
-                    
-                    # Get or create team member
-                    member_name = row["Resource Name (in Clarity)"]
-                    member_email = row.get("Network ID or email Location", f"{member_name.replace(' ', '_').lower()}@company.com")
-                    
-                    member = self.db.query(TeamMember).filter(
-                        TeamMember.email == member_email
-                    ).first()
-                    
-                    if not member:
-                        member = TeamMember(
-                            name=member_name,
-                            email=member_email,
-                            network_id=row.get("Network ID or email Location"),
-                            location=row.get("Location"),
-                            team_id=team.id
-                        )
-                        self.db.add(member)
-                        self.db.flush()
-                    
-                    # Get or create project
-                    if pd.notna(row.get("Initiative (Use Dropdown of Current ITPRs)")):
-                        itpr_code = self._extract_itpr_code(str(row["Initiative (Use Dropdown of Current ITPRs)"]))
-                        if itpr_code:
-                            project = self.db.query(Project).filter(
-                                Project.itpr_code == itpr_code
-                            ).first()
-                            
-                            if not project:
-                                project = Project(
-                                    itpr_code=itpr_code,
-                                    name=str(row["Initiative (Use Dropdown of Current ITPRs)"])
-                                )
-                                self.db.add(project)
-                                self.db.flush()
-                            
-                            # Process weekly allocations
-                            for date_col in date_columns:
-                                if pd.notna(row[date_col]):
-                                    week_start = pd.to_datetime(date_col).date()
-                                    hours = float(row[date_col])
-                                    
-                                    # Check if allocation exists
-                                    existing = self.db.query(TeamAllocation).filter(
-                                        and_(
-                                            TeamAllocation.team_member_id == member.id,
-                                            TeamAllocation.project_id == project.id,
-                                            TeamAllocation.week_start_date == week_start
-                                        )
-                                    ).first()
-                                    
-                                    if existing:
-                                        existing.allocated_hours = hours
-                                    else:
-                                        allocation = TeamAllocation(
-                                            team_id=team.id,
-                                            project_id=project.id,
-                                            team_member_id=member.id,
-                                            week_start_date=week_start,
-                                            allocated_hours=hours
-                                        )
-                                        self.db.add(allocation)
-                    
-                    rows_processed += 1
-                except Exception as e:
-                    logger.error(f"Error processing row: {e}")
-                    rows_skipped += 1
-                    continue
-            
-            self.db.commit()
-            
-            return {
-                "success": True,
-                "rows_processed": rows_processed,
-                "rows_skipped": rows_skipped,
-                "file_type": "clarity_timesheet"
+                for row in members.to_dict("records")
             }
+        )
         
-        except Exception as e:
-            logger.error(f"Error processing clarity timesheet: {e}")
-            self.db.rollback()
-            return {
-                "success": False,
-                "error": str(e)
+        # Projects
+        projects = valid.dropna(subset=["_itpr_code"]).drop_duplicates("_itpr_code")
+        project_ids = self._get_or_create_ids(
+            Project.itpr_code,
+            {
+                row["_itpr_code"]: {"itpr_code": row["_itpr_code"], "name": str(row[initiative_col])}
+                for row in projects.to_dict("records")
             }
+        )
+        
+        # Weekly allocations in long form
+        with_project = valid["_itpr_code"].notna()
+        allocations = hours[with_project].rename(columns=week_columns)
+        allocations["team_id"] = valid.loc[with_project, "Team"].map(team_ids)
+        allocations["team_member_id"] = valid.loc[with_project, "_email"].map(member_ids)
+        allocations["project_id"] = valid.loc[with_project, "_itpr_code"].map(project_ids)
+        allocations = allocations.melt(
+            id_vars=["team_id", "team_member_id", "project_id"],
+            var_name="week_start_date",
+            value_name="allocated_hours"
+        ).dropna(subset=["allocated_hours"])
+        allocations = allocations.drop_duplicates(
+            ["team_member_id", "project_id", "week_start_date"], keep="last"
+        )
+        
+        self._upsert_allocations(allocations)
+        record_changes(self.db, project_ids=project_ids.values(), team_ids=team_ids.values())
+        
+        return len(valid), int(invalid.sum())
+    
+    def _get_or_create_ids(self, key_column, records: Dict[Any, Dict[str, Any]]) -> Dict[Any, int]:
+        """Resolve natural keys to ids, bulk inserting the ones that don't exist yet"""
+        keys = list(records)
+        ids = self._lookup_ids(key_column, keys)
+        missing = [records[k] for k in keys if k not in ids]
+        if missing:
+            for batch in _chunks(missing, settings.IMPORT_BATCH_SIZE):
+                self.db.bulk_insert_mappings(key_column.class_, batch)
+            ids.update(self._lookup_ids(key_column, [k for k in keys if k not in ids]))
+        return ids
+    
+    def _upsert_allocations(self, allocations: pd.DataFrame) -> None:
+        """Batch upsert TeamAllocation rows keyed on (team_member_id, project_id, week_start_date)"""
+        if allocations.empty:
+            return
+        
+        weeks = allocations["week_start_date"]
+        existing = {}
+        for batch in _chunks(allocations["team_member_id"].unique().tolist(), settings.IMPORT_BATCH_SIZE):
+            rows = self.db.query(
+                TeamAllocation.team_member_id,
+                TeamAllocation.project_id,
+                TeamAllocation.week_start_date,
+                TeamAllocation.id
+            ).filter(
+                TeamAllocation.team_member_id.in_(batch),
+                TeamAllocation.week_start_date.between(weeks.min(), weeks.max())
+            ).all()
+            existing.update({(m, p, w): allocation_id for m, p, w, allocation_id in rows})
+        
+        inserts = []
+        updates = []
+        for row in allocations.to_dict("records"):
+            key = (int(row["team_member_id"]), int(row["project_id"]), row["week_start_date"])
+            if key in existing:
+                updates.append({"id": existing[key], "allocated_hours": float(row["allocated_hours"])})
+            else:
+                inserts.append({
+                    "team_id": int(row["team_id"]),
+                    "team_member_id": key[0],
+                    "project_id": key[1],
+                    "week_start_date": key[2],
+                    "allocated_hours": float(row["allocated_hours"])
+                })
+        
+        for batch in _chunks(inserts, settings.IMPORT_BATCH_SIZE):
+            self.db.bulk_insert_mappings(TeamAllocation, batch)
+        for batch in _chunks(updates, settings.IMPORT_BATCH_SIZE):
+            self.db.bulk_update_mappings(TeamAllocation, batch)
+    
+    def _projects_for_epics(self, epic_ids: Set[Optional[int]]) -> Set[int]:
+        """Project ids of the given epics"""
+        project_ids = set()
+        for batch in _chunks([i for i in epic_ids if i is not None], settings.IMPORT_BATCH_SIZE):
+            project_ids.update(
+                project_id for project_id, in self.db.query(Epic.project_id).filter(Epic.id.in_(batch)).distinct()
+            )
+        return project_ids
+    
+    def _projects_for_features(self, feature_ids: Set[Optional[int]]) -> Set[int]:
+        """Project ids of the given features, through their epics"""
+        project_ids = set()
+        for batch in _chunks([i for i in feature_ids if i is not None], settings.IMPORT_BATCH_SIZE):
+            project_ids.update(
+                project_id for project_id, in self.db.query(Epic.project_id).join(
+                    Feature, Feature.epic_id == Epic.id
+                ).filter(Feature.id.in_(batch)).distinct()
+            )
+        return project_ids
+    
+    def _lookup_ids(self, key_column, keys: List[Any]) -> Dict[Any, int]:
+        """Map natural keys to primary keys using batched IN queries"""
+        model = key_column.class_
+        ids = {}
+        for batch in _chunks(keys, settings.IMPORT_BATCH_SIZE):
+            ids.update(self.db.query(key_column, model.id).filter(key_column.in_(batch)).all())
+        return ids
+    
+    def _bulk_upsert(self, model, records: List[Dict[str, Any]], key: str = "formatted_id") -> None:
+        """Split records into inserts and updates on `key` and write them in batches"""
+        existing = self._lookup_ids(getattr(model, key), [r[key] for r in records])
+        
+        inserts = [r for r in records if r[key] not in existing]
+        updates = [{**r, "id": existing[r[key]]} for r in records if r[key] in existing]
+        
+        for batch in _chunks(inserts, settings.IMPORT_BATCH_SIZE):
+            self.db.bulk_insert_mappings(model, batch)
+        for batch in _chunks(updates, settings.IMPORT_BATCH_SIZE):
+            self.db.bulk_update_mappings(model, batch)
     
     def _extract_formatted_id(self, text: str) -> str:
         """Extract formatted ID from text (e.g., 'Feature F214458: ...' -> 'F214458')"""
@@ -0,0 +1,396 @@
+"""
+Background import jobs
+Uploads are queued as ImportJob rows and processed by a bounded in-process
+thread pool, so large imports never run on the request's event loop. Each
+queued or running job holds a lock owned by its process; after a restart,
+jobs whose lock is free have no live owner and are resumed or failed. On
+PostgreSQL the locks live on a dedicated connection that is health-checked
+and re-takes them if it has to reconnect; a job whose lock another process
+took meanwhile is abandoned by this one.
+"""
+import os
+import time
+import shutil
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, Any, IO, Set
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import NullPool
+
+from app.core.config import settings
+from app.db.database import SessionLocal, engine
+from app.db.models import ImportJob
+from app.services.dashboard_cache import invalidate_dashboard_summary
+from app.services.data_processor import DataProcessor
+from app.services.import_orchestrator import ImportOrchestrator, shutdown_parse_pools
+from app.services.scheduler import scheduler
+
+logger = logging.getLogger(__name__)
+
+# DataProcessor method for each upload type
+PROCESSORS = {
+    "user_stories": "process_user_stories",
+    "features": "process_features",
+    "epics": "process_epics",
+    "clarity_timesheet": "process_clarity_timesheet",
+}
+
+OPEN_STATUSES = ["queued", "running"]
+JOB_LOCK_CLASS = 72_710_004  # pg_advisory_lock class key; the job id is the object key
+
+_executor = ThreadPoolExecutor(max_workers=settings.IMPORT_WORKERS, thread_name_prefix="import-job")
+
+# job id -> lock file (SQLite) or None (PostgreSQL, locks live on _lock_connection)
+_job_locks: Dict[int, Any] = {}
+_job_locks_guard = threading.Lock()
+_lock_connection = None  # Open while any job is locked; not taken from the pool
+_lock_watchdog = None
+_lost_jobs: Set[int] = set()  # Locked by another process while our lock connection was down
+
+
+class JobLockLost(RuntimeError):
+    """This process no longer owns the job; another one has taken it over"""
+
+
+def submit_import(db: Session, file_type: str, source: IO[bytes], filename: str) -> ImportJob:
+    """
+    Queue an import job. The upload is streamed to UPLOAD_DIR (it must outlive
+    the request) and the job is handed to the worker pool.
+    """
+    if file_type not in PROCESSORS and file_type != "bundle":
+        raise ValueError(f"Invalid file type: {file_type}")
+
+    job = ImportJob(file_type=file_type, filename=filename, status="queued")
+    db.add(job)
+    db.flush()
+    # Owned before it is visible, so a starting worker never takes it for an orphan
+    _lock_job(job.id)
+    try:
+        db.commit()
+    except Exception:
+        _unlock_job(job.id)
+        raise
+    db.refresh(job)
+
+    file_path = os.path.join(settings.UPLOAD_DIR, f"import_{job.id}_{os.path.basename(filename)}")
+    try:
+        source.seek(0)
+        with open(file_path, "wb") as buffer:
+            shutil.copyfileobj(source, buffer)
+    except Exception as e:
+        job.status = "failed"
+        job.error = f"Could not store upload: {e}"
+        db.commit()
+        _unlock_job(job.id)
+        raise
+
+    job.file_path = file_path
+    db.commit()
+
+    _executor.submit(_run_job, job.id)
+    return job
+
+
+def _run_job(job_id: int) -> None:
+    """Run a queued import in a worker thread with its own session"""
+    db = SessionLocal()
+    job = None
+    try:
+        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        if not job:
+            return
+
+        job.status = "running"
+        job.started_at = datetime.now(timezone.utc)
+        db.commit()
+
+        def on_progress(rows_processed: int, rows_skipped: int) -> None:
+            _check_owned(job_id)
+            job.rows_processed = rows_processed
+            job.rows_skipped = rows_skipped
+            db.commit()
+
+        if job.file_type == "bundle":
+            result = ImportOrchestrator(db).import_bundle(job.file_path)
+        else:
+            processor = DataProcessor(db, on_progress=on_progress)
+            result = getattr(processor, PROCESSORS[job.file_type])(job.file_path, job.filename)
+
+        _check_owned(job_id)
+        job.rows_processed = result.get("rows_processed", job.rows_processed or 0)
+        job.rows_skipped = result.get("rows_skipped", job.rows_skipped or 0)
+        job.status = "completed" if result.get("success") else "failed"
+        job.error = result.get("error")
+        job.finished_at = datetime.now(timezone.utc)
+        # Chunks may have committed even if the import failed
+        invalidate_dashboard_summary(db)
+        db.commit()
+        logger.info(f"Import job {job_id} {job.status}: {job.rows_processed} rows")
+
+        if job.status == "completed":
+            # Bring the rule snapshot and insights up to date with the new data
+            scheduler.trigger()
+
+    except JobLockLost as e:
+        # The job row and the upload belong to the new owner now
+        logger.error(str(e))
+        db.rollback()
+
+    except Exception as e:
+        logger.error(f"Error running import job {job_id}: {e}")
+        db.rollback()
+        if job is not None:
+            job.status = "failed"
+            job.error = str(e)
+            job.finished_at = datetime.now(timezone.utc)
+            invalidate_dashboard_summary(db)
+            db.commit()
+
+    finally:
+        lost = job_id in _lost_jobs
+        if not lost and job is not None and job.file_path and os.path.exists(job.file_path):
+            os.remove(job.file_path)
+        db.close()
+        _unlock_job(job_id)
+        _lost_jobs.discard(job_id)
+
+
+def recover_orphaned_jobs() -> int:
+    """
+    Pick up jobs left queued or running by a process that has exited (a
+    restart or a recycled worker). A job whose lock can be taken has no
+    live owner: it is requeued here if its upload is still on disk (file
+    imports resume after the last committed chunk), otherwise marked
+    failed. Returns the number of jobs requeued.
+    """
+    db = SessionLocal()
+    requeued = 0
+    try:
+        job_ids = [
+            job_id for job_id, in db.query(ImportJob.id).filter(ImportJob.status.in_(OPEN_STATUSES)).all()
+        ]
+        for job_id in job_ids:
+            if not _lock_job(job_id, wait=False):
+                continue  # a live process owns it
+
+            # Re-read under the lock: the owner may have finished it meanwhile
+            job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+            if job is None or job.status not in OPEN_STATUSES:
+                _unlock_job(job_id)
+                continue
+
+            if job.file_path and os.path.exists(job.file_path):
+                logger.info(f"Requeueing import job {job_id} interrupted by a restart")
+                job.status = "queued"
+                db.commit()
+                _executor.submit(_run_job, job_id)
+                requeued += 1
+            else:
+                job.status = "failed"
+                job.error = "Interrupted by a server restart; the upload is no longer available"
+                job.finished_at = datetime.now(timezone.utc)
+                db.commit()
+                _unlock_job(job_id)
+    finally:
+        db.close()
+    return requeued
+
+
+def _lock_job(job_id: int, wait: bool = True) -> bool:
+    """
+    Mark a job as owned by this process: a PostgreSQL session advisory lock
+    (all of the process's jobs share one connection) or an exclusive lock
+    on a file in UPLOAD_DIR. The database or the OS drops it if the process
+    dies. Returns False if another process holds it and `wait` is False.
+    """
+    with _job_locks_guard:
+        if job_id in _job_locks:
+            return True
+
+        if engine.dialect.name == "postgresql":
+            _check_lock_connection()
+            function = "pg_advisory_lock" if wait else "pg_try_advisory_lock"
+            locked = _lock_connection.execute(
+                text(f"SELECT {function}(:lock_class, :job_id)"), {"lock_class": JOB_LOCK_CLASS, "job_id": job_id}
+            ).scalar()
+            # Session-level locks outlive the transaction; don't sit idle in one
+            _lock_connection.commit()
+            if locked is False:
+                return False
+            _job_locks[job_id] = None
+            _start_lock_watchdog()
+            return True
+
+        try:
+            import fcntl
+        except ImportError:  # Windows: no fcntl, single-process development only
+            _job_locks[job_id] = None
+            return True
+
+        lock_file = open(_lock_path(job_id), "w")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if wait else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+        _job_locks[job_id] = lock_file
+        return True
+
+
+def _unlock_job(job_id: int) -> None:
+    """Release a job lock taken by _lock_job"""
+    global _lock_connection
+    with _job_locks_guard:
+        if job_id not in _job_locks:
+            return
+        lock_file = _job_locks.pop(job_id)
+
+        if engine.dialect.name == "postgresql":
+            if not _job_locks:
+                # Closing the connection releases the lock; nothing is left to hold it open for
+                connection, _lock_connection = _lock_connection, None
+                if connection is not None:
+                    connection.close()
+                return
+            try:
+                _lock_connection.execute(
+                    text("SELECT pg_advisory_unlock(:lock_class, :job_id)"),
+                    {"lock_class": JOB_LOCK_CLASS, "job_id": job_id}
+                )
+                _lock_connection.commit()
+            except DBAPIError as e:
+                # The connection dropped and took every lock with it; take back the others'
+                logger.error(f"Import job lock connection lost while unlocking job {job_id}: {e}")
+                _lock_connection.invalidate()
+                _lock_connection = None
+                try:
+                    _check_lock_connection()
+                except Exception as e:
+                    logger.error(f"Could not restore import job locks: {e}")
+        elif lock_file is not None:
+            import fcntl
+
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+            lock_file.close()
+            try:
+                os.remove(_lock_path(job_id))
+            except OSError:
+                pass
+
+
+def _check_lock_connection() -> None:
+    """
+    Make sure the PostgreSQL lock connection is alive, with _job_locks_guard
+    held. If it dropped, the server released every lock on it: reconnect and
+    take them again. A job another process has locked in the meantime (its
+    recover_orphaned_jobs found the lock free) is no longer ours; it is
+    logged as an error and its runner stops at the next _check_owned.
+    """
+    global _lock_connection
+    if _lock_connection is not None:
+        try:
+            _lock_connection.execute(text("SELECT 1"))
+            _lock_connection.commit()
+            return
+        except DBAPIError as e:
+            logger.error(f"Import job lock connection lost, re-taking {len(_job_locks)} job lock(s): {e}")
+            _lock_connection.invalidate()
+            _lock_connection = None
+
+    _lock_connection = _lock_engine().connect()
+    for job_id in list(_job_locks):
+        locked = _lock_connection.execute(
+            text("SELECT pg_try_advisory_lock(:lock_class, :job_id)"), {"lock_class": JOB_LOCK_CLASS, "job_id": job_id}
+        ).scalar()
+        if not locked:
+            logger.error(f"Import job {job_id} was taken over by another process while its lock was lost")
+            del _job_locks[job_id]
+            _lost_jobs.add(job_id)
+    _lock_connection.commit()
+
+
+def _lock_engine():
+    """
+    Engine for the lock connection: unpooled, so it never holds a pool slot,
+    without the statement timeout (pg_advisory_lock may wait), and with TCP
+    keepalives so a dead peer shows up as an error rather than a hang
+    """
+    return create_engine(
+        engine.url,
+        poolclass=NullPool,
+        connect_args={"keepalives": 1, "keepalives_idle": 30, "keepalives_interval": 10, "keepalives_count": 3}
+    )
+
+
+def _start_lock_watchdog() -> None:
+    """Start the thread that checks the lock connection while jobs are locked"""
+    global _lock_watchdog
+    if _lock_watchdog is None or not _lock_watchdog.is_alive():
+        _lock_watchdog = threading.Thread(target=_watch_lock_connection, name="import-job-locks", daemon=True)
+        _lock_watchdog.start()
+
+
+def _watch_lock_connection() -> None:
+    global _lock_watchdog
+    while True:
+        time.sleep(settings.IMPORT_LOCK_CHECK_SECONDS)
+        with _job_locks_guard:
+            if not _job_locks:
+                # The next _lock_job starts a new watchdog
+                _lock_watchdog = None
+                return
+            try:
+                _check_lock_connection()
+            except Exception as e:
+                # Still down; the next check tries again
+                logger.error(f"Could not restore import job locks: {e}")
+
+
+def _check_owned(job_id: int) -> None:
+    """Raise JobLockLost if another process has taken the job over"""
+    if job_id in _lost_jobs:
+        raise JobLockLost(f"Import job {job_id} is owned by another process now; abandoning it here")
+
+
+def _lock_path(job_id: int) -> str:
+    return os.path.join(settings.UPLOAD_DIR, f"import_{job_id}.lock")
+
+
+def get_job_status(job: ImportJob) -> Dict[str, Any]:
+    """Job progress including throughput in rows per second"""
+    throughput = 0.0
+    if job.started_at:
+        finished_at = job.finished_at or datetime.now(timezone.utc)
+        elapsed = (_as_utc(finished_at) - _as_utc(job.started_at)).total_seconds()
+        rows_done = (job.rows_processed or 0) + (job.rows_skipped or 0)
+        throughput = rows_done / elapsed if elapsed > 0 else 0.0
+
+    return {
+        "id": job.id,
+        "file_type": job.file_type,
+        "filename": job.filename,
+        "status": job.status,
+        "rows_processed": job.rows_processed or 0,
+        "rows_skipped": job.rows_skipped or 0,
+        "throughput_rows_per_second": round(throughput, 1),
+        "error": job.error,
+        "created_at": job.created_at,
+        "started_at": job.started_at,
+        "finished_at": job.finished_at,
+    }
+
+
+def _as_utc(value: datetime) -> datetime:
+    """SQLite returns naive datetimes; they are stored as UTC"""
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def shutdown() -> None:
+    """Stop accepting jobs; running imports finish in the background"""
+    _executor.shutdown(wait=False)
+    shutdown_parse_pools()
@@ -0,0 +1,372 @@
+"""
+Multi-file import orchestrator
+Imports a bundle of Rally/Clarity exports (a directory or a zip file).
+Large bundles are parsed and validated in parallel workers that spill each
+chunk to disk; small ones are streamed inline. Database writes consume one
+chunk at a time in Epic -> Feature -> User Story dependency order, and the
+whole bundle is committed as a single transaction.
+"""
+import os
+import time
+import zipfile
+import tempfile
+import logging
+import threading
+import multiprocessing
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Any, Iterable, List, Tuple, Optional, Iterator
+
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.business_rules import invalidate_lookup_index
+from app.services.data_processor import DataProcessor
+from app.services.file_reader import read_in_chunks
+
+logger = logging.getLogger(__name__)
+
+SUPPORTED_EXTENSIONS = (".csv", ".xlsx", ".xls")
+
+# File type -> types whose writes must be finished first
+DEPENDENCIES = {
+    "epics": [],
+    "features": ["epics"],
+    "user_stories": ["features"],
+    "clarity_timesheet": [],
+}
+WRITE_ORDER = list(DEPENDENCIES)
+
+# Filename keywords used to recognise each file type, checked in order
+FILE_TYPE_KEYWORDS = [
+    ("clarity_timesheet", ("clarity", "timesheet")),
+    ("user_stories", ("userstor", "user_stor", "user-stor", "stories")),
+    ("features", ("feature",)),
+    ("epics", ("epic",)),
+]
+
+
+# Resident size of one spawned parse process, which re-imports the app
+PARSE_PROCESS_MB = 120
+
+# Worker count -> parse process pool, kept for the life of the process (see _parse_pool)
+_parse_pools: Dict[int, ProcessPoolExecutor] = {}
+_parse_pools_lock = threading.Lock()
+
+
+def detect_file_type(filename: str) -> Optional[str]:
+    """Guess the import type of a bundle file from its name"""
+    name = os.path.basename(filename).lower()
+    if not name.endswith(SUPPORTED_EXTENSIONS):
+        return None
+    for file_type, keywords in FILE_TYPE_KEYWORDS:
+        if any(keyword in name for keyword in keywords):
+            return file_type
+    return None
+
+
+def _missing_columns(file_type: str, df: pd.DataFrame) -> List[str]:
+    return [col for col in DataProcessor.REQUIRED_COLUMNS[file_type] if col not in df.columns]
+
+
+def _parse_file(file_type: str, file_path: str, spill_dir: str) -> Tuple[List[str], List[str], float]:
+    """
+    Parse and validate one file, pickling each chunk into spill_dir so
+    neither the parser nor the writer holds more than a chunk at a time.
+    Runs in a parse thread or process.
+    Returns (chunk_paths, missing_columns, parse_seconds).
+    """
+    start = time.perf_counter()
+    chunk_paths = []
+    stem = os.path.join(spill_dir, os.path.basename(file_path))
+    for index, chunk in enumerate(read_in_chunks(file_path, settings.IMPORT_CHUNK_SIZE)):
+        if index == 0:
+            missing_cols = _missing_columns(file_type, chunk)
+            if missing_cols:
+                return [], missing_cols, time.perf_counter() - start
+        chunk_path = f"{stem}.{index}.pkl"
+        chunk.to_pickle(chunk_path)
+        chunk_paths.append(chunk_path)
+
+    return chunk_paths, [], time.perf_counter() - start
+
+
+def _spilled_chunks(chunk_paths: List[str]) -> Iterator[pd.DataFrame]:
+    """Load spilled chunks one at a time, removing each file once it is read"""
+    for chunk_path in chunk_paths:
+        chunk = pd.read_pickle(chunk_path)
+        os.remove(chunk_path)
+        yield chunk
+
+
+def _read_file(file_type: str, file_path: str) -> Iterator[pd.DataFrame]:
+    """Stream one file's chunks inline, validating columns on the first"""
+    for index, chunk in enumerate(read_in_chunks(file_path, settings.IMPORT_CHUNK_SIZE)):
+        if index == 0:
+            missing_cols = _missing_columns(file_type, chunk)
+            if missing_cols:
+                raise ValueError(f"{os.path.basename(file_path)}: Missing columns: {', '.join(missing_cols)}")
+        yield chunk
+
+
+class ImportOrchestrator:
+    """Import a bundle of files with parallel parsing and dependency-ordered writes"""
+
+    def __init__(self, db: Session, max_workers: Optional[int] = None):
+        self.db = db
+        self.max_workers = max_workers or settings.IMPORT_PARSE_WORKERS
+
+    def import_bundle(self, bundle_path: str) -> Dict[str, Any]:
+        """
+        Import every recognised file in a directory or zip file.
+        Returns per-file row counts and timings for each stage.
+        """
+        start = time.perf_counter()
+        try:
+            with _open_bundle(bundle_path) as directory:
+                files = [
+                    (file_type, os.path.join(directory, name))
+                    for name in sorted(os.listdir(directory))
+                    for file_type in [detect_file_type(name)]
+                    if file_type
+                ]
+                if not files:
+                    return {"success": False, "error": "No importable files found in bundle"}
+
+                result = self._import_files(files)
+
+            result["timings"]["total"] = round(time.perf_counter() - start, 3)
+            logger.info(f"Imported bundle {bundle_path} in {result['timings']['total']}s")
+            return result
+
+        except Exception as e:
+            logger.error(f"Error importing bundle: {e}")
+            self.db.rollback()
+            return {
+                "success": False,
+                "error": str(e)
+            }
+
+    def _import_files(self, files: List[Tuple[str, str]]) -> Dict[str, Any]:
+        """Parse the bundle's files and write them in dependency order"""
+        processor = DataProcessor(self.db)
+        timings = {"parse": {}, "write": {}}
+        results = {}
+
+        mode, workers = self._parse_mode(files)
+        if mode == "inline":
+            self._write_inline(processor, files, results, timings)
+        else:
+            self._write_parsed(processor, files, mode, workers, results, timings)
+
+        commit_start = time.perf_counter()
+        invalidate_lookup_index(self.db)
+        self.db.commit()
+        timings["commit"] = round(time.perf_counter() - commit_start, 3)
+
+        return {
+            "success": True,
+            "rows_processed": sum(r["rows_processed"] for r in results.values()),
+            "rows_skipped": sum(r["rows_skipped"] for r in results.values()),
+            "files": results,
+            "parse_mode": mode,
+            "timings": timings
+        }
+
+    def _parse_mode(self, files: List[Tuple[str, str]]) -> Tuple[str, int]:
+        """
+        ("inline" | "threads" | "processes", worker count). Small bundles are
+        not worth a pool; processes are opt-in and limited by the memory budget.
+        """
+        bundle_bytes = sum(os.path.getsize(path) for _, path in files)
+        workers = min(self.max_workers, len(files))
+        if workers <= 1 or bundle_bytes < settings.IMPORT_PARALLEL_MIN_BYTES:
+            return "inline", 0
+
+        if settings.IMPORT_PARSE_PROCESSES:
+            process_workers = min(workers, settings.IMPORT_PARSE_MEMORY_MB // PARSE_PROCESS_MB)
+            if process_workers >= 1:
+                return "processes", process_workers
+            logger.warning(
+                f"IMPORT_PARSE_MEMORY_MB={settings.IMPORT_PARSE_MEMORY_MB} leaves no room for a "
+                f"{PARSE_PROCESS_MB}MB parse process; parsing in threads"
+            )
+        return "threads", workers
+
+    def _write_inline(
+        self,
+        processor: DataProcessor,
+        files: List[Tuple[str, str]],
+        results: Dict[str, Any],
+        timings: Dict[str, Any]
+    ) -> None:
+        """Stream each file straight into the write stage, dependencies first"""
+        for file_type, path in sorted(files, key=lambda item: WRITE_ORDER.index(item[0])):
+            name = os.path.basename(path)
+            write_start = time.perf_counter()
+            results[name] = self._write_chunks(processor, file_type, _read_file(file_type, path))
+            timings["write"][name] = round(time.perf_counter() - write_start, 3)
+
+    def _write_parsed(
+        self,
+        processor: DataProcessor,
+        files: List[Tuple[str, str]],
+        mode: str,
+        workers: int,
+        results: Dict[str, Any],
+        timings: Dict[str, Any]
+    ) -> None:
+        """Parse files in parallel and write each one as soon as its dependencies are written"""
+        remaining = list(files)
+        unwritten = {file_type: sum(1 for t, _ in files if t == file_type) for file_type in DEPENDENCIES}
+        parsed = {}
+
+        if mode == "processes":
+            pool = _parse_pool(workers)
+        else:
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bundle-parse")
+        with tempfile.TemporaryDirectory(dir=settings.UPLOAD_DIR) as spill_dir:
+            futures = {}
+            try:
+                futures = {
+                    pool.submit(_parse_file, file_type, path, spill_dir): (file_type, path)
+                    for file_type, path in files
+                }
+                pending = set(futures)
+
+                while remaining:
+                    # Write every parsed file whose dependencies have been written
+                    ready = [
+                        (file_type, path) for file_type, path in remaining
+                        if path in parsed and all(unwritten[dep] == 0 for dep in DEPENDENCIES[file_type])
+                    ]
+                    for file_type, path in ready:
+                        name = os.path.basename(path)
+                        write_start = time.perf_counter()
+                        results[name] = self._write_chunks(processor, file_type, _spilled_chunks(parsed.pop(path)))
+                        timings["write"][name] = round(time.perf_counter() - write_start, 3)
+                        unwritten[file_type] -= 1
+                        remaining.remove((file_type, path))
+
+                    if not remaining or ready:
+                        continue
+                    if not pending:
+                        raise RuntimeError("Import dependencies could not be resolved")
+
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        file_type, path = futures[future]
+                        name = os.path.basename(path)
+                        chunk_paths, missing_cols, parse_seconds = future.result()
+                        timings["parse"][name] = round(parse_seconds, 3)
+                        if missing_cols:
+                            raise ValueError(f"{name}: Missing columns: {', '.join(missing_cols)}")
+                        parsed[path] = chunk_paths
+            except BrokenProcessPool:
+                # A worker died (e.g. out of memory); start a fresh pool next time
+                _discard_parse_pool(workers, pool)
+                raise
+            finally:
+                for future in futures:
+                    future.cancel()
+                # Parses already running finish before their spill directory is removed
+                wait(futures)
+                if mode == "threads":
+                    pool.shutdown()
+
+    def _write_chunks(
+        self,
+        processor: DataProcessor,
+        file_type: str,
+        chunks: Iterable[pd.DataFrame]
+    ) -> Dict[str, Any]:
+        """Import a file chunk by chunk into the bundle's transaction"""
+        rows_processed = rows_skipped = 0
+        for chunk in chunks:
+            processed, skipped = processor.import_frame(file_type, chunk)
+            self.db.flush()
+            rows_processed += processed
+            rows_skipped += skipped
+        return {
+            "file_type": file_type,
+            "rows_processed": rows_processed,
+            "rows_skipped": rows_skipped
+        }
+
+
+def _parse_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    The shared parse process pool for a worker count (IMPORT_PARSE_PROCESSES).
+    Imports run on server threads, where forking would copy locks and
+    connections held by other threads, so workers are spawned; they are
+    reused across bundles because each one re-imports the app on start.
+    """
+    with _parse_pools_lock:
+        pool = _parse_pools.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _parse_pools[workers] = pool
+        return pool
+
+
+def _discard_parse_pool(workers: int, pool: ProcessPoolExecutor) -> None:
+    with _parse_pools_lock:
+        if _parse_pools.get(workers) is pool:
+            del _parse_pools[workers]
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_parse_pools() -> None:
+    """Stop the parse worker processes once files already submitted are parsed"""
+    with _parse_pools_lock:
+        pools = list(_parse_pools.values())
+        _parse_pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False)
+
+
+@contextmanager
+def _open_bundle(bundle_path: str) -> Iterator[str]:
+    """Yield a directory with the bundle's files, extracting zip files to a temp dir"""
+    if os.path.isdir(bundle_path):
+        yield bundle_path
+        return
+
+    if not zipfile.is_zipfile(bundle_path):
+        raise ValueError("Bundle must be a directory or a zip file")
+
+    with tempfile.TemporaryDirectory(dir=settings.UPLOAD_DIR) as directory:
+        with zipfile.ZipFile(bundle_path) as archive:
+            members = []
+            for info in archive.infolist():
+                name = os.path.basename(info.filename)
+                # Only flat, supported files; never trust paths inside the archive
+                if info.is_dir() or not name.lower().endswith(SUPPORTED_EXTENSIONS) or name.startswith("."):
+                    continue
+                members.append((info, name))
+
+            # Declared sizes can lie, so the copy below enforces the cap as well
+            if sum(info.file_size for info, _ in members) > settings.MAX_BUNDLE_SIZE:
+                raise ValueError(_bundle_too_large())
+            extracted = 0
+            for info, name in members:
+                with archive.open(info) as source, open(os.path.join(directory, name), "wb") as target:
+                    extracted += _copy_capped(source, target, settings.MAX_BUNDLE_SIZE - extracted)
+        yield directory
+
+
+def _copy_capped(source, target, limit: int, block_size: int = 1024 * 1024) -> int:
+    """Copy at most `limit` bytes, raising if the source has more. Returns the bytes copied."""
+    copied = 0
+    for block in iter(lambda: source.read(block_size), b""):
+        copied += len(block)
+        if copied > limit:
+            raise ValueError(_bundle_too_large())
+        target.write(block)
+    return copied
+
+
+def _bundle_too_large() -> str:
+    return f"Bundle expands to more than {settings.MAX_BUNDLE_SIZE // (1024 * 1024)}MB"
@@ -0,0 +1,261 @@
+"""
+Insight Engine - builds insights for the whole portfolio in one pass
+"""
+from typing import Dict, Any, List, Optional, Iterable
+from datetime import date, datetime, timezone
+from sqlalchemy import and_, or_, func
+from sqlalchemy.orm import Session
+
+from app.db.models import Insight, InsightRun, Project, BusinessRule
+from app.services.business_rules import BusinessRulesEngine, week_of
+from app.services.change_tracking import pending_changes, prune_changes
+from app.services.dashboard_cache import invalidate_dashboard_summary
+
+PROJECT_INSIGHT_TYPES = ["project_overrun", "forecast_alert"]
+TEAM_INSIGHT_TYPES = ["under_utilization"]
+UPSERT_BATCH_SIZE = 500  # rows per INSERT ... ON CONFLICT statement (SQLite caps bound parameters)
+ENGINE_RESOLVER = "insight_engine"  # resolved_by of insights whose condition went away
+
+
+class InsightEngine:
+    """
+    Generates project overrun, under-utilization and forecast insights for all
+    active projects and teams using the rules engine's grouped batch queries
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+        self.rules_engine = BusinessRulesEngine(db, preload=True)
+
+    def generate(
+        self,
+        week_start: date = None,
+        project_ids: Optional[Iterable[int]] = None,
+        team_ids: Optional[Iterable[int]] = None
+    ) -> List[Insight]:
+        """
+        Build (unsaved) Insight rows for every project and team that needs one.
+        `project_ids`/`team_ids` restrict the evaluation; None means all.
+        """
+        week_start = week_of(week_start)
+        insights = []
+
+        if project_ids is not None:
+            project_ids = self._active_project_ids(project_ids)
+        if team_ids is not None:
+            team_ids = list(team_ids)
+
+        # Generate project overrun insights
+        overruns = self.rules_engine.detect_all_project_overruns(project_ids)
+        for project_id, overrun_data in overruns.items():
+            if overrun_data.get("is_overrun"):
+                insights.append(Insight(
+                    insight_type="project_overrun",
+                    title=f"Project Overrun: {overrun_data['project_name']}",
+                    description=f"Project has overrun by {overrun_data['overrun_hours']:.1f} hours ({overrun_data['overrun_percentage']:.1f}%)",
+                    severity="warning" if overrun_data['overrun_percentage'] < 20 else "critical",
+                    project_id=project_id,
+                    data=overrun_data,
+                    period="total"
+                ))
+
+        # Generate under-utilization insights
+        utilization = self.rules_engine.detect_all_under_utilization(week_start, team_ids)
+        for team_id, util_data in utilization.items():
+            if util_data.get("is_under_utilized"):
+                insights.append(Insight(
+                    insight_type="under_utilization",
+                    title=f"Team Under-Utilized: {util_data['team_name']}",
+                    description=f"Team is only {util_data['utilization_percentage']:.1f}% utilized",
+                    severity="info",
+                    team_id=team_id,
+                    data=util_data,
+                    period=week_start.isoformat()
+                ))
+
+        # Generate forecast alerts
+        forecasts = self.rules_engine.forecast_all_projects(project_ids)
+        for project_id, forecast in forecasts.items():
+            if forecast.get("risks"):
+                insights.append(Insight(
+                    insight_type="forecast_alert",
+                    title=f"Forecast Risks: {forecast['project_name']}",
+                    description=f"Project has {len(forecast['risks'])} identified risks",
+                    severity="warning",
+                    project_id=project_id,
+                    data=forecast,
+                    period="current"
+                ))
+
+        for insight in insights:
+            insight.insight_key = self._insight_key(insight)
+
+        return insights
+
+    def refresh(self, full: bool = False, week_start: date = None) -> Dict[str, Any]:
+        """
+        Regenerate insights in place. Only projects and teams changed by imports
+        since the last run are recomputed, unless this is the first run, the
+        week or the business rules changed, or `full` is requested. Unresolved
+        insights whose condition no longer holds are marked resolved, and ones
+        resolved that way are reopened when their condition returns; insights
+        a user resolved are left closed.
+        """
+        week_start = week_of(week_start)
+        last_run = self.db.query(InsightRun).order_by(InsightRun.id.desc()).first()
+        change_ids, changed_projects, changed_teams = pending_changes(self.db)
+        watermark = max(change_ids, default=last_run.watermark if last_run else 0)
+        rules_signature = self._rules_signature()
+
+        full = (
+            full
+            or last_run is None
+            or last_run.week_start != week_start
+            or last_run.rules_signature != rules_signature
+        )
+
+        if full:
+            project_ids, team_ids = None, None
+        else:
+            project_ids, team_ids = list(changed_projects), list(changed_teams)
+
+        insights = self.generate(week_start, project_ids, team_ids)
+        keys = {insight.insight_key for insight in insights}
+
+        existing_keys, closed_keys = set(), set()
+        if keys:
+            for insight_key, closed in self.db.query(
+                Insight.insight_key, self._closed_by_user()
+            ).filter(Insight.insight_key.in_(keys)).all():
+                existing_keys.add(insight_key)
+                if closed:
+                    closed_keys.add(insight_key)
+        self._upsert(insights)
+        created = len(keys - existing_keys)
+        updated = len(existing_keys - closed_keys)
+
+        # Resolve alerts in the recomputed scope that were not regenerated
+        stale_query = self.db.query(Insight).filter(
+            and_(
+                Insight.is_resolved == False,
+                Insight.insight_type.in_(PROJECT_INSIGHT_TYPES + TEAM_INSIGHT_TYPES)
+            )
+        )
+        if not full:
+            stale_query = stale_query.filter(
+                or_(
+                    and_(Insight.insight_type.in_(PROJECT_INSIGHT_TYPES), Insight.project_id.in_(project_ids)),
+                    and_(Insight.insight_type.in_(TEAM_INSIGHT_TYPES), Insight.team_id.in_(team_ids))
+                )
+            )
+        resolved = 0
+        resolved_at = datetime.now(timezone.utc)
+        for stale in stale_query.all():
+            if stale.insight_key not in keys:
+                stale.is_resolved = True
+                stale.resolved_at = resolved_at
+                stale.resolved_by = ENGINE_RESOLVER
+                resolved += 1
+
+        self.db.add(InsightRun(
+            watermark=watermark,
+            week_start=week_start,
+            rules_signature=rules_signature,
+            full_refresh=full,
+            projects_recomputed=len(project_ids) if project_ids is not None else -1,
+            teams_recomputed=len(team_ids) if team_ids is not None else -1
+        ))
+        prune_changes(self.db, change_ids)
+        invalidate_dashboard_summary(self.db)
+        self.db.commit()
+
+        return {
+            "insights": insights,
+            "created": created,
+            "updated": updated,
+            "resolved": resolved,
+            "kept_resolved": len(closed_keys),
+            "full_refresh": full
+        }
+
+    def _upsert(self, insights: List[Insight]) -> None:
+        """
+        Insert insights or update them in place by insight_key, reopening any
+        the engine had resolved; rows a user resolved are skipped. INSERT ...
+        ON CONFLICT keeps concurrent refreshes (API and scheduler, or several
+        workers) from colliding on the key.
+        """
+        if self.db.bind.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+
+        rows = [
+            {
+                "insight_key": insight.insight_key,
+                "insight_type": insight.insight_type,
+                "title": insight.title,
+                "description": insight.description,
+                "severity": insight.severity,
+                "project_id": insight.project_id,
+                "team_id": insight.team_id,
+                "data": insight.data,
+                "period": insight.period,
+                "is_resolved": False
+            }
+            for insight in insights
+        ]
+        for start in range(0, len(rows), UPSERT_BATCH_SIZE):
+            statement = insert(Insight).values(rows[start:start + UPSERT_BATCH_SIZE])
+            statement = statement.on_conflict_do_update(
+                index_elements=[Insight.insight_key],
+                set_={
+                    "title": statement.excluded.title,
+                    "description": statement.excluded.description,
+                    "severity": statement.excluded.severity,
+                    "data": statement.excluded.data,
+                    "is_resolved": False,
+                    "resolved_at": None,
+                    "resolved_by": None,
+                    "updated_at": func.now()
+                },
+                where=~self._closed_by_user()
+            )
+            self.db.execute(statement)
+
+    @staticmethod
+    def _closed_by_user():
+        """Resolved by anything but the insight engine (a user, or before resolvers were recorded)"""
+        return and_(
+            Insight.is_resolved == True,
+            or_(Insight.resolved_by.is_(None), Insight.resolved_by != ENGINE_RESOLVER)
+        )
+
+    def _active_project_ids(self, project_ids: Iterable[int]) -> List[int]:
+        """Keep only the active projects from `project_ids`"""
+        project_ids = list(project_ids)
+        if not project_ids:
+            return []
+        return [
+            project_id for project_id, in self.db.query(Project.id).filter(
+                and_(Project.id.in_(project_ids), Project.status == "Active")
+            ).all()
+        ]
+
+    def _rules_signature(self) -> str:
+        """Changes whenever a business rule is added, edited or deleted"""
+        count, created, updated = self.db.query(
+            func.count(BusinessRule.id),
+            func.max(BusinessRule.created_at),
+            func.max(BusinessRule.updated_at)
+        ).one()
+        return f"{count}:{created}:{updated}"
+
+    @staticmethod
+    def _insight_key(insight: Insight) -> str:
+        """Identity of an insight: type, scope and period"""
+        if insight.team_id is not None:
+            scope = f"team:{insight.team_id}"
+        else:
+            scope = f"project:{insight.project_id}"
+        return f"{insight.insight_type}:{scope}:{insight.period}"
@@ -0,0 +1,149 @@
+"""
+Layered intent classification
+1. An LRU/TTL cache keyed on the normalized message
+2. A compiled local keyword matcher that also extracts ITPR codes and sprint names
+3. The LLM, only when the local matcher's confidence is low
+"""
+import re
+import copy
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Tuple
+
+from app.core.config import settings
+from app.core.metrics import metrics
+
+ITPR_PATTERN = re.compile(r"\bitpr\d+\b", re.IGNORECASE)
+SPRINT_PATTERN = re.compile(r"\b\d{4}\.s\d+\b", re.IGNORECASE)
+
+# Intent -> (strong keywords, weak keywords), in priority order. Strong keywords
+# identify the intent on their own; weak ones (generic nouns) only when nothing else matches.
+INTENT_KEYWORDS: List[Tuple[str, List[str], List[str]]] = [
+    ("project_overrun", ["overrun", "over budget", "over-budget", "exceeded", "over plan"], []),
+    ("under_utilization", ["under-util", "underutil", "under util", "capacity", "idle"], []),
+    ("team_hours", ["timesheet", "time entry", "time entries", "logging", "logged", "entered hours"], ["hours"]),
+    ("forecast", ["forecast", "completion", "when will", "estimate"], []),
+    ("sprint_status", ["sprint status", "sprint progress", "iteration"], ["sprint"]),
+    ("project_info", ["list projects", "active projects"], ["project", "itpr"]),
+    ("team_info", ["team members", "list teams"], ["team", "member"]),
+]
+
+STRONG_CONFIDENCE = 0.9
+WEAK_CONFIDENCE = 0.75
+AMBIGUOUS_CONFIDENCE = 0.5
+
+
+def normalize_message(message: str) -> str:
+    """Cache key for a message: case, whitespace and trailing punctuation insensitive"""
+    return re.sub(r"\s+", " ", message.lower()).strip().rstrip("?!. ")
+
+
+def _compile(keywords: List[str]) -> Optional[re.Pattern]:
+    if not keywords:
+        return None
+    return re.compile(r"\b(?:" + "|".join(re.escape(keyword) for keyword in keywords) + ")", re.IGNORECASE)
+
+
+class LocalIntentClassifier:
+    """Keyword matcher compiled once; returns an intent, parameters and a confidence"""
+
+    def __init__(self):
+        self.patterns = [
+            (intent, _compile(strong), _compile(weak))
+            for intent, strong, weak in INTENT_KEYWORDS
+        ]
+
+    def classify(self, message: str) -> Dict[str, Any]:
+        strong_matches = [intent for intent, strong, _ in self.patterns if strong and strong.search(message)]
+        weak_matches = [intent for intent, _, weak in self.patterns if weak and weak.search(message)]
+
+        if strong_matches:
+            intent = strong_matches[0]
+            confidence = STRONG_CONFIDENCE if len(strong_matches) == 1 else AMBIGUOUS_CONFIDENCE
+        elif weak_matches:
+            intent = weak_matches[0]
+            confidence = WEAK_CONFIDENCE if len(weak_matches) == 1 else AMBIGUOUS_CONFIDENCE
+        else:
+            intent = "general"
+            confidence = 0.0
+
+        return {
+            "intent": intent,
+            "parameters": self.extract_parameters(message),
+            "confidence": confidence
+        }
+
+    @staticmethod
+    def extract_parameters(message: str) -> Dict[str, Any]:
+        """ITPR code and sprint name mentioned in the message"""
+        parameters = {}
+        project = ITPR_PATTERN.search(message)
+        if project:
+            parameters["project"] = project.group(0).upper()
+        sprint = SPRINT_PATTERN.search(message)
+        if sprint:
+            parameters["sprint"] = sprint.group(0).upper()
+        return parameters
+
+
+class IntentCache:
+    """Thread-safe LRU cache with per-entry TTL"""
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, value = entry
+            if time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return copy.deepcopy(value)
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic(), copy.deepcopy(value))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+intent_cache = IntentCache(settings.INTENT_CACHE_SIZE, settings.INTENT_CACHE_TTL_SECONDS)
+local_classifier = LocalIntentClassifier()
+
+
+def record_layer_hit(layer: str, elapsed: float) -> None:
+    """Count a hit for `layer` and the LLM latency it avoided"""
+    metrics.increment(f"intent.{layer}.hits")
+    metrics.observe(f"intent.{layer}", elapsed)
+    llm_latency = average_llm_latency()
+    if llm_latency:
+        metrics.increment(f"intent.{layer}.latency_saved_ms", max(0.0, llm_latency - elapsed) * 1000)
+
+
+def average_llm_latency() -> Optional[float]:
+    """Mean observed LLM classification latency in seconds"""
+    timing = metrics.snapshot_timing("intent.llm")
+    return timing["avg_ms"] / 1000 if timing and timing["count"] else None
+
+
+def _hit_rate(layer: str) -> Optional[float]:
+    hits = metrics.counter(f"intent.{layer}.hits")
+    misses = metrics.counter(f"intent.{layer}.misses")
+    return round(hits / (hits + misses), 3) if hits + misses else None
+
+
+metrics.register_gauge("intent.cache.hit_rate", lambda: _hit_rate("cache"))
+metrics.register_gauge("intent.local.hit_rate", lambda: _hit_rate("local"))
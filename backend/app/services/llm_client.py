@@ -0,0 +1,43 @@
+"""
+Shared OpenAI client
+One AsyncOpenAI client per process on a pooled httpx connection pool, so
+concurrent chats reuse keep-alive connections instead of each opening its
+own. OPENAI_BASE_URL can point at any compatible server, e.g. a local stub.
+"""
+from typing import Optional
+
+import httpx
+from openai import AsyncOpenAI
+
+from app.core.config import settings
+
+_client: Optional[AsyncOpenAI] = None
+
+
+def get_openai_client() -> Optional[AsyncOpenAI]:
+    """Return the shared client, or None when no API key is configured"""
+    global _client
+    if not settings.OPENAI_API_KEY:
+        return None
+    if _client is None:
+        _client = AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            base_url=settings.OPENAI_BASE_URL or None,
+            timeout=settings.OPENAI_TIMEOUT_SECONDS,
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.OPENAI_MAX_CONNECTIONS
+                ),
+                timeout=settings.OPENAI_TIMEOUT_SECONDS
+            )
+        )
+    return _client
+
+
+async def close_openai_client() -> None:
+    """Close the pooled connections. Called on application shutdown."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
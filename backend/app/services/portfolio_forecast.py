@@ -0,0 +1,253 @@
+"""
+Portfolio forecasting
+Monte Carlo completion dates for every project at once. Remaining SP and
+completed SP per (project, iteration) are read from the story point
+rollups; each trial then replays sprints by resampling the project's recent
+velocities, with groups of projects and all of their trials advanced
+together as NumPy array operations.
+"""
+from datetime import date, timedelta
+from typing import Dict, Any, Iterator, List, Optional
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Project, Sprint
+from app.services.sp_rollups import get_rollups, get_iteration_rollups
+
+PERCENTILES = (50, 85, 95)
+MIN_TRIALS = 100
+SIMULATION_CELLS = 1 << 22  # Sprint x trial x project values simulated at once (16MB of float32)
+
+
+class PortfolioForecaster:
+    """
+    Samples each project's velocity from its last `history` completed
+    iterations and reports the P50/P85/P95 number of sprints and completion
+    date over `trials` simulated futures
+    """
+
+    def __init__(
+        self,
+        db: Session,
+        trials: int = None,
+        history: int = None,
+        max_sprints: int = None,
+        seed: Optional[int] = None
+    ):
+        self.db = db
+        self.trials = trials or settings.FORECAST_TRIALS
+        self.history = history or settings.FORECAST_HISTORY_SPRINTS
+        self.max_sprints = max_sprints or settings.FORECAST_MAX_SPRINTS
+        self.rng = np.random.default_rng(seed)
+
+    def forecast(self, project_ids: Optional[List[int]] = None) -> Dict[str, Any]:
+        """Forecast the given projects, or all active ones"""
+        query = self.db.query(Project.id, Project.name, Project.itpr_code, Project.end_date)
+        if project_ids is None:
+            query = query.filter(Project.status == "Active")
+        else:
+            query = query.filter(Project.id.in_(project_ids))
+        projects = query.order_by(Project.id).all()
+        trials = self._trial_count(len(projects))
+
+        anchor, days_per_sprint = self._sprint_calendar()
+        result = {
+            "trials": self.trials,
+            # Lower than requested only when trials x projects exceeds FORECAST_MAX_CELLS
+            "trials_used": trials,
+            "history_sprints": self.history,
+            "anchor_date": anchor.isoformat(),
+            "days_per_sprint": days_per_sprint,
+            "projects": []
+        }
+        if not projects:
+            return result
+
+        remaining, velocities, history_counts = self._load_history([p.id for p in projects])
+        sprints = self._simulate(remaining, velocities, history_counts, trials)
+
+        # Percentiles over trials; trials past the horizon stay inf, i.e. unknown
+        with np.errstate(invalid="ignore"):
+            quantiles = np.percentile(sprints, PERCENTILES, axis=1)
+        end_offsets = np.array([
+            (p.end_date - anchor).days / days_per_sprint if p.end_date else np.nan for p in projects
+        ])
+        on_time = (sprints <= end_offsets[:, None]).mean(axis=1)
+
+        for i, project in enumerate(projects):
+            entry = {
+                "project_id": project.id,
+                "project_name": project.name,
+                "itpr_code": project.itpr_code,
+                "remaining_story_points": float(remaining[i]),
+                "velocity_samples": int(history_counts[i]),
+                "average_velocity": float(np.nanmean(velocities[i])) if history_counts[i] else None,
+                "on_time_probability": float(on_time[i]) if project.end_date else None
+            }
+            for percentile, values in zip(PERCENTILES, quantiles):
+                value = values[i]
+                known = np.isfinite(value)
+                entry[f"p{percentile}_sprints"] = round(float(value), 2) if known else None
+                entry[f"p{percentile}_date"] = (
+                    (anchor + timedelta(days=int(np.ceil(value * days_per_sprint)))).isoformat() if known else None
+                )
+            result["projects"].append(entry)
+
+        return result
+
+    def _load_history(self, project_ids: List[int]):
+        """
+        Remaining SP per project and the last `history` per-iteration
+        completed SP, oldest first, as a NaN-padded (projects, history) array
+        """
+        totals = get_rollups(self.db, "project", project_ids)
+        sprint_starts = dict(self.db.query(Sprint.name, Sprint.start_date).all())
+        position = {project_id: i for i, project_id in enumerate(project_ids)}
+        remaining = np.zeros(len(project_ids))
+        for project_id, rollup in totals.items():
+            remaining[position[project_id]] = rollup.total_sp - rollup.completed_sp
+        completed = {}
+        for rollup in get_iteration_rollups(self.db, "project", project_ids):
+            if rollup.completed_sp:
+                completed.setdefault(rollup.entity_id, []).append(
+                    (sprint_starts.get(rollup.iteration, date.min), rollup.iteration, rollup.completed_sp)
+                )
+
+        velocities = np.full((len(project_ids), self.history), np.nan)
+        history_counts = np.zeros(len(project_ids), dtype=int)
+        for project_id, iterations in completed.items():
+            recent = [sp for _, _, sp in sorted(iterations)[-self.history:]]
+            velocities[position[project_id], :len(recent)] = recent
+            history_counts[position[project_id]] = len(recent)
+        return remaining, velocities, history_counts
+
+    def _trial_count(self, projects: int) -> int:
+        """Trials per project, reduced only if trials x projects would exceed FORECAST_MAX_CELLS"""
+        return min(self.trials, max(MIN_TRIALS, settings.FORECAST_MAX_CELLS // max(1, projects)))
+
+    def _simulate(
+        self,
+        remaining: np.ndarray,
+        velocities: np.ndarray,
+        history_counts: np.ndarray,
+        trials: int
+    ) -> np.ndarray:
+        """
+        Sprints needed per (project, trial), fractional in the final sprint.
+        Projects without velocity history, or not done within max_sprints,
+        get inf.
+
+        Projects with the same number of velocity samples and a similar
+        expected duration are simulated together as one (sprints, trials x
+        projects) array per block of sprints. The first block, sized to cover
+        most trials, draws one sample index per (sprint, trial) for the
+        whole group. Each project still resamples its own history
+        independently per trial and is reported on its own, so sharing the
+        draws changes no result but saves most of the random numbers.
+        """
+        sprints = np.full((len(remaining), trials), np.inf)
+        sprints[remaining <= 0] = 0.0
+
+        rows = np.flatnonzero((remaining > 0) & (history_counts > 0))
+        if not len(rows):
+            return sprints
+        counts = history_counts[rows]
+        means = np.nanmean(velocities[rows], axis=1)
+        spread = np.sqrt(remaining[rows]) * np.nanstd(velocities[rows], axis=1) / means ** 1.5
+        # Expected sprints plus one standard deviation of the duration; the
+        # remaining trials continue in much smaller follow-up blocks
+        blocks = np.clip(np.ceil(remaining[rows] / means + spread), 1, self.max_sprints).astype(int)
+
+        chunk = max(1, min(trials, SIMULATION_CELLS // blocks.max()))
+        for start in range(0, trials, chunk):
+            width = min(chunk, trials - start)
+            for group in self._groups(counts, blocks, width):
+                self._simulate_group(
+                    sprints, rows[group], start, width, remaining[rows[group]],
+                    velocities[rows[group], :counts[group[0]]], blocks[group[-1]]
+                )
+        return sprints
+
+    @staticmethod
+    def _groups(counts: np.ndarray, blocks: np.ndarray, width: int) -> Iterator[List[int]]:
+        """
+        Indexes of projects to simulate together: equal sample counts, in
+        order of block size, as many as fit SIMULATION_CELLS at the largest
+        block among them
+        """
+        group = []
+        for i in np.lexsort((blocks, counts)):
+            if group and (counts[i] != counts[group[0]] or (len(group) + 1) * blocks[i] * width > SIMULATION_CELLS):
+                yield group
+                group = []
+            group.append(i)
+        yield group
+
+    def _simulate_group(
+        self,
+        sprints: np.ndarray,
+        rows: np.ndarray,
+        start: int,
+        width: int,
+        remaining: np.ndarray,
+        table: np.ndarray,
+        block: int
+    ) -> None:
+        """
+        Fill trials start..start+width of `rows`, given their velocity
+        samples (`table`, one row per project) and remaining SP. A block
+        holds trial t of project g in column t * projects + g and is
+        accumulated row by row in place, counting the whole sprints each cell
+        completes before reaching its remaining SP while the row is still in
+        cache. Trials still short of their remaining SP draw another block,
+        independently, sized for the furthest of them at average velocity.
+        """
+        # float32 halves the memory traffic; sums of story points stay exact enough
+        table = table.astype(np.float32)
+        size, samples = table.shape
+        mean_velocity = table.mean(axis=1)
+
+        # Shared draws: one contiguous (samples, projects) row per draw gives (block, width, projects)
+        draws = self.rng.integers(0, samples, size=(block, width))
+        cumulative = np.take(np.ascontiguousarray(table.T), draws, axis=0).reshape(block, width * size)
+        cells = np.arange(width * size)
+        left = np.tile(remaining.astype(np.float32), width)
+        done = 0
+        while True:
+            below = np.empty(len(cells), dtype=bool)
+            before = np.zeros(len(cells), dtype=np.min_scalar_type(len(cumulative)))
+            np.less(cumulative[0], left, out=below)
+            before += below
+            for sprint in range(1, len(cumulative)):
+                # Row by row in place; much faster than np.cumsum along axis 0
+                np.add(cumulative[sprint], cumulative[sprint - 1], out=cumulative[sprint])
+                np.less(cumulative[sprint], left, out=below)
+                before += below
+
+            hit = np.flatnonzero(before < len(cumulative))
+            sprint = before[hit].astype(np.intp)
+            reached = cumulative[sprint, hit]
+            prior = np.where(sprint > 0, cumulative[sprint - 1, hit], 0.0)
+            # Only the part of the final sprint that was needed counts
+            sprints[rows[cells[hit] % size], start + cells[hit] // size] = (
+                done + sprint + (left[hit] - prior) / (reached - prior)
+            )
+
+            still_open = np.flatnonzero(before == len(cumulative))
+            done += len(cumulative)
+            if not len(still_open) or done >= self.max_sprints:
+                return
+            left = left[still_open] - cumulative[-1, still_open]
+            cells = cells[still_open]
+            projects = cells % size
+            block = int(min(self.max_sprints - done, max(1, np.ceil((left / mean_velocity[projects]).max()))))
+            cumulative = table[projects, self.rng.integers(0, samples, size=(block, len(cells)))]
+
+    def _sprint_calendar(self):
+        """Forecasts start at the end of the active sprint, or today"""
+        current_sprint = self.db.query(Sprint).filter(Sprint.is_active == True).first()
+        if current_sprint:
+            return current_sprint.end_date, max(1, (current_sprint.end_date - current_sprint.start_date).days)
+        return date.today(), settings.DEFAULT_SPRINT_WEEKS * 7
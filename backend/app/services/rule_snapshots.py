@@ -0,0 +1,95 @@
+"""
+Rule snapshots
+The scheduler materializes the rules engine's results for every project and
+team into the rule_snapshots table so chat and the dashboard can read them
+without re-running the rules on each request.
+"""
+import time
+import logging
+from datetime import date, datetime, timezone
+from typing import Dict, Any, Optional
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.metrics import metrics
+from app.db.database import SessionLocal
+from app.db.models import RuleSnapshot
+from app.services.business_rules import BusinessRulesEngine, week_of
+
+logger = logging.getLogger(__name__)
+
+
+def refresh_snapshot(db: Session, week_start: date = None) -> Dict[str, Any]:
+    """Recompute every project and team and replace the snapshot in one transaction"""
+    start = time.perf_counter()
+    week_start = week_of(week_start)
+    engine = BusinessRulesEngine(db, preload=True)
+    computed_at = datetime.now(timezone.utc)
+    period = week_start.isoformat()
+
+    rows = [
+        {"snapshot_type": "project_overrun", "entity_id": project_id, "data": data, "computed_at": computed_at}
+        for project_id, data in engine.detect_all_project_overruns().items()
+    ]
+    rows += [
+        {"snapshot_type": "under_utilization", "entity_id": team_id, "period": period, "data": data, "computed_at": computed_at}
+        for team_id, data in engine.detect_all_under_utilization(week_start).items()
+    ]
+    rows += [
+        {"snapshot_type": "forecast", "entity_id": project_id, "data": data, "computed_at": computed_at}
+        for project_id, data in engine.forecast_all_projects().items()
+    ]
+
+    db.query(RuleSnapshot).delete(synchronize_session=False)
+    db.bulk_insert_mappings(RuleSnapshot, rows)
+    db.commit()
+
+    metrics.observe("snapshot.refresh", time.perf_counter() - start)
+    logger.info(f"Refreshed rule snapshot: {len(rows)} rows in {time.perf_counter() - start:.2f}s")
+    return {"rows": len(rows), "computed_at": computed_at}
+
+
+def get_snapshot(db: Session, snapshot_type: str, period: Optional[str] = None) -> Optional[Dict[int, Dict[str, Any]]]:
+    """
+    Snapshot results of one type keyed by project/team id, or None when
+    nothing is materialized (for `period`) and callers should compute live.
+    """
+    query = db.query(RuleSnapshot.entity_id, RuleSnapshot.data).filter(RuleSnapshot.snapshot_type == snapshot_type)
+    if period is not None:
+        query = query.filter(RuleSnapshot.period == period)
+    rows = query.order_by(RuleSnapshot.entity_id).all()
+    return {entity_id: data for entity_id, data in rows} if rows else None
+
+
+def get_snapshot_entry(db: Session, snapshot_type: str, entity_id: int) -> Optional[Dict[str, Any]]:
+    """Snapshot result for a single project/team, or None if not materialized"""
+    row = db.query(RuleSnapshot.data).filter(
+        RuleSnapshot.snapshot_type == snapshot_type,
+        RuleSnapshot.entity_id == entity_id
+    ).first()
+    return row[0] if row else None
+
+
+def snapshot_computed_at(db: Session) -> Optional[datetime]:
+    """When the current snapshot was computed"""
+    computed_at = db.query(func.max(RuleSnapshot.computed_at)).scalar()
+    if computed_at is not None and computed_at.tzinfo is None:
+        # SQLite returns naive datetimes; they are stored as UTC
+        computed_at = computed_at.replace(tzinfo=timezone.utc)
+    return computed_at
+
+
+def snapshot_age_seconds() -> Optional[float]:
+    """Age of the current snapshot, None if none has been computed"""
+    db = SessionLocal()
+    try:
+        computed_at = snapshot_computed_at(db)
+    finally:
+        db.close()
+    if computed_at is None:
+        return None
+    return round((datetime.now(timezone.utc) - computed_at).total_seconds(), 1)
+
+
+metrics.register_gauge("snapshot.age_seconds", snapshot_age_seconds)
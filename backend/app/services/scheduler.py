@@ -0,0 +1,156 @@
+"""
+In-process background scheduler
+Periodically refreshes the rule snapshot and the insights table on a daemon
+thread, started and stopped by the application's startup/shutdown hooks.
+Every worker starts one, but only the worker holding the scheduler lock runs
+the periodic refresh; the others take over if it exits.
+"""
+import os
+import time
+import tempfile
+import threading
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+from app.core.metrics import metrics
+from app.db.database import SessionLocal, engine
+from app.services.insight_engine import InsightEngine
+from app.services.rule_snapshots import refresh_snapshot
+
+logger = logging.getLogger(__name__)
+
+SCHEDULER_LOCK_ID = 72_710_002  # pg_advisory_lock key held by the worker running the schedule
+
+
+class InsightScheduler:
+    """Runs the rules engine every `interval_seconds`, or sooner when triggered"""
+
+    def __init__(self, interval_seconds: int):
+        self.interval_seconds = interval_seconds
+        self.last_run: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._leader_lock: Any = None  # connection (PostgreSQL) or open lock file while leading
+
+    def start(self) -> None:
+        """Start the scheduler thread; the first refresh runs immediately"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="insight-scheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Insight scheduler started (every {self.interval_seconds}s)")
+
+    def stop(self) -> None:
+        """Stop the scheduler thread after the current refresh"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._release_leadership()
+
+    @property
+    def is_leader(self) -> bool:
+        """Whether this process runs the periodic refresh"""
+        return self._leader_lock is not None
+
+    def trigger(self) -> None:
+        """Run a refresh in this process as soon as possible, e.g. after an import"""
+        self._wake.set()
+
+    def run_once(self) -> Dict[str, Any]:
+        """Refresh the rule snapshot and insights with a fresh session"""
+        start = time.perf_counter()
+        db = SessionLocal()
+        try:
+            snapshot = refresh_snapshot(db)
+            insights = InsightEngine(db).refresh()
+            self.last_run = datetime.now(timezone.utc)
+            self.last_error = None
+            metrics.increment("scheduler.runs")
+            return {
+                "snapshot_rows": snapshot["rows"],
+                "insights_created": insights["created"],
+                "insights_updated": insights["updated"],
+                "insights_resolved": insights["resolved"]
+            }
+        except Exception as e:
+            logger.error(f"Scheduled insight refresh failed: {e}")
+            db.rollback()
+            self.last_error = str(e)
+            metrics.increment("scheduler.errors")
+            return {"error": str(e)}
+        finally:
+            db.close()
+            metrics.observe("scheduler.run", time.perf_counter() - start)
+
+    def _loop(self) -> None:
+        triggered = False
+        while not self._stop.is_set():
+            if triggered or self._acquire_leadership():
+                self.run_once()
+            triggered = self._wake.wait(timeout=self.interval_seconds)
+            self._wake.clear()
+
+    def _acquire_leadership(self) -> bool:
+        """
+        Try to become the one worker that runs scheduled refreshes: hold a
+        PostgreSQL advisory lock on a dedicated connection, or an exclusive
+        lock on a file next to a SQLite database. Both go away with the
+        process, so another worker takes over on its next tick.
+        """
+        if self._leader_lock is not None:
+            return True
+
+        if engine.dialect.name == "postgresql":
+            conn = engine.connect()
+            locked = conn.execute(text("SELECT pg_try_advisory_lock(:id)"), {"id": SCHEDULER_LOCK_ID}).scalar()
+            conn.commit()
+            if not locked:
+                conn.close()
+                return False
+            self._leader_lock = conn
+        else:
+            try:
+                import fcntl
+            except ImportError:  # Windows: no fcntl, single-process development only
+                self._leader_lock = True
+                return True
+
+            lock_file = open(_lock_path(), "w")
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                lock_file.close()
+                return False
+            self._leader_lock = lock_file
+
+        logger.info("This worker now runs the scheduled insight refresh")
+        return True
+
+    def _release_leadership(self) -> None:
+        lock, self._leader_lock = self._leader_lock, None
+        if lock is None or lock is True:
+            return
+        if engine.dialect.name == "postgresql":
+            # Pooled connections outlive close(); unlock explicitly
+            lock.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": SCHEDULER_LOCK_ID})
+            lock.commit()
+        lock.close()
+
+
+def _lock_path() -> str:
+    database = make_url(settings.DATABASE_URL).database
+    if database and database != ":memory:":
+        return f"{database}.scheduler.lock"
+    return os.path.join(tempfile.gettempdir(), "pmo-scheduler.lock")
+
+
+scheduler = InsightScheduler(settings.SNAPSHOT_REFRESH_SECONDS)
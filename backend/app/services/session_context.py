@@ -0,0 +1,160 @@
+"""
+Chat session context
+Recent turns and carried-over slots (last project, last sprint) per chat
+session, kept in an in-process LRU cache and rebuilt from ChatHistory when a
+session is not cached or another worker has answered since.
+"""
+import re
+import logging
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Any, Optional, List
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import ChatHistory
+
+logger = logging.getLogger(__name__)
+
+SLOTS = ("project", "sprint")
+
+# Parameters each intent takes from earlier turns when the message omits them
+SLOT_INTENTS = {
+    "project_overrun": ("project", "sprint"),
+    "forecast": ("project",),
+    "sprint_status": ("sprint",),
+}
+
+# Messages about the whole portfolio must not inherit a single project
+PORTFOLIO_PATTERN = re.compile(r"\b(all|every|projects)\b", re.IGNORECASE)
+
+_encoding = None
+_encoding_failed = False
+
+
+def count_tokens(text: str) -> int:
+    """Token count with tiktoken; roughly 4 characters per token if the encoding is unavailable"""
+    global _encoding, _encoding_failed
+    if _encoding is None and not _encoding_failed:
+        try:
+            import tiktoken
+            try:
+                _encoding = tiktoken.encoding_for_model(settings.OPENAI_MODEL)
+            except KeyError:
+                _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning(f"tiktoken encoding unavailable, estimating tokens: {e}")
+            _encoding_failed = True
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return len(text) // 4 + 1
+
+
+class SessionContext:
+    """Recent turns and slots of one chat session"""
+
+    def __init__(self, session_id: str, last_history_id: Optional[int] = None):
+        self.session_id = session_id
+        self.last_history_id = last_history_id
+        self.turns = deque(maxlen=settings.CHAT_CONTEXT_TURNS)  # (user_message, bot_response)
+        self.slots: Dict[str, Any] = {}
+
+    def add_turn(self, user_message: str, bot_response: str, parameters: Optional[Dict[str, Any]]) -> None:
+        self.turns.append((user_message, bot_response))
+        for slot in SLOTS:
+            if parameters and parameters.get(slot):
+                self.slots[slot] = parameters[slot]
+
+    def fill_slots(self, intent: str, parameters: Dict[str, Any], message: str) -> Dict[str, Any]:
+        """Fill parameters the intent needs but the message left out from earlier turns"""
+        filled = dict(parameters)
+        for slot in SLOT_INTENTS.get(intent, ()):
+            if filled.get(slot) or slot not in self.slots:
+                continue
+            if slot == "project" and PORTFOLIO_PATTERN.search(message):
+                continue
+            filled[slot] = self.slots[slot]
+        return filled
+
+    def prompt_messages(self, system_prompt: str, message: str, token_budget: int) -> List[Dict[str, str]]:
+        """
+        Chat messages for the model: system prompt, as many recent turns as
+        fit in `token_budget`, and the current message
+        """
+        used = count_tokens(system_prompt) + count_tokens(message)
+        history: List[Dict[str, str]] = []
+        for user_message, bot_response in reversed(self.turns):
+            cost = count_tokens(user_message) + count_tokens(bot_response)
+            if used + cost > token_budget:
+                break
+            used += cost
+            history[:0] = [
+                {"role": "user", "content": user_message},
+                {"role": "assistant", "content": bot_response}
+            ]
+        return [{"role": "system", "content": system_prompt}] + history + [{"role": "user", "content": message}]
+
+
+class SessionContextStore:
+    """LRU cache of session contexts with ChatHistory as the source of truth"""
+
+    def __init__(self, max_sessions: int):
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, SessionContext]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, db: Session, session_id: str) -> SessionContext:
+        """Cached context, reloaded from the database if it is missing or behind"""
+        latest_id = db.query(func.max(ChatHistory.id)).filter(ChatHistory.session_id == session_id).scalar()
+        with self._lock:
+            context = self._sessions.get(session_id)
+            if context is not None and context.last_history_id == latest_id:
+                self._sessions.move_to_end(session_id)
+                return context
+
+        context = self._load(db, session_id, latest_id)
+        self._store(context)
+        return context
+
+    def record_turn(
+        self,
+        session_id: str,
+        history_id: Optional[int],
+        user_message: str,
+        bot_response: str,
+        parameters: Optional[Dict[str, Any]]
+    ) -> None:
+        """Add a saved turn to the cached context"""
+        with self._lock:
+            context = self._sessions.get(session_id)
+        if context is None:
+            return
+        context.add_turn(user_message, bot_response, parameters)
+        context.last_history_id = history_id
+
+    def _load(self, db: Session, session_id: str, latest_id: Optional[int]) -> SessionContext:
+        context = SessionContext(session_id, latest_id)
+        if latest_id is None:
+            return context
+
+        rows = db.query(
+            ChatHistory.user_message, ChatHistory.bot_response, ChatHistory.parameters
+        ).filter(
+            ChatHistory.session_id == session_id
+        ).order_by(ChatHistory.id.desc()).limit(settings.CHAT_CONTEXT_TURNS).all()
+
+        for user_message, bot_response, parameters in reversed(rows):
+            context.add_turn(user_message, bot_response, parameters)
+        return context
+
+    def _store(self, context: SessionContext) -> None:
+        with self._lock:
+            self._sessions[context.session_id] = context
+            self._sessions.move_to_end(context.session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+
+session_contexts = SessionContextStore(settings.CHAT_SESSION_CACHE_SIZE)
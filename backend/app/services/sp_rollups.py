@@ -0,0 +1,204 @@
+"""
+Story point rollups
+Total, completed and defect SP and story counts per feature, epic and
+project, broken down by team and iteration, kept in story_point_rollups so
+read paths look totals up instead of walking Project -> Epic -> Feature ->
+UserStory. Imports refresh only the subtrees they touched.
+"""
+from typing import Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+from sqlalchemy import case, func
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import Defect, Epic, Feature, StoryPointRollup, UserStory
+
+ALL = "*"  # Team/iteration value of the total rows
+LEVELS = {"feature": "feature_id", "epic": "epic_id", "project": "project_id"}
+COMPLETED_STATES = ["Completed", "Accepted"]
+MEASURES = ["story_count", "total_sp", "completed_sp", "defect_sp"]
+# Columns read by the lookups below; plain rows are much cheaper to load than ORM objects
+READ_COLUMNS = [StoryPointRollup.entity_id, StoryPointRollup.team, StoryPointRollup.iteration] + [
+    getattr(StoryPointRollup, measure) for measure in MEASURES
+]
+
+
+def _chunks(items: List[int], size: int = None):
+    size = size or settings.IMPORT_BATCH_SIZE
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def refresh_rollups(
+    db: Session,
+    project_ids: Iterable[Optional[int]] = (),
+    epic_ids: Iterable[Optional[int]] = (),
+    feature_ids: Iterable[Optional[int]] = ()
+) -> None:
+    """
+    Recompute the rollups of the given entities, their ancestors and every
+    feature and epic under an affected project. Pass both the old and the
+    new parents of moved rows. Written in the caller's transaction.
+    """
+    db.flush()
+    project_ids = {i for i in project_ids if i is not None}
+    epic_ids = {i for i in epic_ids if i is not None}
+    feature_ids = {i for i in feature_ids if i is not None}
+
+    # Parents of the touched rows, then the whole subtree of each affected project
+    epic_ids |= _lookup(db, Feature.epic_id, Feature.id, feature_ids)
+    project_ids |= _lookup(db, Epic.project_id, Epic.id, epic_ids)
+    epic_ids |= _lookup(db, Epic.id, Epic.project_id, project_ids)
+    feature_ids |= _lookup(db, Feature.id, Feature.epic_id, epic_ids)
+    if not feature_ids and not epic_ids and not project_ids:
+        return
+
+    fine = pd.concat(
+        [_fine_rows(db, batch) for batch in _chunks(sorted(feature_ids))] or [_fine_rows(db, [])],
+        ignore_index=True
+    )
+    scopes = {"feature": feature_ids, "epic": epic_ids, "project": project_ids}
+    for level, entity_ids in scopes.items():
+        for batch in _chunks(sorted(entity_ids)):
+            db.query(StoryPointRollup).filter(
+                StoryPointRollup.level == level,
+                StoryPointRollup.entity_id.in_(batch)
+            ).delete(synchronize_session=False)
+        db.bulk_insert_mappings(StoryPointRollup, _aggregate(fine, level, entity_ids))
+
+
+def rebuild_rollups(db: Session) -> int:
+    """Recompute every rollup from scratch. Returns the number of rows written."""
+    db.flush()
+    db.query(StoryPointRollup).delete(synchronize_session=False)
+    fine = _fine_rows(db, None)
+    rows = 0
+    for level in LEVELS:
+        records = _aggregate(fine, level, None)
+        db.bulk_insert_mappings(StoryPointRollup, records)
+        rows += len(records)
+    return rows
+
+
+def get_rollups(
+    db: Session,
+    level: str,
+    entity_ids: Optional[Iterable[int]] = None,
+    team: str = ALL,
+    iteration: str = ALL
+) -> Dict[int, Row]:
+    """Rollup row (READ_COLUMNS) per entity for one team/iteration (totals by default)"""
+    query = db.query(*READ_COLUMNS).filter(
+        StoryPointRollup.level == level,
+        StoryPointRollup.team == team,
+        StoryPointRollup.iteration == iteration
+    )
+    if entity_ids is not None:
+        query = query.filter(StoryPointRollup.entity_id.in_(list(entity_ids)))
+    return {row.entity_id: row for row in query.all()}
+
+
+def get_rollup(db: Session, level: str, entity_id: int, team: str = ALL, iteration: str = ALL) -> Dict[str, float]:
+    """Measures of one entity for one team/iteration; zeros when it has no stories"""
+    row = get_rollups(db, level, [entity_id], team, iteration).get(entity_id)
+    return {measure: (getattr(row, measure) if row else 0) or 0 for measure in MEASURES}
+
+
+def get_iteration_rollups(
+    db: Session,
+    level: str,
+    entity_ids: Optional[Iterable[int]] = None,
+    team: str = ALL
+) -> List[Row]:
+    """Per-iteration rollup rows (READ_COLUMNS) of one team (all teams by default), named iterations only"""
+    query = db.query(*READ_COLUMNS).filter(
+        StoryPointRollup.level == level,
+        StoryPointRollup.team == team,
+        StoryPointRollup.iteration.notin_([ALL, ""])
+    )
+    if entity_ids is not None:
+        query = query.filter(StoryPointRollup.entity_id.in_(list(entity_ids)))
+    return query.all()
+
+
+def _lookup(db: Session, column, key_column, keys: Set[int]) -> Set[int]:
+    """Distinct non-null `column` values of the rows whose `key_column` is in `keys`"""
+    found = set()
+    for batch in _chunks(sorted(keys)):
+        found.update(
+            value for value, in db.query(column).filter(key_column.in_(batch)).distinct() if value is not None
+        )
+    return found
+
+
+def _fine_rows(db: Session, feature_ids: Optional[List[int]]) -> pd.DataFrame:
+    """
+    Story and defect measures per (feature, team, iteration) with the
+    feature's epic and project; all features when `feature_ids` is None
+    """
+    is_completed = UserStory.state.in_(COMPLETED_STATES)
+    estimate = func.coalesce(UserStory.plan_estimate, 0.0)
+    stories = db.query(
+        Feature.id.label("feature_id"),
+        Feature.epic_id,
+        Epic.project_id,
+        func.coalesce(UserStory.team, "").label("team"),
+        func.coalesce(UserStory.iteration, "").label("iteration"),
+        func.count(UserStory.id).label("story_count"),
+        func.sum(estimate).label("total_sp"),
+        func.sum(case((is_completed, estimate), else_=0.0)).label("completed_sp")
+    ).select_from(UserStory).join(
+        Feature, UserStory.feature_id == Feature.id
+    ).outerjoin(
+        Epic, Feature.epic_id == Epic.id
+    ).group_by(Feature.id, Feature.epic_id, Epic.project_id, "team", "iteration")
+
+    # Defects count against the feature they name (Module1.vba defectestimate)
+    defects = db.query(
+        Feature.id.label("feature_id"),
+        Feature.epic_id,
+        Epic.project_id,
+        func.coalesce(Defect.team, "").label("team"),
+        func.coalesce(Defect.iteration, "").label("iteration"),
+        func.sum(func.coalesce(Defect.plan_estimate, 0.0)).label("defect_sp")
+    ).select_from(Defect).join(
+        Feature, Defect.feature_formatted_id == Feature.formatted_id
+    ).outerjoin(
+        Epic, Feature.epic_id == Epic.id
+    ).group_by(Feature.id, Feature.epic_id, Epic.project_id, "team", "iteration")
+
+    if feature_ids is not None:
+        stories = stories.filter(Feature.id.in_(feature_ids))
+        defects = defects.filter(Feature.id.in_(feature_ids))
+
+    keys = ["feature_id", "epic_id", "project_id", "team", "iteration"]
+    story_frame = pd.DataFrame(stories.all(), columns=keys + ["story_count", "total_sp", "completed_sp"])
+    defect_frame = pd.DataFrame(defects.all(), columns=keys + ["defect_sp"])
+    fine = story_frame.merge(defect_frame, on=keys, how="outer")
+    fine[MEASURES] = fine[MEASURES].fillna(0)
+    return fine
+
+
+def _aggregate(fine: pd.DataFrame, level: str, entity_ids: Optional[Set[int]]) -> List[Dict]:
+    """Rollup records of `level`: per team and iteration, per team, per iteration and total"""
+    key = LEVELS[level]
+    frame = fine[fine[key].notna()]
+    if entity_ids is not None:
+        frame = frame[frame[key].isin(entity_ids)]
+    if frame.empty:
+        return []
+
+    parts = []
+    for group in ([key, "team", "iteration"], [key, "team"], [key, "iteration"], [key]):
+        part = frame.groupby(group, as_index=False)[MEASURES].sum()
+        for column in ("team", "iteration"):
+            if column not in group:
+                part[column] = ALL
+        parts.append(part)
+    rollups = pd.concat(parts, ignore_index=True).rename(columns={key: "entity_id"})
+    rollups["entity_id"] = rollups["entity_id"].astype(int)
+    rollups["story_count"] = rollups["story_count"].astype(int)
+    rollups["level"] = level
+    return rollups[["level", "entity_id", "team", "iteration"] + MEASURES].to_dict("records")
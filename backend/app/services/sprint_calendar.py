@@ -0,0 +1,83 @@
+"""
+Sprint calendar
+Precomputed date -> sprint -> release lookup, the port of Module2.vba's
+Sprint_ClarityWeek. Allocations and time entries join it on
+week_start_date == day instead of range-filtering each sprint's dates, so
+sprint-scoped totals become one grouped join. The table is regenerated
+when a session that changed sprints commits; bulk_insert_mappings and raw
+SQL bypass the session events, so callers using them run rebuild_calendar
+themselves.
+"""
+from datetime import timedelta
+from typing import Dict, List
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.db.models import Sprint, SprintCalendar
+
+STALE_KEY = "sprint_calendar_stale"
+
+
+def rebuild_calendar(db: Session) -> int:
+    """Regenerate every calendar row from the sprints table. Returns the number of rows written."""
+    db.query(SprintCalendar).delete(synchronize_session=False)
+    rows = calendar_rows(db.query(Sprint.id, Sprint.name, Sprint.release, Sprint.start_date, Sprint.end_date).all())
+    db.bulk_insert_mappings(SprintCalendar, rows)
+    return len(rows)
+
+
+def calendar_rows(sprints) -> List[Dict]:
+    """
+    One record per day from each sprint's start to its end date inclusive;
+    days of overlapping sprints get a row for each
+    """
+    rows = []
+    for sprint_id, name, release, start_date, end_date in sprints:
+        for offset in range((end_date - start_date).days + 1):
+            day = start_date + timedelta(days=offset)
+            rows.append({
+                "day": day,
+                "week_start": day - timedelta(days=day.weekday()),
+                "sprint_id": sprint_id,
+                "sprint_name": name,
+                "release": release
+            })
+    return rows
+
+
+def _touches_sprints(session: Session) -> bool:
+    return any(isinstance(obj, Sprint) for obj in (*session.new, *session.dirty, *session.deleted))
+
+
+def _mark_stale(session: Session, flush_context) -> None:
+    """after_flush: remember that this transaction wrote sprints"""
+    if _touches_sprints(session):
+        session.info[STALE_KEY] = True
+
+
+def _mark_stale_bulk(orm_execute_state) -> None:
+    """do_orm_execute: bulk insert/update/delete statements on sprints skip the flush"""
+    state = orm_execute_state
+    if (state.is_insert or state.is_update or state.is_delete) and (
+        state.bind_mapper is not None and state.bind_mapper.class_ is Sprint
+    ):
+        state.session.info[STALE_KEY] = True
+
+
+def _rebuild_if_stale(session: Session) -> None:
+    """before_commit: regenerate the calendar in the same transaction as the sprint changes"""
+    if _touches_sprints(session):
+        session.flush()
+    if session.info.pop(STALE_KEY, False):
+        rebuild_calendar(session)
+
+
+def _clear_stale(session: Session, *args) -> None:
+    session.info.pop(STALE_KEY, None)
+
+
+event.listen(Session, "after_flush", _mark_stale)
+event.listen(Session, "do_orm_execute", _mark_stale_bulk)
+event.listen(Session, "before_commit", _rebuild_if_stale)
+event.listen(Session, "after_rollback", _clear_stale)
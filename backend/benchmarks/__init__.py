@@ -0,0 +1,4 @@
+"""
+Benchmarks run against generated datasets, e.g.
+    python -m benchmarks.chat_query_counts
+"""
@@ -0,0 +1,102 @@
+"""
+Regression benchmark: SQL statements issued per chat handler must not grow
+with the data. Runs every rule handler against a small and a large generated
+dataset and fails if any handler's query count differs between them.
+tests/test_chat_query_counts.py runs the same check at a smaller scale.
+
+    python -m benchmarks.chat_query_counts
+"""
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Tuple
+
+from benchmarks.dataset import reset_database, generate_dataset
+
+from sqlalchemy import event  # noqa: E402
+
+from app.db.database import SessionLocal, engine  # noqa: E402
+from app.services.business_rules import invalidate_lookup_index  # noqa: E402
+from app.services.chat_service import ChatService  # noqa: E402
+
+SCALES = {
+    "small": {"teams": 5, "members_per_team": 10, "projects": 5},
+    "large": {"teams": 100, "members_per_team": 30, "projects": 100},
+}
+
+HANDLERS = [
+    ("project_overrun", {}),
+    ("project_overrun", {"sprint": "2026.S2"}),
+    ("project_overrun", {"project": "ITPR900001"}),
+    ("under_utilization", {}),
+    ("team_hours", {}),
+    ("forecast", {"project": "ITPR900001"}),
+    ("sprint_status", {}),
+    ("project_info", {}),
+    ("team_info", {}),
+]
+
+
+@contextmanager
+def count_queries():
+    counter = {"queries": 0}
+
+    def before_cursor_execute(*args):
+        counter["queries"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def measure(scale: Dict[str, int]) -> Dict[str, Tuple[int, float]]:
+    """Query count and seconds per handler on a fresh dataset of `scale`"""
+    reset_database()
+    invalidate_lookup_index()
+    db = SessionLocal()
+    try:
+        rows = generate_dataset(db, **scale)
+        print(f"  dataset: {rows}")
+        chat_service = ChatService(db)
+
+        results = {}
+        for intent, parameters in HANDLERS:
+            handler = chat_service._rule_handlers()[intent]
+            with count_queries() as counter:
+                start = time.perf_counter()
+                handler(dict(parameters))
+                elapsed = time.perf_counter() - start
+            results[f"{intent} {parameters or ''}".strip()] = (counter["queries"], elapsed)
+        return results
+    finally:
+        db.close()
+
+
+def main() -> int:
+    measurements = {}
+    for name, scale in SCALES.items():
+        print(f"Scale {name}:")
+        measurements[name] = measure(scale)
+
+    failures = 0
+    print(f"\n{'handler':<50}{'small q':>8}{'large q':>8}{'small ms':>10}{'large ms':>10}")
+    for handler, (small_queries, small_seconds) in measurements["small"].items():
+        large_queries, large_seconds = measurements["large"][handler]
+        flag = "" if small_queries == large_queries else "  <-- grows with data"
+        failures += bool(flag)
+        print(
+            f"{handler:<50}{small_queries:>8}{large_queries:>8}"
+            f"{small_seconds * 1000:>10.1f}{large_seconds * 1000:>10.1f}{flag}"
+        )
+
+    if failures:
+        print(f"\nFAIL: {failures} handler(s) issue more queries on the larger dataset")
+        return 1
+    print("\nOK: query count per handler is independent of data size")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
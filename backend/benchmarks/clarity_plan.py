@@ -0,0 +1,73 @@
+"""
+Benchmark: generating the Clarity plan for every (ITPR, member) pair with
+calculate_clarity_allocation once per pair versus ClarityPlanGenerator in
+one pass, on a generated dataset. Also times the CSV and XLSX exports.
+
+    python -m benchmarks.clarity_plan [--projects 500] [--teams 10] [--members 5]
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.dataset import reset_database, generate_dataset
+
+from app.db.database import SessionLocal  # noqa: E402
+from app.services.business_rules import BusinessRulesEngine, invalidate_lookup_index  # noqa: E402
+from app.services.clarity_plan import ClarityPlanGenerator, export_plan, plan_weeks  # noqa: E402
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--teams", type=int, default=10)
+    parser.add_argument("--members", type=int, default=5, help="Members per team")
+    parser.add_argument("--stories", type=int, default=12, help="Stories per project")
+    args = parser.parse_args()
+
+    reset_database()
+    invalidate_lookup_index()
+    db = SessionLocal()
+    try:
+        rows = generate_dataset(
+            db, teams=args.teams, members_per_team=args.members, projects=args.projects,
+            weeks=4, stories_per_project=args.stories, sprints=6
+        )
+        print(f"dataset: {rows}")
+        weeks = plan_weeks(db)
+
+        plan, plan_seconds = timed(lambda: ClarityPlanGenerator(db).generate(weeks))
+        pairs = list(zip(plan["itpr_code"], plan["team_member_id"]))
+
+        def per_call():
+            engine = BusinessRulesEngine(db, preload=True)
+            return [engine.calculate_clarity_allocation(itpr_code, int(member_id), weeks) for itpr_code, member_id in pairs]
+
+        allocations, per_call_seconds = timed(per_call)
+        week = weeks[0].isoformat()
+        mismatches = sum(
+            allocation[week] != hours for allocation, hours in zip(allocations, plan[week])
+        )
+
+        _, csv_seconds = timed(lambda: export_plan(plan, "csv"))
+        _, xlsx_seconds = timed(lambda: export_plan(plan, "xlsx"))
+    finally:
+        db.close()
+
+    print(f"{len(pairs)} (ITPR, member) pairs x {len(weeks)} weeks, {mismatches} mismatches")
+    print(f"\n{'method':<48}{'seconds':>9}")
+    print(f"{'calculate_clarity_allocation x ' + str(len(pairs)):<48}{per_call_seconds:>9.3f}")
+    print(f"{'ClarityPlanGenerator.generate':<48}{plan_seconds:>9.3f}")
+    print(f"speedup: {per_call_seconds / plan_seconds:.1f}x")
+    print(f"\n{'export csv':<48}{csv_seconds:>9.3f}")
+    print(f"{'export xlsx':<48}{xlsx_seconds:>9.3f}")
+    return 0 if mismatches == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Synthetic PMO dataset generator for benchmarks
+"""
+import os
+import random
+import tempfile
+from datetime import date, timedelta
+from typing import Dict, Any
+
+# Benchmarks use their own throwaway SQLite database unless one is given
+os.environ.setdefault(
+    "DATABASE_URL", f"sqlite:///{os.path.join(tempfile.mkdtemp(prefix='pmo-bench-'), 'bench.db')}"
+)
+os.environ.setdefault("DEBUG", "False")
+
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.db.database import Base, engine  # noqa: E402
+from app.services.sp_rollups import rebuild_rollups  # noqa: E402
+from app.services.sprint_calendar import rebuild_calendar  # noqa: E402
+from app.db.models import (  # noqa: E402
+    Project, Epic, Feature, UserStory, Team, TeamMember, TeamAllocation, TimeEntry, Sprint
+)
+
+STATES = ["Defined", "In-Progress", "Completed", "Accepted"]
+
+
+def reset_database() -> None:
+    """Drop and recreate every table"""
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+
+def generate_dataset(
+    db: Session,
+    teams: int = 10,
+    members_per_team: int = 10,
+    projects: int = 10,
+    weeks: int = 8,
+    stories_per_project: int = 50,
+    sprints: int = 6,
+    seed: int = 42
+) -> Dict[str, Any]:
+    """
+    Fill an empty database: every member is allocated to one project per week
+    and logs time on most weeks. Returns the row counts written.
+    """
+    rng = random.Random(seed)
+    first_week = date.today() - timedelta(days=date.today().weekday()) - timedelta(weeks=weeks - 1)
+    week_starts = [first_week + timedelta(weeks=i) for i in range(weeks)]
+
+    db.bulk_insert_mappings(Sprint, [
+        {
+            "name": f"2026.S{i + 1}",
+            "release": "2026.Q1",
+            "start_date": first_week + timedelta(weeks=2 * i),
+            "end_date": first_week + timedelta(weeks=2 * i, days=13),
+            "sprint_number": i + 1,
+            "is_active": i == sprints // 2
+        }
+        for i in range(sprints)
+    ])
+    db.bulk_insert_mappings(Project, [
+        {"itpr_code": f"ITPR{900000 + i}", "name": f"Project {i}", "status": "Active"}
+        for i in range(1, projects + 1)
+    ])
+    db.bulk_insert_mappings(Team, [{"name": f"Team {i}"} for i in range(1, teams + 1)])
+    db.bulk_insert_mappings(TeamMember, [
+        {
+            "name": f"Member {t}-{m}",
+            "email": f"member{t}.{m}@example.com",
+            "team_id": t,
+            "allocation_percentage": 100.0,
+            "is_active": rng.random() > 0.05
+        }
+        for t in range(1, teams + 1)
+        for m in range(members_per_team)
+    ])
+
+    db.bulk_insert_mappings(Epic, [
+        {"formatted_id": f"E{p}", "name": f"Epic {p}", "project_id": p} for p in range(1, projects + 1)
+    ])
+    db.bulk_insert_mappings(Feature, [
+        {"formatted_id": f"F{p}", "name": f"Feature {p}", "epic_id": p} for p in range(1, projects + 1)
+    ])
+    db.bulk_insert_mappings(UserStory, [
+        {
+            "formatted_id": f"US{p}-{s}",
+            "name": f"Story {p}-{s}",
+            "feature_id": p,
+            "team": f"Team {rng.randint(1, teams)}",
+            "iteration": f"2026.S{rng.randint(1, sprints)}",
+            "plan_estimate": rng.choice([1, 2, 3, 5, 8, 13]),
+            "state": rng.choice(STATES)
+        }
+        for p in range(1, projects + 1)
+        for s in range(stories_per_project)
+    ])
+
+    member_count = teams * members_per_team
+    allocations = []
+    time_entries = []
+    for member_id in range(1, member_count + 1):
+        team_id = (member_id - 1) // members_per_team + 1
+        for week_start in week_starts:
+            project_id = rng.randint(1, projects)
+            hours = rng.choice([8.0, 16.0, 24.0, 32.0, 40.0])
+            allocations.append({
+                "team_id": team_id, "project_id": project_id, "team_member_id": member_id,
+                "week_start_date": week_start, "allocated_hours": hours
+            })
+            if rng.random() > 0.2:
+                time_entries.append({
+                    "team_member_id": member_id, "project_id": project_id,
+                    "week_start_date": week_start, "actual_hours": hours * rng.uniform(0.6, 1.4)
+                })
+    db.bulk_insert_mappings(TeamAllocation, allocations)
+    db.bulk_insert_mappings(TimeEntry, time_entries)
+    rebuild_rollups(db)
+    rebuild_calendar(db)
+    db.commit()
+
+    return {
+        "projects": projects,
+        "teams": teams,
+        "members": member_count,
+        "user_stories": projects * stories_per_project,
+        "allocations": len(allocations),
+        "time_entries": len(time_entries)
+    }
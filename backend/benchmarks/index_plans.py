@@ -0,0 +1,180 @@
+"""
+Benchmark: query plans and latencies of the rules engine's hot filters before
+and after the composite index migration (0009). Loads a generated dataset,
+downgrades to the revision before the indexes, measures, upgrades to head
+through Alembic and measures again.
+
+    python -m benchmarks.index_plans [--allocations 1000000]
+"""
+import argparse
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.dataset import generate_dataset
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import and_, event, func, text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from app.db.database import Base, SessionLocal, engine  # noqa: E402
+from app.db.models import TeamAllocation, TimeEntry, UserStory, Sprint  # noqa: E402
+
+ALEMBIC_INI = "alembic.ini"
+BEFORE_INDEXES = "0008"
+TEAMS = 100
+MEMBERS_PER_TEAM = 50
+PROJECTS = 500
+REPEATS = 20
+
+
+def hot_queries(db: Session) -> List[Tuple[str, Callable[[], object]]]:
+    """The rules engine and importer filters the new indexes are meant for"""
+    sprint = db.query(Sprint).order_by(Sprint.start_date.desc()).first()
+    week = db.query(func.max(TeamAllocation.week_start_date)).scalar()
+    window = (week - timedelta(weeks=4), week)
+    project_ids = list(range(1, 11))
+    team_ids = list(range(1, 11))
+
+    return [
+        ("allocations: projects x sprint window", lambda: db.query(
+            TeamAllocation.project_id, func.sum(TeamAllocation.allocated_hours)
+        ).filter(and_(
+            TeamAllocation.project_id.in_(project_ids),
+            TeamAllocation.week_start_date.between(*window)
+        )).group_by(TeamAllocation.project_id).all()),
+        ("allocations: teams x week", lambda: db.query(
+            TeamAllocation.team_id, func.sum(TeamAllocation.allocated_hours)
+        ).filter(and_(
+            TeamAllocation.team_id.in_(team_ids),
+            TeamAllocation.week_start_date == week
+        )).group_by(TeamAllocation.team_id).all()),
+        ("allocations: member x project x week", lambda: db.query(TeamAllocation.id).filter(and_(
+            TeamAllocation.team_member_id == 42,
+            TeamAllocation.project_id == 7,
+            TeamAllocation.week_start_date == week
+        )).first()),
+        ("time entries: projects x sprint window", lambda: db.query(
+            TimeEntry.project_id, func.sum(TimeEntry.actual_hours)
+        ).filter(and_(
+            TimeEntry.project_id.in_(project_ids),
+            TimeEntry.week_start_date.between(sprint.start_date, sprint.end_date)
+        )).group_by(TimeEntry.project_id).all()),
+        ("time entries: member x week", lambda: db.query(func.sum(TimeEntry.actual_hours)).filter(and_(
+            TimeEntry.team_member_id == 42,
+            TimeEntry.week_start_date == week
+        )).scalar()),
+        ("user stories: feature x team", lambda: db.query(
+            func.sum(UserStory.plan_estimate)
+        ).filter(and_(
+            UserStory.feature_id == 7,
+            UserStory.team == "Team 3"
+        )).scalar()),
+    ]
+
+
+@contextmanager
+def capture_statements():
+    """Record the SQL and parameters sent to the driver"""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+def explain(db: Session, query: Callable[[], object]) -> str:
+    """Query plan of the statement `query` issues"""
+    with capture_statements() as statements:
+        query()
+    statement, parameters = statements[-1]
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    rows = db.connection().exec_driver_sql(prefix + statement, parameters).all()
+    return "; ".join(str(row[-1]) for row in rows)
+
+
+def measure(db: Session) -> Dict[str, Tuple[float, str]]:
+    """Median milliseconds and plan per hot query"""
+    results = {}
+    for name, query in hot_queries(db):
+        query()  # warm the page cache
+        timings = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            query()
+            timings.append(time.perf_counter() - start)
+        results[name] = (statistics.median(timings) * 1000, explain(db, query))
+    return results
+
+
+def analyze() -> None:
+    with engine.begin() as conn:
+        conn.execute(text("ANALYZE"))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--allocations", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    alembic_config = Config(ALEMBIC_INI)
+    Base.metadata.drop_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+    command.upgrade(alembic_config, "head")
+
+    members = TEAMS * MEMBERS_PER_TEAM
+    weeks = max(1, args.allocations // members)
+    print(f"Generating {members} members x {weeks} weeks ...")
+    db = SessionLocal()
+    try:
+        start = time.perf_counter()
+        rows = generate_dataset(
+            db, teams=TEAMS, members_per_team=MEMBERS_PER_TEAM, projects=PROJECTS,
+            weeks=weeks, stories_per_project=200, sprints=max(1, weeks // 2)
+        )
+        print(f"  dataset: {rows} ({time.perf_counter() - start:.0f}s)")
+    finally:
+        db.close()
+
+    command.downgrade(alembic_config, BEFORE_INDEXES)
+    analyze()
+    db = SessionLocal()
+    try:
+        before = measure(db)
+    finally:
+        db.close()
+
+    start = time.perf_counter()
+    command.upgrade(alembic_config, "head")
+    analyze()
+    print(f"Migrated to head in {time.perf_counter() - start:.1f}s")
+
+    db = SessionLocal()
+    try:
+        after = measure(db)
+    finally:
+        db.close()
+
+    print(f"\n{'query':<42}{'before ms':>11}{'after ms':>10}{'speedup':>9}")
+    for name, (before_ms, _) in before.items():
+        after_ms = after[name][0]
+        print(f"{name:<42}{before_ms:>11.2f}{after_ms:>10.2f}{before_ms / max(after_ms, 1e-6):>8.1f}x")
+
+    print("\nQuery plans")
+    for name, (_, before_plan) in before.items():
+        print(f"  {name}\n    before: {before_plan}\n    after:  {after[name][1]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
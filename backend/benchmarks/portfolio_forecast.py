@@ -0,0 +1,69 @@
+"""
+Benchmark: portfolio Monte Carlo forecast versus calling the rules engine's
+point forecast once per project, on a generated dataset. The requested
+trials are all run unless trials x projects exceeds FORECAST_MAX_CELLS
+(--max-cells); the trials actually used are printed either way.
+
+    python -m benchmarks.portfolio_forecast [--projects 300] [--trials 10000] [--max-cells N]
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.dataset import reset_database, generate_dataset
+
+from app.core.config import settings  # noqa: E402
+from app.db.database import SessionLocal  # noqa: E402
+from app.db.models import Project  # noqa: E402
+from app.services.business_rules import BusinessRulesEngine, invalidate_lookup_index  # noqa: E402
+from app.services.portfolio_forecast import PortfolioForecaster  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--projects", type=int, default=300)
+    parser.add_argument("--trials", type=int, default=10000)
+    parser.add_argument("--max-cells", type=int, default=settings.FORECAST_MAX_CELLS)
+    args = parser.parse_args()
+    settings.FORECAST_MAX_CELLS = args.max_cells
+
+    reset_database()
+    invalidate_lookup_index()
+    db = SessionLocal()
+    try:
+        rows = generate_dataset(
+            db, teams=20, members_per_team=10, projects=args.projects,
+            weeks=4, stories_per_project=120, sprints=12
+        )
+        print(f"dataset: {rows}")
+        project_ids = [project_id for project_id, in db.query(Project.id).order_by(Project.id).all()]
+
+        start = time.perf_counter()
+        engine = BusinessRulesEngine(db, preload=True)
+        point = {project_id: engine.forecast_project_completion(project_id) for project_id in project_ids}
+        per_project_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        portfolio = PortfolioForecaster(db, trials=args.trials, seed=7).forecast(project_ids)
+        portfolio_seconds = time.perf_counter() - start
+    finally:
+        db.close()
+
+    print(f"\n{'method':<48}{'seconds':>9}")
+    print(f"{'forecast_project_completion x ' + str(len(project_ids)):<48}{per_project_seconds:>9.3f}")
+    monte_carlo = f"portfolio Monte Carlo ({portfolio['trials_used']} of {portfolio['trials']} trials)"
+    print(f"{monte_carlo:<48}{portfolio_seconds:>9.3f}")
+    print(f"speedup: {per_project_seconds / portfolio_seconds:.1f}x")
+
+    print(f"\n{'project':<10}{'point date':>12}{'P50':>12}{'P85':>12}{'P95':>12}")
+    for entry in portfolio["projects"][:5]:
+        point_date = point[entry["project_id"]].get("estimated_completion_date")
+        print(
+            f"{entry['itpr_code']:<10}{point_date or '-':>12}{entry['p50_date'] or '-':>12}"
+            f"{entry['p85_date'] or '-':>12}{entry['p95_date'] or '-':>12}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
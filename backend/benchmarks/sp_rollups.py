@@ -0,0 +1,89 @@
+"""
+Benchmark: story point totals walked through Project -> Epic -> Feature ->
+UserStory on every read versus looked up in the rollup table, plus the cost
+of refreshing one project's rollups after an import.
+
+    python -m benchmarks.sp_rollups [--projects 300] [--stories 120]
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.dataset import reset_database, generate_dataset
+
+from sqlalchemy import case, func  # noqa: E402
+
+from app.db.database import SessionLocal  # noqa: E402
+from app.db.models import Project, Epic, Feature, UserStory  # noqa: E402
+from app.services.sp_rollups import get_rollup, get_rollups, refresh_rollups  # noqa: E402
+
+COMPLETED_STATES = ["Completed", "Accepted"]
+
+
+def walk_project(db, project_id: int, team: str) -> float:
+    """The pre-rollup per-project read: load the team's stories through the hierarchy"""
+    stories = db.query(UserStory).join(Feature).join(Epic).filter(
+        Epic.project_id == project_id, UserStory.team == team
+    ).all()
+    return sum(story.plan_estimate or 0 for story in stories)
+
+
+def walk_portfolio(db) -> dict:
+    """The pre-rollup portfolio read: remaining SP per project from a grouped join"""
+    is_completed = UserStory.state.in_(COMPLETED_STATES)
+    return dict(db.query(
+        Epic.project_id,
+        func.sum(case((is_completed, 0.0), else_=func.coalesce(UserStory.plan_estimate, 0.0)))
+    ).select_from(UserStory).join(Feature).join(Epic).group_by(Epic.project_id).all())
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--projects", type=int, default=300)
+    parser.add_argument("--stories", type=int, default=120)
+    args = parser.parse_args()
+
+    reset_database()
+    db = SessionLocal()
+    try:
+        rows = generate_dataset(
+            db, teams=20, members_per_team=10, projects=args.projects,
+            weeks=4, stories_per_project=args.stories, sprints=12
+        )
+        print(f"dataset: {rows}")
+        project_ids = [project_id for project_id, in db.query(Project.id).order_by(Project.id).all()]
+        team = db.query(UserStory.team).first()[0]
+
+        walked, walk_seconds = timed(lambda: [walk_project(db, p, team) for p in project_ids])
+        looked_up, lookup_seconds = timed(
+            lambda: [get_rollup(db, "project", p, team=team)["total_sp"] for p in project_ids]
+        )
+        assert all(abs(a - b) < 1e-6 for a, b in zip(walked, looked_up))
+
+        remaining, portfolio_walk_seconds = timed(lambda: walk_portfolio(db))
+        totals, portfolio_lookup_seconds = timed(lambda: get_rollups(db, "project"))
+        assert all(abs(remaining[p] - (r.total_sp - r.completed_sp)) < 1e-6 for p, r in totals.items())
+
+        _, refresh_seconds = timed(lambda: refresh_rollups(db, project_ids=[project_ids[0]]))
+        db.rollback()
+    finally:
+        db.close()
+
+    print(f"\n{'read':<48}{'walk s':>9}{'rollup s':>10}{'speedup':>9}")
+    for name, walk, lookup in (
+        (f"team SP per project x {len(project_ids)}", walk_seconds, lookup_seconds),
+        ("remaining SP, all projects", portfolio_walk_seconds, portfolio_lookup_seconds),
+    ):
+        print(f"{name:<48}{walk:>9.3f}{lookup:>10.3f}{walk / lookup:>8.1f}x")
+    print(f"\nrefresh one project's rollups after an import: {refresh_seconds * 1000:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
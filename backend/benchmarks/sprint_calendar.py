@@ -0,0 +1,102 @@
+"""
+Benchmark: sprint-level overruns for every project and sprint, computed by
+range-filtering allocations and time entries on each sprint's dates (the
+pre-calendar approach, one sprint at a time) versus one grouped join
+against the sprint calendar.
+
+    python -m benchmarks.sprint_calendar [--projects 500] [--weeks 52]
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.dataset import reset_database, generate_dataset
+
+from sqlalchemy import func  # noqa: E402
+
+from app.db.database import SessionLocal  # noqa: E402
+from app.db.models import Sprint, TeamAllocation, TimeEntry  # noqa: E402
+from app.services.business_rules import BusinessRulesEngine  # noqa: E402
+from app.services.sprint_calendar import rebuild_calendar  # noqa: E402
+
+
+def range_filtered(engine, sprint_names) -> dict:
+    """
+    {(project_id, sprint): (planned, actual)} the way detect_all_project_overruns
+    did before the calendar: resolve each sprint by name, range-filter both
+    tables on its dates and build every project's overrun entry
+    """
+    db = engine.db
+    projects = engine._get_projects(None)
+    hours = {}
+    for sprint_name in sprint_names:
+        sprint = db.query(Sprint).filter(Sprint.name == sprint_name).first()
+        planned, actual = (
+            dict(db.query(model.project_id, func.sum(column)).filter(
+                model.week_start_date >= sprint.start_date,
+                model.week_start_date <= sprint.end_date
+            ).group_by(model.project_id).all())
+            for model, column in ((TeamAllocation, TeamAllocation.allocated_hours), (TimeEntry, TimeEntry.actual_hours))
+        )
+        for project in projects:
+            if project.id in planned or project.id in actual:
+                data = engine._overrun_data(
+                    project.id, project.name, project.itpr_code,
+                    planned.get(project.id), actual.get(project.id), sprint_name
+                )
+                hours[(project.id, sprint_name)] = (data["planned_hours"], data["actual_hours"])
+    return hours
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--projects", type=int, default=500)
+    parser.add_argument("--weeks", type=int, default=52)
+    args = parser.parse_args()
+
+    reset_database()
+    db = SessionLocal()
+    try:
+        rows = generate_dataset(
+            db, teams=40, members_per_team=25, projects=args.projects,
+            weeks=args.weeks, stories_per_project=10, sprints=args.weeks // 2
+        )
+        print(f"dataset: {rows}")
+        sprint_names = [name for name, in db.query(Sprint.name).order_by(Sprint.start_date).all()]
+
+        _, rebuild_seconds = timed(lambda: rebuild_calendar(db))
+        db.commit()
+
+        engine = BusinessRulesEngine(db)
+        baseline, range_seconds = timed(lambda: range_filtered(engine, sprint_names))
+        overruns, calendar_seconds = timed(engine.detect_sprint_overruns)
+    finally:
+        db.close()
+
+    joined = {
+        (project_id, sprint_name): (data["planned_hours"], data["actual_hours"])
+        for project_id, by_sprint in overruns.items()
+        for sprint_name, data in by_sprint.items()
+    }
+    mismatches = sum(
+        abs(planned - joined.get(key, (0.0, 0.0))[0]) > 1e-6 or abs(actual - joined.get(key, (0.0, 0.0))[1]) > 1e-6
+        for key, (planned, actual) in baseline.items()
+    ) + len(joined.keys() - baseline.keys())
+
+    print(f"{len(joined)} (project, sprint) rows over {len(sprint_names)} sprints, {mismatches} mismatches")
+    print(f"\n{'method':<48}{'seconds':>9}")
+    print(f"{'resolve + range filter per sprint x ' + str(len(sprint_names)):<48}{range_seconds:>9.3f}")
+    print(f"{'calendar join, one query':<48}{calendar_seconds:>9.3f}")
+    print(f"speedup: {range_seconds / calendar_seconds:.1f}x")
+    print(f"\nregenerate calendar: {rebuild_seconds * 1000:.1f} ms")
+    return 0 if mismatches == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+"""
+Benchmark: per-worker boot cost. Each sample runs in a fresh interpreter,
+like a newly forked worker, and times importing `app.main` and running the
+startup handlers. For comparison it also times the work workers used to do
+at boot (create_all plus the seed check, or a full seed on an empty
+database), which `python -m app.cli init` now does once per deployment.
+
+    python -m benchmarks.startup [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def child(step: str) -> None:
+    """Time one boot step in this (fresh) process and print the seconds as JSON"""
+    start = time.perf_counter()
+    import app.main  # noqa: F401
+    imported = time.perf_counter()
+
+    if step == "import":
+        elapsed = imported - start
+    elif step == "startup":
+        import asyncio
+
+        asyncio.run(app.main.app.router.startup())
+        elapsed = time.perf_counter() - imported
+        asyncio.run(app.main.app.router.shutdown())
+    else:  # legacy: what every worker used to do after import
+        from app.db.database import Base, SessionLocal, engine
+        from app.services.seed_data import seed_database
+
+        Base.metadata.create_all(bind=engine)
+        db = SessionLocal()
+        try:
+            seed_database(db)
+        finally:
+            db.close()
+        elapsed = time.perf_counter() - imported
+
+    print(json.dumps({"seconds": elapsed}))
+
+
+def run_child(step: str, database_url: str) -> float:
+    env = dict(os.environ, DATABASE_URL=database_url, SCHEDULER_ENABLED="false", DEBUG="False")
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child", step],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])["seconds"]
+
+
+def initialized_database(directory: str, name: str) -> str:
+    """URL of a migrated and seeded SQLite database"""
+    database_url = f"sqlite:///{os.path.join(directory, name)}"
+    env = dict(os.environ, DATABASE_URL=database_url)
+    subprocess.run(
+        [sys.executable, "-m", "app.cli", "init"],
+        cwd=BACKEND_DIR, env=env, capture_output=True, check=True
+    )
+    return database_url
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", choices=["import", "startup", "legacy"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args.child)
+        return 0
+
+    directory = tempfile.mkdtemp(prefix="pmo-startup-")
+    database_url = initialized_database(directory, "pmo.db")
+
+    samples = {
+        "import app.main": [run_child("import", database_url) for _ in range(args.runs)],
+        "startup handlers": [run_child("startup", database_url) for _ in range(args.runs)],
+        "legacy boot work, seeded db": [run_child("legacy", database_url) for _ in range(args.runs)],
+        "legacy boot work, empty db": [
+            run_child("legacy", f"sqlite:///{os.path.join(directory, f'empty{i}.db')}")
+            for i in range(args.runs)
+        ],
+    }
+
+    print(f"{'step':<32}{'median ms':>11}{'max ms':>10}")
+    for step, seconds in samples.items():
+        print(f"{step:<32}{statistics.median(seconds) * 1000:>11.1f}{max(seconds) * 1000:>10.1f}")
+    print("\nLegacy rows are no longer paid per worker; `python -m app.cli init` runs them once.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
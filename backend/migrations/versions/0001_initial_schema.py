@@ -0,0 +1,292 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 17:59:32.467681
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('business_rules',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('rule_type', sa.String(), nullable=False),
+    sa.Column('parameters', sa.JSON(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('priority', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_business_rules_id'), 'business_rules', ['id'], unique=False)
+    op.create_index(op.f('ix_business_rules_name'), 'business_rules', ['name'], unique=True)
+
+    op.create_table('chat_history',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.String(), nullable=False),
+    sa.Column('user_message', sa.Text(), nullable=False),
+    sa.Column('bot_response', sa.Text(), nullable=False),
+    sa.Column('intent', sa.String(), nullable=True),
+    sa.Column('context', sa.JSON(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_chat_history_id'), 'chat_history', ['id'], unique=False)
+    op.create_index(op.f('ix_chat_history_session_id'), 'chat_history', ['session_id'], unique=False)
+
+    op.create_table('projects',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('itpr_code', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('theme', sa.String(), nullable=True),
+    sa.Column('owner', sa.String(), nullable=True),
+    sa.Column('start_date', sa.Date(), nullable=True),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_projects_id'), 'projects', ['id'], unique=False)
+    op.create_index(op.f('ix_projects_itpr_code'), 'projects', ['itpr_code'], unique=True)
+
+    op.create_table('sprints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('release', sa.String(), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=False),
+    sa.Column('end_date', sa.Date(), nullable=False),
+    sa.Column('sprint_number', sa.Integer(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_sprints_id'), 'sprints', ['id'], unique=False)
+    op.create_index(op.f('ix_sprints_name'), 'sprints', ['name'], unique=True)
+
+    op.create_table('teams',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('description', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_teams_id'), 'teams', ['id'], unique=False)
+    op.create_index(op.f('ix_teams_name'), 'teams', ['name'], unique=True)
+
+    op.create_table('epics',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('formatted_id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('state', sa.String(), nullable=True),
+    sa.Column('percent_done_by_story_plan', sa.Float(), nullable=True),
+    sa.Column('percent_done_by_story_count', sa.Float(), nullable=True),
+    sa.Column('owner', sa.String(), nullable=True),
+    sa.Column('tags', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_epics_formatted_id'), 'epics', ['formatted_id'], unique=True)
+    op.create_index(op.f('ix_epics_id'), 'epics', ['id'], unique=False)
+
+    op.create_table('insights',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('insight_type', sa.String(), nullable=False),
+    sa.Column('title', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('severity', sa.String(), nullable=True),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('team_id', sa.Integer(), nullable=True),
+    sa.Column('data', sa.JSON(), nullable=True),
+    sa.Column('is_resolved', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_insights_id'), 'insights', ['id'], unique=False)
+    op.create_index(op.f('ix_insights_insight_type'), 'insights', ['insight_type'], unique=False)
+
+    op.create_table('team_members',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('network_id', sa.String(), nullable=True),
+    sa.Column('team_id', sa.Integer(), nullable=True),
+    sa.Column('role', sa.String(), nullable=True),
+    sa.Column('location', sa.String(), nullable=True),
+    sa.Column('allocation_percentage', sa.Float(), nullable=True),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_team_members_email'), 'team_members', ['email'], unique=True)
+    op.create_index(op.f('ix_team_members_id'), 'team_members', ['id'], unique=False)
+    op.create_index(op.f('ix_team_members_name'), 'team_members', ['name'], unique=False)
+
+    op.create_table('features',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('formatted_id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('epic_id', sa.Integer(), nullable=True),
+    sa.Column('state', sa.String(), nullable=True),
+    sa.Column('owner', sa.String(), nullable=True),
+    sa.Column('release', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['epic_id'], ['epics.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_features_formatted_id'), 'features', ['formatted_id'], unique=True)
+    op.create_index(op.f('ix_features_id'), 'features', ['id'], unique=False)
+
+    op.create_table('team_allocations',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=True),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('team_member_id', sa.Integer(), nullable=True),
+    sa.Column('week_start_date', sa.Date(), nullable=False),
+    sa.Column('allocated_hours', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ),
+    sa.ForeignKeyConstraint(['team_member_id'], ['team_members.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_team_allocations_id'), 'team_allocations', ['id'], unique=False)
+    op.create_index(op.f('ix_team_allocations_week_start_date'), 'team_allocations', ['week_start_date'], unique=False)
+
+    op.create_table('time_entries',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('team_member_id', sa.Integer(), nullable=True),
+    sa.Column('project_id', sa.Integer(), nullable=True),
+    sa.Column('week_start_date', sa.Date(), nullable=False),
+    sa.Column('actual_hours', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.ForeignKeyConstraint(['team_member_id'], ['team_members.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_time_entries_id'), 'time_entries', ['id'], unique=False)
+    op.create_index(op.f('ix_time_entries_week_start_date'), 'time_entries', ['week_start_date'], unique=False)
+
+    op.create_table('user_stories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('formatted_id', sa.String(), nullable=False),
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('feature_id', sa.Integer(), nullable=True),
+    sa.Column('owner', sa.String(), nullable=True),
+    sa.Column('team', sa.String(), nullable=True),
+    sa.Column('release', sa.String(), nullable=True),
+    sa.Column('iteration', sa.String(), nullable=True),
+    sa.Column('plan_estimate', sa.Float(), nullable=True),
+    sa.Column('state', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['feature_id'], ['features.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_user_stories_formatted_id'), 'user_stories', ['formatted_id'], unique=True)
+    op.create_index(op.f('ix_user_stories_id'), 'user_stories', ['id'], unique=False)
+    op.create_index(op.f('ix_user_stories_iteration'), 'user_stories', ['iteration'], unique=False)
+    op.create_index(op.f('ix_user_stories_team'), 'user_stories', ['team'], unique=False)
+
+    op.create_table('defects',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('formatted_id', sa.String(), nullable=True),
+    sa.Column('name', sa.String(), nullable=True),
+    sa.Column('user_story_id', sa.Integer(), nullable=True),
+    sa.Column('feature_formatted_id', sa.String(), nullable=True),
+    sa.Column('team', sa.String(), nullable=True),
+    sa.Column('iteration', sa.String(), nullable=True),
+    sa.Column('plan_estimate', sa.Float(), nullable=True),
+    sa.Column('state', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.ForeignKeyConstraint(['user_story_id'], ['user_stories.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_defects_formatted_id'), 'defects', ['formatted_id'], unique=True)
+    op.create_index(op.f('ix_defects_id'), 'defects', ['id'], unique=False)
+    op.create_index(op.f('ix_defects_team'), 'defects', ['team'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_defects_team'), table_name='defects')
+    op.drop_index(op.f('ix_defects_id'), table_name='defects')
+    op.drop_index(op.f('ix_defects_formatted_id'), table_name='defects')
+    op.drop_table('defects')
+
+    op.drop_index(op.f('ix_user_stories_team'), table_name='user_stories')
+    op.drop_index(op.f('ix_user_stories_iteration'), table_name='user_stories')
+    op.drop_index(op.f('ix_user_stories_id'), table_name='user_stories')
+    op.drop_index(op.f('ix_user_stories_formatted_id'), table_name='user_stories')
+    op.drop_table('user_stories')
+
+    op.drop_index(op.f('ix_time_entries_week_start_date'), table_name='time_entries')
+    op.drop_index(op.f('ix_time_entries_id'), table_name='time_entries')
+    op.drop_table('time_entries')
+
+    op.drop_index(op.f('ix_team_allocations_week_start_date'), table_name='team_allocations')
+    op.drop_index(op.f('ix_team_allocations_id'), table_name='team_allocations')
+    op.drop_table('team_allocations')
+
+    op.drop_index(op.f('ix_features_id'), table_name='features')
+    op.drop_index(op.f('ix_features_formatted_id'), table_name='features')
+    op.drop_table('features')
+
+    op.drop_index(op.f('ix_team_members_name'), table_name='team_members')
+    op.drop_index(op.f('ix_team_members_id'), table_name='team_members')
+    op.drop_index(op.f('ix_team_members_email'), table_name='team_members')
+    op.drop_table('team_members')
+
+    op.drop_index(op.f('ix_insights_insight_type'), table_name='insights')
+    op.drop_index(op.f('ix_insights_id'), table_name='insights')
+    op.drop_table('insights')
+
+    op.drop_index(op.f('ix_epics_id'), table_name='epics')
+    op.drop_index(op.f('ix_epics_formatted_id'), table_name='epics')
+    op.drop_table('epics')
+
+    op.drop_index(op.f('ix_teams_name'), table_name='teams')
+    op.drop_index(op.f('ix_teams_id'), table_name='teams')
+    op.drop_table('teams')
+
+    op.drop_index(op.f('ix_sprints_name'), table_name='sprints')
+    op.drop_index(op.f('ix_sprints_id'), table_name='sprints')
+    op.drop_table('sprints')
+
+    op.drop_index(op.f('ix_projects_itpr_code'), table_name='projects')
+    op.drop_index(op.f('ix_projects_id'), table_name='projects')
+    op.drop_table('projects')
+
+    op.drop_index(op.f('ix_chat_history_session_id'), table_name='chat_history')
+    op.drop_index(op.f('ix_chat_history_id'), table_name='chat_history')
+    op.drop_table('chat_history')
+
+    op.drop_index(op.f('ix_business_rules_name'), table_name='business_rules')
+    op.drop_index(op.f('ix_business_rules_id'), table_name='business_rules')
+    op.drop_table('business_rules')
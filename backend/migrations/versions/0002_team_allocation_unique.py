@@ -0,0 +1,36 @@
+"""team allocation unique
+
+One allocation per member, project and week, so Clarity imports can upsert
+allocations in bulk. Duplicates keep the oldest row, the one the old
+row-by-row import updated.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 23:41:05.112904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute(sa.text(
+        "DELETE FROM team_allocations WHERE id NOT IN ("
+        "SELECT MIN(id) FROM team_allocations GROUP BY team_member_id, project_id, week_start_date)"
+    ))
+    with op.batch_alter_table('team_allocations', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_team_allocation_member_project_week', ['team_member_id', 'project_id', 'week_start_date'])
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('team_allocations', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_team_allocation_member_project_week', type_='unique')
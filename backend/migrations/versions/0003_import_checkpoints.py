@@ -0,0 +1,46 @@
+"""import checkpoints
+
+Progress of chunked file imports, used to resume a failed import.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 23:41:12.530877
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: Union[str, None] = '0002'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('import_checkpoints',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('file_type', sa.String(), nullable=False),
+    sa.Column('file_hash', sa.String(), nullable=False),
+    sa.Column('filename', sa.String(), nullable=True),
+    sa.Column('status', sa.String(), nullable=True),
+    sa.Column('rows_committed', sa.Integer(), nullable=True),
+    sa.Column('chunks_committed', sa.Integer(), nullable=True),
+    sa.Column('rows_processed', sa.Integer(), nullable=True),
+    sa.Column('rows_skipped', sa.Integer(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_import_checkpoints_file_hash'), 'import_checkpoints', ['file_hash'], unique=False)
+    op.create_index(op.f('ix_import_checkpoints_id'), 'import_checkpoints', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_import_checkpoints_id'), table_name='import_checkpoints')
+    op.drop_index(op.f('ix_import_checkpoints_file_hash'), table_name='import_checkpoints')
+    op.drop_table('import_checkpoints')
@@ -0,0 +1,64 @@
+"""incremental insights
+
+Insight identity (insight_key, period) for in-place refreshes, the change
+log written by imports and the record of each insight refresh. Insights
+created before this revision have no key; the next refresh resolves them.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 23:41:27.301468
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('insights', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('period', sa.String(), nullable=True))
+        batch_op.add_column(sa.Column('insight_key', sa.String(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_insights_insight_key'), ['insight_key'], unique=True)
+
+    op.create_table('data_changes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('entity', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_data_changes_id'), 'data_changes', ['id'], unique=False)
+
+    op.create_table('insight_runs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('watermark', sa.Integer(), nullable=True),
+    sa.Column('week_start', sa.Date(), nullable=True),
+    sa.Column('rules_signature', sa.String(), nullable=True),
+    sa.Column('full_refresh', sa.Boolean(), nullable=True),
+    sa.Column('projects_recomputed', sa.Integer(), nullable=True),
+    sa.Column('teams_recomputed', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_insight_runs_id'), 'insight_runs', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_insight_runs_id'), table_name='insight_runs')
+    op.drop_table('insight_runs')
+
+    op.drop_index(op.f('ix_data_changes_id'), table_name='data_changes')
+    op.drop_table('data_changes')
+
+    with op.batch_alter_table('insights', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_insights_insight_key'))
+        batch_op.drop_column('insight_key')
+        batch_op.drop_column('period')
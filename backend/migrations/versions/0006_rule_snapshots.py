@@ -0,0 +1,39 @@
+"""rule snapshots
+
+Rules engine results per project and team, materialized by the scheduler.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-18 23:41:34.668020
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: Union[str, None] = '0005'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('rule_snapshots',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('snapshot_type', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('period', sa.String(), nullable=True),
+    sa.Column('data', sa.JSON(), nullable=True),
+    sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('snapshot_type', 'entity_id', name='uq_rule_snapshot_type_entity')
+    )
+    op.create_index(op.f('ix_rule_snapshots_id'), 'rule_snapshots', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_rule_snapshots_id'), table_name='rule_snapshots')
+    op.drop_table('rule_snapshots')
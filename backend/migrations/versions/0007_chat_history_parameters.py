@@ -0,0 +1,30 @@
+"""chat history parameters
+
+Intent parameters of each chat turn, carried into the next turn of the session.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-18 23:41:41.925733
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: Union[str, None] = '0006'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('chat_history', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('parameters', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('chat_history', schema=None) as batch_op:
+        batch_op.drop_column('parameters')
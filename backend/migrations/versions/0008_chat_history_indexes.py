@@ -0,0 +1,30 @@
+"""chat history indexes
+
+Indexes for paginating a session's history and for time-ranged exports.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-18 23:41:49.206551
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: Union[str, None] = '0007'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_chat_history_session_created', 'chat_history', ['session_id', 'created_at'], unique=False)
+    op.create_index('ix_chat_history_created_at', 'chat_history', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_chat_history_created_at', table_name='chat_history')
+    op.drop_index('ix_chat_history_session_created', table_name='chat_history')
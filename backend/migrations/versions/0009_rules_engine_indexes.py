@@ -0,0 +1,50 @@
+"""rules engine indexes
+
+Composite indexes for the rules engine's project/team/member + week filters
+and a unique time entry per member, project and week.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-18 17:59:54.158631
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0009'
+down_revision: Union[str, None] = '0008'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_team_allocations_project_week', 'team_allocations', ['project_id', 'week_start_date'], unique=False)
+    op.create_index('ix_team_allocations_team_week', 'team_allocations', ['team_id', 'week_start_date'], unique=False)
+
+    # Keep the newest entry of any duplicate member/project/week before enforcing uniqueness
+    op.execute(sa.text(
+        "DELETE FROM time_entries WHERE id NOT IN ("
+        "SELECT MAX(id) FROM time_entries GROUP BY team_member_id, project_id, week_start_date)"
+    ))
+    op.create_index('ix_time_entries_member_week', 'time_entries', ['team_member_id', 'week_start_date'], unique=False)
+    op.create_index('ix_time_entries_project_week', 'time_entries', ['project_id', 'week_start_date'], unique=False)
+    with op.batch_alter_table('time_entries', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_time_entry_member_project_week', ['team_member_id', 'project_id', 'week_start_date'])
+
+    op.create_index('ix_user_stories_feature_team', 'user_stories', ['feature_id', 'team'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_stories_feature_team', table_name='user_stories')
+
+    with op.batch_alter_table('time_entries', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_time_entry_member_project_week', type_='unique')
+    op.drop_index('ix_time_entries_project_week', table_name='time_entries')
+    op.drop_index('ix_time_entries_member_week', table_name='time_entries')
+
+    op.drop_index('ix_team_allocations_team_week', table_name='team_allocations')
+    op.drop_index('ix_team_allocations_project_week', table_name='team_allocations')
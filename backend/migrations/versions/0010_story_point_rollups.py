@@ -0,0 +1,45 @@
+"""story point rollups
+
+Total, completed and defect SP and story counts per feature, epic and
+project by team and iteration. Existing data is backfilled by
+`python -m app.cli rollups` (run by `init` when the table is empty).
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-18 21:14:37.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: Union[str, None] = '0009'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('story_point_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('level', sa.String(), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('team', sa.String(), nullable=False),
+    sa.Column('iteration', sa.String(), nullable=False),
+    sa.Column('story_count', sa.Integer(), nullable=True),
+    sa.Column('total_sp', sa.Float(), nullable=True),
+    sa.Column('completed_sp', sa.Float(), nullable=True),
+    sa.Column('defect_sp', sa.Float(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('level', 'entity_id', 'team', 'iteration', name='uq_sp_rollup_entity_team_iteration')
+    )
+    op.create_index(op.f('ix_story_point_rollups_id'), 'story_point_rollups', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_story_point_rollups_id'), table_name='story_point_rollups')
+    op.drop_table('story_point_rollups')
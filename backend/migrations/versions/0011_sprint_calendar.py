@@ -0,0 +1,45 @@
+"""sprint calendar
+
+Date -> sprint -> release lookup joined by allocations and time entries on
+week_start_date. Existing sprints are mapped by `python -m app.cli calendar`
+(run by `init` when the table is empty).
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-18 22:03:51.617240
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: Union[str, None] = '0010'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('sprint_calendar',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('week_start', sa.Date(), nullable=False),
+    sa.Column('sprint_id', sa.Integer(), nullable=False),
+    sa.Column('sprint_name', sa.String(), nullable=False),
+    sa.Column('release', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('day', 'sprint_id', name='uq_sprint_calendar_day_sprint')
+    )
+    op.create_index(op.f('ix_sprint_calendar_day'), 'sprint_calendar', ['day'], unique=False)
+    op.create_index(op.f('ix_sprint_calendar_id'), 'sprint_calendar', ['id'], unique=False)
+    op.create_index('ix_sprint_calendar_sprint_day', 'sprint_calendar', ['sprint_name', 'day'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_sprint_calendar_sprint_day', table_name='sprint_calendar')
+    op.drop_index(op.f('ix_sprint_calendar_id'), table_name='sprint_calendar')
+    op.drop_index(op.f('ix_sprint_calendar_day'), table_name='sprint_calendar')
+    op.drop_table('sprint_calendar')
@@ -0,0 +1,35 @@
+"""insight resolution
+
+Who resolved an insight and when. Insights resolved by a user stay closed
+when a refresh regenerates them; only those the insight engine resolved
+itself are reopened. Insights already resolved before this revision have no
+resolver and count as resolved by a user.
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 09:12:40.318207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: Union[str, None] = '0011'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('insights', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('resolved_at', sa.DateTime(timezone=True), nullable=True))
+        batch_op.add_column(sa.Column('resolved_by', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('insights', schema=None) as batch_op:
+        batch_op.drop_column('resolved_by')
+        batch_op.drop_column('resolved_at')
@@ -0,0 +1,34 @@
+"""cache versions
+
+One row per per-process cache (the rules engine lookup index, the dashboard
+summary). Write paths bump it in their transaction; every worker compares it
+before using its cached copy and reloads when it has changed.
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 14:27:05.904512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: Union[str, None] = '0012'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('cache_versions',
+    sa.Column('name', sa.String(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('cache_versions')
@@ -0,0 +1,51 @@
+"""
+Shared fixtures: each test gets its own in-memory SQLite database with the
+full schema, so no test touches the configured DATABASE_URL
+"""
+import os
+
+# Settings are read at import time; keep the app's own engine off disk
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.db.database import Base
+from app.db import models  # noqa: F401  (registers the tables on Base)
+from app.services.business_rules import invalidate_lookup_index
+from app.services.dashboard_cache import invalidate_dashboard_summary
+
+
+@pytest.fixture
+def make_db():
+    """Factory for sessions on fresh in-memory databases, for tests that need several"""
+    engines = []
+
+    def make():
+        engine = create_engine(
+            "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+        )
+        engines.append(engine)
+        Base.metadata.create_all(bind=engine)
+        # The lookup snapshot and dashboard summary are per process; don't carry them across databases
+        invalidate_lookup_index()
+        invalidate_dashboard_summary()
+        return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+    try:
+        yield make
+    finally:
+        for engine in engines:
+            engine.dispose()
+
+
+@pytest.fixture
+def db(make_db):
+    """Session on a fresh in-memory database"""
+    session = make_db()
+    try:
+        yield session
+    finally:
+        session.close()
@@ -0,0 +1,38 @@
+"""
+Per-process caches reload when another worker bumps their shared version,
+without that worker being able to drop this process's copy
+"""
+from app.db.models import Project, Team
+from app.services.business_rules import get_lookup_index
+from app.services.cache_versions import LOOKUP_INDEX, DASHBOARD_SUMMARY, bump_version
+from app.services.dashboard_cache import get_dashboard_summary
+
+
+def test_lookup_index_reloads_after_another_worker_imports(db):
+    db.add(Team(name="Core"))
+    db.commit()
+    index = get_lookup_index(db)
+    assert get_lookup_index(db) is index
+
+    # Another worker's import: new data and a version bump, committed together
+    db.add(Team(name="Payments"))
+    bump_version(db, LOOKUP_INDEX)
+    db.commit()
+
+    reloaded = get_lookup_index(db)
+    assert reloaded is not index
+    assert set(reloaded.team_ids) == {"Core", "Payments"}
+    assert get_lookup_index(db) is reloaded
+
+
+def test_dashboard_summary_recomputed_after_another_worker_writes(db):
+    summary, etag = get_dashboard_summary(db)
+    assert summary["total_projects"] == 0
+
+    db.add(Project(itpr_code="ITPR-1", name="Ledger", status="Active"))
+    bump_version(db, DASHBOARD_SUMMARY)
+    db.commit()
+
+    summary, new_etag = get_dashboard_summary(db)
+    assert summary["total_projects"] == 1
+    assert new_etag != etag
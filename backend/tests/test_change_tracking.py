@@ -0,0 +1,28 @@
+"""
+Incremental insight refreshes consume exactly the change rows they read, so
+a change that becomes visible after a higher id was processed is not lost
+"""
+from app.db.models import DataChange, InsightRun, Project
+from app.services.insight_engine import InsightEngine
+
+
+def test_late_lower_change_id_is_processed(db):
+    first, second = Project(itpr_code="ITPR-1", name="Ledger"), Project(itpr_code="ITPR-2", name="Payments")
+    db.add_all([first, second])
+    db.commit()
+    InsightEngine(db).refresh()
+
+    db.add(DataChange(id=10, entity="project", entity_id=first.id))
+    db.commit()
+    InsightEngine(db).refresh()
+    assert db.query(DataChange).count() == 0
+
+    # Committed after id 10 was read, as a concurrent PostgreSQL transaction can
+    db.add(DataChange(id=5, entity="project", entity_id=second.id))
+    db.commit()
+    result = InsightEngine(db).refresh()
+
+    run = db.query(InsightRun).order_by(InsightRun.id.desc()).first()
+    assert not result["full_refresh"]
+    assert run.projects_recomputed == 1
+    assert db.query(DataChange).count() == 0
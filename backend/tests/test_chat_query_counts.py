@@ -0,0 +1,56 @@
+"""
+SQL statements per chat rule handler must not grow with the data: each
+handler runs against a small and a larger generated dataset and must issue
+the same number of queries on both (see benchmarks/chat_query_counts.py for
+timings at a bigger scale)
+"""
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+from benchmarks.chat_query_counts import HANDLERS
+from benchmarks.dataset import generate_dataset
+from app.services.chat_service import ChatService
+
+SMALL = {"teams": 3, "members_per_team": 4, "projects": 3, "weeks": 4, "stories_per_project": 10}
+LARGE = {"teams": 30, "members_per_team": 8, "projects": 30, "weeks": 4, "stories_per_project": 30}
+
+
+@contextmanager
+def count_queries(db):
+    counter = {"queries": 0}
+
+    def before_cursor_execute(*args):
+        counter["queries"] += 1
+
+    bind = db.get_bind()
+    event.listen(bind, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield counter
+    finally:
+        event.remove(bind, "before_cursor_execute", before_cursor_execute)
+
+
+def query_counts(db, scale):
+    """Queries issued by each handler in HANDLERS on a fresh dataset of `scale`"""
+    generate_dataset(db, **scale)
+    handlers = ChatService(db)._rule_handlers()
+
+    counts = []
+    for intent, parameters in HANDLERS:
+        with count_queries(db) as counter:
+            handlers[intent](dict(parameters))
+        counts.append(counter["queries"])
+    return counts
+
+
+def test_query_count_per_handler_is_independent_of_data_size(make_db):
+    small = query_counts(make_db(), SMALL)
+    large = query_counts(make_db(), LARGE)
+
+    grows = {
+        f"{intent} {parameters or ''}".strip(): (small_count, large_count)
+        for (intent, parameters), small_count, large_count in zip(HANDLERS, small, large)
+        if small_count != large_count
+    }
+    assert not grows, f"queries per handler (small, large) grow with the data: {grows}"
@@ -0,0 +1,77 @@
+"""
+Insight refreshes reopen insights the engine resolved when their condition
+returns, but leave insights a user resolved closed
+"""
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.db.models import Insight, Project, Team, TeamAllocation, TeamMember, TimeEntry
+from app.services.insight_engine import ENGINE_RESOLVER, InsightEngine
+
+WEEK = date(2026, 1, 6)
+
+
+@pytest.fixture
+def overrun(db):
+    """A project with 50 actual hours against 40 planned; returns its time entry"""
+    project = Project(itpr_code="ITPR-1", name="Ledger", status="Active")
+    team = Team(name="Core")
+    db.add_all([project, team])
+    db.flush()
+    member = TeamMember(team_id=team.id, name="Sam", email="sam@example.com")
+    db.add(member)
+    db.flush()
+    entry = TimeEntry(team_member_id=member.id, project_id=project.id, week_start_date=WEEK, actual_hours=50.0)
+    db.add_all([
+        TeamAllocation(
+            team_id=team.id, project_id=project.id, team_member_id=member.id,
+            week_start_date=WEEK, allocated_hours=40.0
+        ),
+        entry
+    ])
+    db.commit()
+    return entry
+
+
+def _overrun_insight(db):
+    return db.query(Insight).filter(Insight.insight_type == "project_overrun").one()
+
+
+def test_engine_resolved_insight_reopens(db, overrun):
+    InsightEngine(db).refresh(full=True)
+    assert not _overrun_insight(db).is_resolved
+
+    overrun.actual_hours = 30.0
+    db.commit()
+    InsightEngine(db).refresh(full=True)
+    insight = _overrun_insight(db)
+    assert insight.is_resolved
+    assert insight.resolved_by == ENGINE_RESOLVER
+    assert insight.resolved_at is not None
+
+    overrun.actual_hours = 60.0
+    db.commit()
+    InsightEngine(db).refresh(full=True)
+    db.expire_all()
+    insight = _overrun_insight(db)
+    assert not insight.is_resolved
+    assert insight.resolved_by is None
+    assert insight.data["actual_hours"] == 60.0
+
+
+def test_user_resolved_insight_stays_closed(db, overrun):
+    first = InsightEngine(db).refresh(full=True)
+    insight = _overrun_insight(db)
+    insight.is_resolved = True
+    insight.resolved_at = datetime.now(timezone.utc)
+    insight.resolved_by = "user"
+    db.commit()
+
+    result = InsightEngine(db).refresh(full=True)
+    db.expire_all()
+    insight = _overrun_insight(db)
+    assert insight.is_resolved
+    assert insight.resolved_by == "user"
+    assert result["kept_resolved"] == 1
+    assert result["updated"] == first["created"] - 1
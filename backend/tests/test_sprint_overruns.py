@@ -0,0 +1,70 @@
+"""
+Sprint-scoped overruns: hours are limited to the weeks the sprint calendar
+maps to the sprint, and a sprint the calendar doesn't know falls back to
+whole-project totals
+"""
+from datetime import date
+
+import pytest
+
+from app.db.models import Project, Sprint, Team, TeamAllocation, TeamMember, TimeEntry
+from app.services.business_rules import BusinessRulesEngine
+
+SPRINT_WEEK = date(2026, 1, 5)
+LATER_WEEK = date(2026, 3, 2)
+
+
+@pytest.fixture
+def project(db):
+    """One project with allocations and time entries inside and outside 2026.S1"""
+    project = Project(itpr_code="ITPR-1", name="Ledger")
+    team = Team(name="Core")
+    db.add_all([project, team])
+    db.flush()
+    member = TeamMember(team_id=team.id, name="Sam", email="sam@example.com")
+    db.add_all([
+        member,
+        Sprint(name="2026.S1", release="2026.Jan", start_date=date(2026, 1, 5), end_date=date(2026, 1, 16))
+    ])
+    db.flush()
+    for week, planned, actual in [(SPRINT_WEEK, 40.0, 50.0), (LATER_WEEK, 40.0, 20.0)]:
+        db.add_all([
+            TeamAllocation(
+                team_id=team.id, project_id=project.id, team_member_id=member.id,
+                week_start_date=week, allocated_hours=planned
+            ),
+            TimeEntry(
+                team_member_id=member.id, project_id=project.id,
+                week_start_date=week, actual_hours=actual
+            )
+        ])
+    db.commit()
+    return project
+
+
+def test_known_sprint_scopes_hours_to_its_weeks(db, project):
+    overrun = BusinessRulesEngine(db).detect_project_overruns(project.id, "2026.S1")
+
+    assert overrun["planned_hours"] == 40.0
+    assert overrun["actual_hours"] == 50.0
+    assert overrun["is_overrun"]
+    assert overrun["sprint"] == "2026.S1"
+
+
+def test_unknown_sprint_falls_back_to_project_totals(db, project):
+    engine = BusinessRulesEngine(db)
+
+    overrun = engine.detect_project_overruns(project.id, "2099.S9")
+
+    assert overrun["planned_hours"] == 80.0
+    assert overrun["actual_hours"] == 70.0
+    assert not overrun["is_overrun"]
+    assert overrun["sprint"] is None
+    assert overrun == engine.detect_project_overruns(project.id)
+
+
+def test_unknown_sprint_falls_back_for_all_projects(db, project):
+    overruns = BusinessRulesEngine(db).detect_all_project_overruns(sprint_name="2099.S9")
+
+    assert overruns[project.id]["planned_hours"] == 80.0
+    assert overruns[project.id]["actual_hours"] == 70.0
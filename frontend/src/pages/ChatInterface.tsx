@@ -10,7 +10,7 @@ import {
 } from '@mui/material';
 import SendIcon from '@mui/icons-material/Send';
 import ReactMarkdown from 'react-markdown';
-import { sendChatMessage } from '../services/api';
+import { streamChatMessage } from '../services/api';
 
 interface Message {
   role: 'user' | 'assistant';
@@ -28,6 +28,7 @@ export default function ChatInterface() {
   ]);
   const [input, setInput] = useState('');
   const [loading, setLoading] = useState(false);
+  const [streaming, setStreaming] = useState(false);
   const [sessionId] = useState(() => `session-${Date.now()}`);
   const messagesEndRef = useRef<HTMLDivElement>(null);
 
@@ -40,7 +41,7 @@ export default function ChatInterface() {
   };
 
   const handleSend = async () => {
-    if (!input.trim() || loading) return;
+    if (!input.trim() || loading || streaming) return;
 
     const userMessage: Message = {
       role: 'user',
@@ -53,15 +54,21 @@ export default function ChatInterface() {
     setLoading(true);
 
     try {
-      const response = await sendChatMessage(input, sessionId);
-      
-      const assistantMessage: Message = {
-        role: 'assistant',
-        content: response.response,
-        timestamp: new Date(),
-      };
-
-      setMessages((prev) => [...prev, assistantMessage]);
+      let started = false;
+      await streamChatMessage(input, sessionId, (text) => {
+        if (!started) {
+          // First token: replace the spinner with the streaming answer
+          started = true;
+          setLoading(false);
+          setStreaming(true);
+          setMessages((prev) => [...prev, { role: 'assistant', content: text, timestamp: new Date() }]);
+          return;
+        }
+        setMessages((prev) => {
+          const last = prev[prev.length - 1];
+          return [...prev.slice(0, -1), { ...last, content: last.content + text }];
+        });
+      });
     } catch (error) {
       console.error('Error sending message:', error);
       
@@ -74,6 +81,7 @@ export default function ChatInterface() {
       setMessages((prev) => [...prev, errorMessage]);
     } finally {
       setLoading(false);
+      setStreaming(false);
     }
   };
 
@@ -164,13 +172,13 @@ export default function ChatInterface() {
           value={input}
           onChange={(e) => setInput(e.target.value)}
           onKeyPress={handleKeyPress}
-          disabled={loading}
+          disabled={loading || streaming}
           variant="outlined"
         />
         <IconButton
           color="primary"
           onClick={handleSend}
-          disabled={loading || !input.trim()}
+          disabled={loading || streaming || !input.trim()}
           sx={{
             bgcolor: 'primary.main',
             color: 'white',
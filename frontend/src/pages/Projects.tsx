@@ -9,7 +9,7 @@ import {
   Chip,
   LinearProgress,
 } from '@mui/material';
-import { getProjects, getProjectSummary } from '../services/api';
+import { getProjects, getProjectSummaries } from '../services/api';
 
 interface Project {
   id: number;
@@ -43,13 +43,17 @@ export default function Projects() {
       const projectsData = await getProjects();
       setProjects(projectsData);
       
-      // Load summaries for each project
-      for (const project of projectsData.slice(0, 10)) {
+      // Load all summaries in one request
+      if (projectsData.length > 0) {
         try {
-          const summary = await getProjectSummary(project.id);
-          setSummaries(prev => ({ ...prev, [project.id]: summary }));
+          const data = await getProjectSummaries(projectsData.map((project: Project) => project.id));
+          const byId: { [key: number]: ProjectSummary } = {};
+          for (const summary of data.summaries as ProjectSummary[]) {
+            byId[summary.project.id] = summary;
+          }
+          setSummaries(byId);
         } catch (error) {
-          console.error(`Error loading summary for project ${project.id}:`, error);
+          console.error('Error loading project summaries:', error);
         }
       }
     } catch (error) {
@@ -34,8 +34,50 @@ export const sendChatMessage = async (message: string, sessionId?: string) => {
   return response.data;
 };
 
-export const getChatHistory = async (sessionId: string) => {
-  const response = await api.get(`/chat/history/${sessionId}`);
+// Stream a chat answer over Server-Sent Events; onToken receives text as it arrives
+export const streamChatMessage = async (
+  message: string,
+  sessionId: string | undefined,
+  onToken: (text: string) => void
+) => {
+  const response = await fetch(`${API_BASE_URL}/chat/stream`, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify({ message, session_id: sessionId }),
+  });
+  if (!response.ok || !response.body) {
+    throw new Error(`Chat stream failed: ${response.status}`);
+  }
+
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = '';
+  let result: any = null;
+
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    let boundary = buffer.indexOf('\n\n');
+    while (boundary !== -1) {
+      const raw = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      boundary = buffer.indexOf('\n\n');
+
+      const event = raw.match(/^event: (.*)$/m)?.[1];
+      const data = JSON.parse(raw.match(/^data: (.*)$/m)?.[1] || '{}');
+      if (event === 'token') onToken(data.text);
+      if (event === 'done') result = data;
+      if (event === 'error') throw new Error(data.error || 'Chat stream failed');
+    }
+  }
+  return result;
+};
+
+export const getChatHistory = async (sessionId: string, cursor?: string, limit = 50) => {
+  const response = await api.get(`/chat/history/${sessionId}`, { params: { cursor, limit } });
   return response.data;
 };
 
@@ -55,6 +97,11 @@ export const getProjectSummary = async (projectId: number) => {
   return response.data;
 };
 
+export const getProjectSummaries = async (projectIds: number[]) => {
+  const response = await api.get('/projects/summary', { params: { ids: projectIds.join(',') } });
+  return response.data;
+};
+
 // Insights API
 export const getInsights = async (type?: string, resolved?: boolean) => {
   const params = new URLSearchParams();
@@ -110,6 +157,28 @@ export const uploadFile = async (file: File, fileType: string) => {
       'Content-Type': 'multipart/form-data',
     },
   });
+  const upload = response.data;
+  if (!upload.job_id) return upload;
+
+  // Imports run in the background; poll the job until it finishes
+  for (;;) {
+    const job = await getImportJob(upload.job_id);
+    if (job.status === 'completed' || job.status === 'failed') {
+      return {
+        ...upload,
+        rows_processed: job.rows_processed,
+        status: job.status === 'completed' ? 'success' : 'error',
+        message: job.status === 'completed'
+          ? `Successfully processed ${job.rows_processed} rows`
+          : job.error || 'Processing failed',
+      };
+    }
+    await new Promise((resolve) => setTimeout(resolve, 1000));
+  }
+};
+
+export const getImportJob = async (jobId: number) => {
+  const response = await api.get(`/uploads/jobs/${jobId}`);
   return response.data;
 };
 
@@ -47,6 +47,10 @@ fi
 # Create uploads directory
 mkdir -p uploads
 
+# Create or upgrade the database schema and load sample data if it's empty
+echo "Initializing database..."
+python -m app.cli init
+
 echo ""
 echo "✅ Backend setup complete!"
 echo ""